@@ -0,0 +1,267 @@
+"""
+Offline backtest of the TradingStrategy entry and exit rules
+
+Usage:
+    python backtest.py [limit]
+    python backtest.py --offline [limit]
+
+--offline replays the candle database (see candle_db.py backfill) instead
+of fetching from the exchange.
+
+Replays closed hourly candles: on each candle close, open positions are
+checked with check_stop_loss/check_target and closed at the close price,
+then signals are ranked and new positions are opened at the close price
+while slots remain.
+"""
+import asyncio
+import sys
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from config import config
+from ichimoku import IchimokuCloud
+from trading_strategy import Position, PositionType, TradingStrategy
+
+
+@dataclass
+class BacktestResult:
+    trades: List[Position]
+    open_positions: Dict[str, Position]
+    equity_curve: pd.DataFrame
+    summary: Dict
+
+
+class Backtester(TradingStrategy):
+    """
+    TradingStrategy replayed over historical candles
+
+    Reuses calculate_position_size and the signal ranking of the live
+    strategy; indicators, signals, run lengths and exit flags are computed
+    per symbol in one vectorized pass, and only slot allocation steps
+    through time.
+    """
+
+    # Closed candles a live scan sees (limit=100 minus the forming candle), which caps hours_since_signal
+    SCAN_CANDLES = 99
+
+    def __init__(self, initial_value: float = None):
+        self.initial_value = initial_value or config.get_config().CURRENT_PORTFOLIO_VALUE
+        super().__init__(positions_file=None, initial_value=self.initial_value)  # In memory only
+        self.ichimoku = IchimokuCloud(config.get_config().TENKAN_PERIOD, config.get_config().KIJUN_PERIOD,
+                                      config.get_config().SENKOU_PERIOD, config.get_config().CHIKOU_PERIOD)
+
+    def reset(self):
+        """Start over with an empty portfolio"""
+        self.reset_portfolio(self.initial_value)
+
+    def run(self, frames: Dict[str, pd.DataFrame]) -> BacktestResult:
+        """
+        Backtest over closed candles
+
+        Args:
+            frames: Dictionary of symbol -> OHLCV DataFrame of completed candles
+
+        Returns:
+            BacktestResult with closed trades, positions still open at the end and the equity curve
+        """
+        self.reset()
+        symbols = list(frames)
+        columns = {symbol: column for column, symbol in enumerate(symbols)}
+        panel = self._prepare(frames)
+        timestamps = panel.pop('timestamps')
+        candle_duration = pd.Timedelta(config.get_config().TIMEFRAME)
+        config_data = config.get_config()
+
+        equity_rows = []
+        for t, timestamp in enumerate(timestamps):
+            candle_close = (timestamp + candle_duration).to_pydatetime()
+            closes = panel['close'][t]
+            exited = set()
+
+            # Step 1: exits on the candle that just closed
+            for symbol in list(self.portfolio.positions):
+                position = self.portfolio.positions[symbol]
+                column = columns[symbol]
+                exit_flags = panel['exit_long'] if position.position_type == PositionType.LONG else panel['exit_short']
+                if exit_flags[t, column] and not np.isnan(closes[column]):
+                    self._close(symbol, closes[column], candle_close)
+                    exited.add(symbol)
+
+            # Step 2: rank fresh/recent/older signals and fill free slots
+            candidates = []
+            for column in np.flatnonzero(panel['long_signal'][t] | panel['short_signal'][t]):
+                signal_info = self._rank_signal(symbols[column], {
+                    'long_signal': bool(panel['long_signal'][t, column]),
+                    'short_signal': bool(panel['short_signal'][t, column]),
+                    'long_run': int(panel['long_run'][t, column]),
+                    'short_run': int(panel['short_run'][t, column])
+                })
+                if signal_info:
+                    candidates.append(signal_info)
+            candidates.sort(key=lambda x: (x['priority'], -x['hours_since_signal']))
+
+            for candidate in candidates:
+                symbol = candidate['symbol']
+                if symbol in self.portfolio.positions or symbol in exited:
+                    continue  # No re-entry on the candle a position was closed
+
+                counts = self._position_counts()
+                if candidate['signal_type'] == 'long' and counts[PositionType.LONG] >= config_data.MAX_LONG_POSITIONS:
+                    continue
+                if candidate['signal_type'] == 'short' and counts[PositionType.SHORT] >= config_data.MAX_SHORT_POSITIONS:
+                    continue
+
+                self._open(symbol, candidate['signal_type'], closes[columns[symbol]], candle_close)
+
+            # Step 3: mark to market
+            equity_rows.append(self._mark_to_market(candle_close, closes, columns))
+
+        equity_curve = pd.DataFrame(equity_rows).set_index('timestamp') if equity_rows else pd.DataFrame()
+        return BacktestResult(
+            trades=list(self.trades_history),
+            open_positions=dict(self.portfolio.positions),
+            equity_curve=equity_curve,
+            summary=self._summary(equity_curve)
+        )
+
+    def _prepare(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, np.ndarray]:
+        """Per-symbol vectorized signals and exit flags, aligned to one (candles x symbols) timeline"""
+        timestamps = pd.DatetimeIndex(sorted(set().union(*(df.index for df in frames.values()))))
+        shape = (len(timestamps), len(frames))
+        panel = {
+            'close': np.full(shape, np.nan),
+            'long_signal': np.zeros(shape, dtype=bool),
+            'short_signal': np.zeros(shape, dtype=bool),
+            'long_run': np.zeros(shape, dtype=np.int64),
+            'short_run': np.zeros(shape, dtype=np.int64),
+            'exit_long': np.zeros(shape, dtype=bool),
+            'exit_short': np.zeros(shape, dtype=bool)
+        }
+
+        for column, df in enumerate(frames.values()):
+            rows = timestamps.get_indexer(df.index)
+            df = self.ichimoku.get_signals(self.ichimoku.calculate(df, lean=True), lean=True)
+
+            # Live scans skip symbols with fewer than 52 closed candles
+            eligible = np.arange(len(df)) >= 51
+            panel['close'][rows, column] = df['close'].to_numpy()
+            panel['long_signal'][rows, column] = df['long_signal'].to_numpy() & eligible
+            panel['short_signal'][rows, column] = df['short_signal'].to_numpy() & eligible
+            panel['long_run'][rows, column] = np.minimum(self._run_lengths(df['long_signal'].to_numpy()), self.SCAN_CANDLES)
+            panel['short_run'][rows, column] = np.minimum(self._run_lengths(df['short_signal'].to_numpy()), self.SCAN_CANDLES)
+            # Flagged over full history; live exit checks fetch ichimoku.lookback + EXIT_ROWS candles,
+            # enough for the same values on the candles they check
+            for position_type in ('long', 'short'):
+                panel[f'exit_{position_type}'][rows, column] = (
+                    self.ichimoku.check_stop_loss(df, position_type).to_numpy(dtype=bool) |
+                    self.ichimoku.check_target(df, position_type).to_numpy(dtype=bool)
+                )
+
+        panel['timestamps'] = timestamps
+        return panel
+
+    @staticmethod
+    def _run_lengths(signals: np.ndarray) -> np.ndarray:
+        """Consecutive True values ending at each row (0 where False)"""
+        positions = np.arange(1, len(signals) + 1)
+        last_false = np.maximum.accumulate(np.where(signals, 0, positions))
+        return positions - last_false
+
+    def _position_counts(self) -> Dict[PositionType, int]:
+        return {PositionType.LONG: self.aggregates.long_positions, PositionType.SHORT: self.aggregates.short_positions}
+
+    def _open(self, symbol: str, signal_type: str, entry_price: float, entry_time):
+        """open_position without the exchange: fill at the candle close"""
+        if not entry_price > 0:
+            return
+
+        quantity, leverage = self.calculate_position_size(symbol, signal_type, entry_price)
+        if quantity <= 0:
+            return
+
+        self._book_open(Position(
+            symbol=symbol,
+            position_type=PositionType(signal_type),
+            entry_price=entry_price,
+            quantity=quantity,
+            leverage=leverage,
+            entry_time=entry_time
+        ))
+
+    def _close(self, symbol: str, exit_price: float, exit_time):
+        """close_position without the exchange: fill at the candle close"""
+        self._book_close(self.portfolio.positions[symbol], exit_price, exit_time)
+
+    def _mark_to_market(self, timestamp, closes: np.ndarray, columns: Dict[str, int]) -> Dict:
+        """update_portfolio_value with candle closes as current prices"""
+        # Symbols without a candle at this time are carried at entry value
+        prices = {symbol: closes[columns[symbol]] for symbol in self.portfolio.positions
+                  if not np.isnan(closes[columns[symbol]])}
+        unrealized_pnl = self._revalue(prices)
+
+        return {
+            'timestamp': timestamp,
+            'total_value': self.portfolio.total_value,
+            'available_cash': self.portfolio.available_cash,
+            'realized_pnl': self.portfolio.total_pnl,
+            'unrealized_pnl': unrealized_pnl,
+            'open_positions': len(self.portfolio.positions),
+            'drawdown': self.portfolio.drawdown
+        }
+
+    def _summary(self, equity_curve: pd.DataFrame) -> Dict:
+        final_value = equity_curve['total_value'].iloc[-1] if len(equity_curve) else self.initial_value
+        return {
+            'initial_value': self.initial_value,
+            'final_value': round(final_value, 2),
+            'total_return_pct': round((final_value / self.initial_value - 1) * 100, 2),
+            'realized_pnl': round(self.portfolio.total_pnl, 2),
+            'max_drawdown': round(equity_curve['drawdown'].max(), 2) if len(equity_curve) else 0.0,
+            'total_trades': len(self.trades_history),
+            'long_trades': sum(1 for trade in self.trades_history if trade.position_type == PositionType.LONG),
+            'short_trades': sum(1 for trade in self.trades_history if trade.position_type == PositionType.SHORT),
+            'win_rate': round(self.aggregates.wins / len(self.trades_history) * 100, 2) if self.trades_history else 0.0,
+            'open_positions': len(self.portfolio.positions)
+        }
+
+
+async def load_frames(limit: int) -> Dict[str, pd.DataFrame]:
+    """Fetch the live scan universe from the exchange"""
+    from data_provider import data_provider
+
+    config_data = config.get_config()
+    symbols = [coin + '/USDT' for coin in config_data.LONG_COINS]
+    symbols += await data_provider.get_shortable_symbols(limit=50)
+
+    frames = {}
+    for symbol in symbols:
+        df = await data_provider.get_ohlcv(symbol, timeframe=config_data.TIMEFRAME, limit=limit)
+        if not df.empty:
+            frames[symbol] = df.iloc[:-1]  # Drop the forming candle
+    return frames
+
+
+def load_stored_frames(limit: int = None) -> Dict[str, pd.DataFrame]:
+    """Read every symbol in the candle database (closed candles only)"""
+    from candle_db import CandleDB
+
+    db = CandleDB()
+    timeframe = config.get_config().TIMEFRAME
+    frames = {symbol: db.read(symbol, timeframe, limit) for symbol in db.symbols(timeframe)}
+    return {symbol: df for symbol, df in frames.items() if not df.empty}
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != '--offline']
+    if '--offline' in sys.argv[1:]:
+        frames = load_stored_frames(int(args[0]) if args else None)
+    else:
+        frames = asyncio.run(load_frames(int(args[0]) if args else 1000))
+    result = Backtester().run(frames)
+
+    print(f"\n📊 Backtest over {len(frames)} symbols")
+    for key, value in result.summary.items():
+        print(f"  {key}: {value}")
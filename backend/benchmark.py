@@ -0,0 +1,683 @@
+"""
+Performance benchmarks for the indicator, scan and API hot paths
+
+Usage:
+    python benchmark.py                      # speedup reports
+    python benchmark.py run [-o FILE]        # timing suite, results written as JSON
+    python benchmark.py compare BASELINE     # run the suite and flag slowdowns against BASELINE
+
+Uses seeded synthetic OHLCV data, a stubbed data_provider and a local fake
+exchange server, so results are reproducible and no exchange access is needed.
+Correctness of the optimized paths is covered by the tests in tests/.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from ichimoku import IchimokuCloud, IchimokuStream
+from parameter_sweep import ParameterSweep, default_grid
+from tests.helpers import FakeExchangeServer, legacy_is_chikou_clean, legacy_save_positions, make_ohlcv, replay_provider
+
+SIZES = [100, 1_000, 100_000]
+
+
+def time_call(func: Callable, repeat: int = 3) -> float:
+    """Best wall-clock time of `repeat` runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_chikou(sizes: List[int]):
+    """Compare the vectorized Chikou checks with the legacy loop"""
+    ichimoku = IchimokuCloud()
+
+    print("\n📊 Chikou clean checks (long + short)")
+    print(f"  {'candles':>8}  {'legacy':>10}  {'vectorized':>10}  {'speedup':>8}")
+    for n in sizes:
+        df = ichimoku.calculate(make_ohlcv(n))
+
+        legacy = time_call(lambda: (legacy_is_chikou_clean(ichimoku, df),
+                                    legacy_is_chikou_clean(ichimoku, df, short=True)),
+                           repeat=1 if n > 10_000 else 3)
+        vectorized = time_call(lambda: (ichimoku._is_chikou_clean(df),
+                                        ichimoku._is_chikou_clean_short(df)))
+        print(f"  {n:>8}  {legacy * 1000:>8.1f}ms  {vectorized * 1000:>8.2f}ms  {legacy / vectorized:>7.0f}x")
+
+
+def bench_stream(sizes: List[int], window: int = 100):
+    """Time a per-candle IchimokuStream update against recomputing a window"""
+    ichimoku = IchimokuCloud()
+
+    print(f"\n📊 Per-candle update (stream vs recomputing a {window}-candle frame)")
+    print(f"  {'candles':>8}  {'recompute':>10}  {'stream':>10}  {'speedup':>8}")
+    for n in sizes:
+        df = make_ohlcv(n)
+
+        stream = IchimokuStream.from_ichimoku(ichimoku)
+        start = time.perf_counter()
+        for candle in df[['high', 'low', 'close']].to_dict('records'):
+            stream.update(candle)
+        per_update = (time.perf_counter() - start) / n
+
+        tail = df.iloc[-window:]
+        recompute = time_call(lambda: ichimoku.get_signals(ichimoku.calculate(tail)))
+        print(f"  {n:>8}  {recompute * 1000:>8.2f}ms  {per_update * 1e6:>8.2f}us  {recompute / per_update:>7.0f}x")
+
+
+def bench_panel(symbol_counts: List[int], candles: int = 100):
+    """Compare calculate_panel with per-symbol calculate + get_signals"""
+    ichimoku = IchimokuCloud()
+
+    print(f"\n📊 Multi-symbol scan ({candles} candles per symbol)")
+    print(f"  {'symbols':>8}  {'per-symbol':>10}  {'panel':>10}  {'speedup':>8}")
+    for count in symbol_counts:
+        # Every 7th symbol has a short history to exercise the NaN padding
+        frames = [make_ohlcv(candles if i % 7 else candles // 2, seed=i) for i in range(count)]
+
+        per_symbol = time_call(lambda: [ichimoku.get_signals(ichimoku.calculate(df)) for df in frames])
+        batched = time_call(lambda: ichimoku.calculate_panel(*ichimoku.align_panel(frames)))
+        print(f"  {count:>8}  {per_symbol * 1000:>8.1f}ms  {batched * 1000:>8.2f}ms  {per_symbol / batched:>7.0f}x")
+
+
+def peak_allocation(func: Callable) -> int:
+    """Peak bytes allocated by Python/numpy while running func"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_lean(symbols: int = 65, candles: int = 100):
+    """Compare time and allocation per scan for the full and lean output modes"""
+    ichimoku = IchimokuCloud()
+    frames = [make_ohlcv(candles, seed=i) for i in range(symbols)]
+
+    modes = {
+        'full': lambda: [ichimoku.get_signals(ichimoku.calculate(df)) for df in frames],
+        'lean': lambda: [ichimoku.get_signals(ichimoku.calculate(df, lean=True), lean=True) for df in frames],
+        'lean float32': lambda: [ichimoku.get_signals(ichimoku.calculate(df, lean=True, dtype=np.float32), lean=True)
+                                 for df in frames],
+        'panel full': lambda: ichimoku.calculate_panel(*ichimoku.align_panel(frames)),
+        'panel lean': lambda: ichimoku.calculate_panel(*ichimoku.align_panel(frames), lean=True),
+    }
+
+    print(f"\n📊 Output modes per scan ({symbols} symbols x {candles} candles)")
+    print(f"  {'mode':>12}  {'time':>10}  {'peak alloc':>10}  {'columns':>8}")
+    for name, func in modes.items():
+        result = func()
+        columns = len(result) if isinstance(result, dict) else len(result[0].columns)
+        print(f"  {name:>12}  {time_call(func) * 1000:>8.2f}ms  {peak_allocation(func) / 1024:>8.0f}KB  {columns:>8}")
+
+
+def bench_tail(sizes: List[int]):
+    """Compare a full-history signal check with the tail-only fast path"""
+    ichimoku = IchimokuCloud()
+
+    print("\n📊 Per-symbol signal state (full history vs tail only)")
+    print(f"  {'candles':>8}  {'full':>10}  {'tail':>10}  {'speedup':>8}")
+    for n in sizes:
+        df = make_ohlcv(n)
+
+        def full_state():
+            signals = ichimoku.get_signals(ichimoku.calculate(df))
+            return {
+                'long_signal': bool(signals['long_signal'].iloc[-1]),
+                'short_signal': bool(signals['short_signal'].iloc[-1]),
+                'long_run': ichimoku.trailing_run(signals['long_signal'].to_numpy()),
+                'short_run': ichimoku.trailing_run(signals['short_signal'].to_numpy())
+            }
+
+        full = time_call(full_state)
+        tail = time_call(lambda: ichimoku.tail_signal_state(df))
+        print(f"  {n:>8}  {full * 1000:>8.2f}ms  {tail * 1000:>8.2f}ms  {full / tail:>7.0f}x")
+
+
+def bench_sweep(symbols: int = 5, candles: int = 2 * 365 * 24):
+    """Time the default parameter grid"""
+    frames = {f'SYM{i}/USDT': make_ohlcv(candles, seed=i) for i in range(symbols)}
+    sweep = ParameterSweep()
+    tenkan_periods, kijun_periods, senkou_periods = default_grid()
+    df = frames['SYM0/USDT']
+
+    start = time.perf_counter()
+    table = sweep.run(frames, tenkan_periods, kijun_periods, senkou_periods)
+    elapsed = time.perf_counter() - start
+
+    per_calculate = time_call(lambda: IchimokuCloud().get_signals(IchimokuCloud().calculate(df)), repeat=1)
+    print(f"\n📊 Parameter sweep ({symbols} symbols x {candles} candles, {len(table)} combinations)")
+    print(f"  sweep: {elapsed:.2f}s  (calculate + get_signals per combination would take ~{per_calculate * symbols * len(table):.0f}s)")
+
+
+def bench_backtest(symbols: int = 65, candles: int = 365 * 24):
+    """Time a one-year hourly backtest across the scan universe"""
+    from backtest import Backtester
+
+    frames = {f'SYM{i}/USDT': make_ohlcv(candles, seed=i) for i in range(symbols)}
+    start = time.perf_counter()
+    result = Backtester().run(frames)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📊 Backtest ({symbols} symbols x {candles} candles)")
+    print(f"  {elapsed:.2f}s, {result.summary['total_trades']} trades")
+
+
+def bench_exchange_client(symbols: int = 65, candles: int = 100, latency: float = 0.02):
+    """Fetch the scan universe through both exchange clients from a local fake exchange"""
+    from config import config
+
+    names = [f'SYM{i}/USDT' for i in range(symbols)]
+    server = FakeExchangeServer(names, latency)
+    server.start()
+
+    async def fetch_all(provider):
+        # Load markets, open connections and warm the server's response cache
+        await asyncio.gather(*(provider.get_ohlcv(symbol, limit=candles) for symbol in names))
+        provider.candle_store.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(provider.get_ohlcv(symbol, limit=candles) for symbol in names))
+        elapsed = time.perf_counter() - start
+        await provider.close()
+        return elapsed
+
+    results = {}
+    try:
+        for client in ('thread', 'async'):
+            results[client] = asyncio.run(fetch_all(server.provider(client)))
+    finally:
+        server.stop()
+
+    print(f"\n📊 Exchange clients ({symbols} symbols x {candles} candles, {latency * 1000:.0f}ms latency, "
+          f"pool size {config.get_config().EXCHANGE_POOL_SIZE})")
+    print(f"  thread pool: {results['thread'] * 1000:8.1f}ms")
+    print(f"  asyncio:     {results['async'] * 1000:8.1f}ms  ({results['thread'] / results['async']:.1f}x)")
+
+
+def bench_single_flight(clients: int = 10, symbols: int = 8, latency: float = 0.02):
+    """Concurrent dashboard clients requesting the same charts from a cold cache"""
+    from request_scheduler import Priority
+
+    names = [f'SYM{i}/USDT' for i in range(symbols)]
+    server = FakeExchangeServer(names, latency)
+    server.start()
+
+    async def dashboards(provider):
+        await provider.get_ohlcv(names[0])  # Load markets
+        provider.candle_store.clear()
+        before = (server.requests, provider.single_flight.get_stats())
+        start = time.perf_counter()
+        await asyncio.gather(*(provider.get_ohlcv(symbol, priority=Priority.UI)
+                               for _ in range(clients) for symbol in names))
+        elapsed = time.perf_counter() - start
+        after = (server.requests, provider.single_flight.get_stats())
+        await provider.close()
+        return elapsed, after[0] - before[0], after[1]['saved'] - before[1]['saved']
+
+    try:
+        elapsed, requests, saved = asyncio.run(dashboards(server.provider()))
+    finally:
+        server.stop()
+
+    print(f"\n📊 Request coalescing ({clients} clients x {symbols} charts, cold cache)")
+    print(f"  {clients * symbols} requests -> {requests} exchange calls ({saved} saved) in {elapsed * 1000:.1f}ms")
+
+
+def bench_scheduler(scans: int = 65, interval: float = 0.005):
+    """Admission delay of an exit request queued behind a full scan"""
+    from request_scheduler import Priority, RequestScheduler
+
+    async def run():
+        scheduler = RequestScheduler(min_interval=interval)
+        order = []
+
+        async def request(name, priority):
+            start = time.perf_counter()
+            await scheduler.acquire(priority, 2)
+            order.append(name)
+            return time.perf_counter() - start
+
+        scan_tasks = [asyncio.create_task(request(f'scan{i}', Priority.SCAN)) for i in range(scans)]
+        await asyncio.sleep(interval * 3)  # The scan is under way when the exit arrives
+        exit_wait = await request('exit', Priority.EXIT)
+        await asyncio.gather(*scan_tasks)
+        return exit_wait, order.index('exit'), scheduler.get_stats()
+
+    exit_wait, position, stats = asyncio.run(run())
+
+    print(f"\n📊 Request scheduler ({scans} queued scan requests, {interval * 1000:.0f}ms spacing)")
+    print(f"  exit admitted after {exit_wait * 1000:.1f}ms ({position} requests ahead; "
+          f"~{(scans - position) * interval * 1000:.0f}ms in arrival order)")
+    print(f"  scan avg wait {stats['classes']['scan']['avg_wait_ms']:.1f}ms, weight used {stats['weight_used_1m']}")
+
+
+def bench_signal_cache(latency: float = 0.02):
+    """Rescans between candle closes against a replay exchange, with and without the signal cache"""
+    import trading_strategy as strategy_module
+    from config import config
+    from trading_strategy import TradingStrategy
+
+    long_symbols = [coin + '/USDT' for coin in config.get_config().LONG_COINS]
+    provider = replay_provider(long_symbols, latency)
+    strategy_module.data_provider, original = provider, strategy_module.data_provider
+    strategy = TradingStrategy()
+
+    async def scan(clear: bool):
+        if clear:
+            strategy.signal_cache.clear()
+        calls = provider.exchange.calls
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(None):
+            signals = await strategy.scan_for_signals()
+        return signals, time.perf_counter() - start, provider.exchange.calls - calls, dict(strategy.signal_cache_stats)
+
+    async def run():
+        await scan(clear=True)  # Warm the candle cache and universe
+        uncached = await scan(clear=True)
+        cached = await scan(clear=False)
+        await provider.close()
+        return uncached, cached
+
+    try:
+        uncached, cached = asyncio.run(run())
+    finally:
+        strategy_module.data_provider = original
+
+    print(f"\n📊 Signal cache (rescan between candle closes, {latency * 1000:.0f}ms per request)")
+    for name, (signals, elapsed, calls, stats) in (('re-evaluate all', uncached), ('cached', cached)):
+        print(f"  {name:<16} {elapsed * 1000:8.1f}ms  {calls:3d} exchange calls  "
+              f"{stats['hits']} hits / {stats['misses']} misses  ({len(signals)} signals)")
+
+
+def bench_exit_batch(position_counts: List[int] = (8, 32), latency: float = 0.02):
+    """Exit checks after a candle close, one position at a time vs concurrently"""
+    import trading_strategy as strategy_module
+    from trading_strategy import Position, PositionType, TradingStrategy
+
+    symbols = [f'SYN{i}/USDT' for i in range(max(position_counts))]
+
+    async def run(count: int, concurrent: bool, positions_file: str):
+        provider = replay_provider([], latency)
+        strategy_module.data_provider = provider
+        strategy = TradingStrategy(positions_file=positions_file)
+        strategy.portfolio.positions = {
+            symbol: Position(symbol=symbol, position_type=PositionType.LONG if i % 2 else PositionType.SHORT,
+                             entry_price=100.0, quantity=1.0, leverage=1.0, entry_time=datetime.now())
+            for i, symbol in enumerate(symbols[:count])}
+        strategy.rebuild_aggregates()
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(None):
+            if concurrent:
+                closed = await strategy.check_exits()
+            else:
+                # The original loop: check, then close, one position after another
+                closed = []
+                for symbol in list(strategy.portfolio.positions):
+                    if await strategy.check_exit_conditions(symbol) and await strategy.close_position(symbol):
+                        closed.append(symbol)
+        elapsed = time.perf_counter() - start
+        await provider.close()
+        return elapsed, closed
+
+    original = strategy_module.data_provider
+    print(f"\n📊 Exit checks after a candle close ({latency * 1000:.0f}ms per request, cold cache)")
+    print(f"  {'positions':>9}  {'sequential':>10}  {'concurrent':>10}  {'closed':>6}")
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            for count in position_counts:
+                sequential = asyncio.run(run(count, False, os.path.join(scratch, f'sequential_{count}.json')))
+                concurrent = asyncio.run(run(count, True, os.path.join(scratch, f'concurrent_{count}.json')))
+                print(f"  {count:>9}  {sequential[0] * 1000:>8.0f}ms  {concurrent[0] * 1000:>8.0f}ms  {len(concurrent[1]):>6}")
+    finally:
+        strategy_module.data_provider = original
+
+
+def bench_trade_journal(history_sizes: List[int] = (1_000, 10_000, 50_000)):
+    """Cost of saving one trade: full positions.json rewrite vs a journal append"""
+    from trade_journal import TradeJournal
+    from trading_strategy import Position, PositionStatus, PositionType, TradingStrategy
+
+    now = datetime.now()
+    print("\n📊 Saving one closed trade (positions.json rewrite vs journal append)")
+    print(f"  {'trades':>8}  {'rewrite':>10}  {'append':>10}  {'no fsync':>10}")
+    with tempfile.TemporaryDirectory() as scratch:
+        for count in history_sizes:
+            trades = [Position(
+                symbol=f'SYM{i % 50}/USDT', position_type=PositionType.LONG if i % 2 else PositionType.SHORT,
+                entry_price=100.0, quantity=1.0, leverage=1.0, entry_time=now, status=PositionStatus.CLOSED,
+                exit_price=101.0, exit_time=now, pnl=1.0, pnl_percentage=1.0) for i in range(count)]
+            path = os.path.join(scratch, f'positions_{count}.json')
+            timings = [time_call(lambda: legacy_save_positions(path, trades))]
+            for fsync in ('always', 'never'):
+                journal = TradeJournal(path, fsync=fsync)
+                journal.compact([TradingStrategy._position_to_dict(pos) for pos in trades])
+                record = TradingStrategy._position_to_dict(trades[-1])
+                timings.append(time_call(lambda: journal.append([('close', record)]), repeat=20))
+            print(f"  {count:>8}  {timings[0] * 1000:>8.1f}ms  {timings[1] * 1000:>8.2f}ms  {timings[2] * 1000:>8.3f}ms")
+
+
+def report():
+    """Speedup reports for the optimized paths"""
+    bench_chikou(SIZES)
+    bench_stream(SIZES)
+    bench_panel([65, 500])
+    bench_lean()
+    bench_tail(SIZES)
+    bench_sweep()
+    bench_backtest()
+    bench_exchange_client()
+    bench_single_flight()
+    bench_scheduler()
+    bench_signal_cache()
+    bench_exit_batch()
+    bench_trade_journal()
+
+
+# Timing suite
+
+SUITE_SIZES = [100, 1_000, 10_000]
+DEFAULT_THRESHOLD = 0.25  # Flag cases more than 25% slower than the baseline
+
+
+class StubDataProvider:
+    """
+    Offline stand-in for data_provider with seeded candles and prices
+
+    Candles end at the current (forming) hour, as the exchange returns them.
+    """
+
+    def __init__(self, long_symbols: List[str], short_count: int = 50, candles: int = 1_000):
+        self.latency = 0.0  # Simulated round trip per OHLCV request, in seconds
+        self.long_symbols = long_symbols
+        self.short_symbols = [f'SHORT{i}/USDT' for i in range(short_count)]
+        end = datetime.now().replace(minute=0, second=0, microsecond=0)
+        start = (end - timedelta(hours=candles - 1)).strftime('%Y-%m-%d %H:%M')
+        self.frames = {symbol: make_ohlcv(candles, seed=i, start=start)
+                       for i, symbol in enumerate(self.long_symbols + self.short_symbols)}
+
+    def install(self, provider):
+        """Replace the exchange-backed methods on a DataProvider instance"""
+        provider.get_ohlcv = self.get_ohlcv
+        provider.get_current_price = self.get_current_price
+        provider.get_multiple_prices = self.get_multiple_prices
+        provider.get_shortable_symbols = self.get_shortable_symbols
+
+    async def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100, priority=None) -> pd.DataFrame:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        df = self.frames.get(symbol)
+        return df.iloc[-limit:].copy() if df is not None else pd.DataFrame()
+
+    async def get_current_price(self, symbol: str, priority=None) -> float:
+        df = self.frames.get(symbol)
+        return float(df['close'].iloc[-1]) if df is not None else 0.0
+
+    async def get_multiple_prices(self, symbols: List[str], priority=None) -> Dict[str, float]:
+        return {symbol: await self.get_current_price(symbol) for symbol in symbols if symbol in self.frames}
+
+    async def get_shortable_symbols(self, min_volume: float = 1000000, limit: int = 100) -> List[str]:
+        return self.short_symbols[:limit]
+
+
+def measure(func: Callable, repeat: int) -> Dict:
+    """Best and median wall-clock time over `repeat` runs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {'best': min(timings), 'median': statistics.median(timings), 'repeat': repeat}
+
+
+def suite_cases() -> Dict[str, Callable]:
+    """Named benchmark cases; names include the data size"""
+    # Imported here so the live modules only ever see the working directory chosen by run_suite
+    from config import config
+    from data_provider import data_provider
+    from trading_strategy import Position, PositionStatus, PositionType, TradingStrategy
+    import main
+
+    loop = asyncio.new_event_loop()
+    ichimoku = IchimokuCloud()
+    long_symbols = [coin + '/USDT' for coin in config.get_config().LONG_COINS]
+    stub = StubDataProvider(long_symbols, candles=max(SUITE_SIZES))
+    stub.install(data_provider)
+    cases = {}
+
+    for n in SUITE_SIZES:
+        df = make_ohlcv(n)
+        calculated = ichimoku.calculate(df)
+        cases[f'calculate[{n}]'] = lambda df=df: ichimoku.calculate(df)
+        cases[f'calculate_lean[{n}]'] = lambda df=df: ichimoku.calculate(df, lean=True)
+        cases[f'get_signals[{n}]'] = lambda calculated=calculated: ichimoku.get_signals(calculated)
+        cases[f'exit_checks[{n}]'] = lambda calculated=calculated: (
+            ichimoku.check_stop_loss(calculated, 'long'), ichimoku.check_target(calculated, 'long'),
+            ichimoku.check_stop_loss(calculated, 'short'), ichimoku.check_target(calculated, 'short'))
+
+    strategy = TradingStrategy()
+
+    def scan(cached: bool = False):
+        if not cached:
+            strategy.signal_cache.clear()
+        loop.run_until_complete(strategy.scan_for_signals())
+
+    def scan_with_latency():
+        stub.latency = 0.02
+        try:
+            scan()
+        finally:
+            stub.latency = 0.0
+
+    cases[f'scan_for_signals[{len(stub.frames)}]'] = scan
+    cases[f'scan_for_signals_cached[{len(stub.frames)}]'] = lambda: scan(cached=True)
+
+    cases[f'scan_for_signals_20ms_latency[{len(stub.frames)}]'] = scan_with_latency
+
+    for history in (100, 10_000):
+        summary_strategy = TradingStrategy()
+        now = datetime.now()
+        for i, symbol in enumerate(list(stub.frames)[:8]):
+            summary_strategy.portfolio.positions[symbol] = Position(
+                symbol=symbol, position_type=PositionType.LONG if i % 2 else PositionType.SHORT,
+                entry_price=100.0, quantity=1.0, leverage=1.0, entry_time=now)
+        summary_strategy.trades_history = [
+            Position(symbol=long_symbols[i % len(long_symbols)], position_type=PositionType.LONG if i % 2 else PositionType.SHORT,
+                     entry_price=100.0, quantity=1.0, leverage=1.0, entry_time=now, status=PositionStatus.CLOSED,
+                     exit_price=101.0, exit_time=now, pnl=1.0 if i % 3 else -1.0, pnl_percentage=1.0)
+            for i in range(history)]
+        summary_strategy.rebuild_aggregates()
+        cases[f'get_portfolio_summary[{history}]'] = lambda s=summary_strategy: loop.run_until_complete(s.get_portfolio_summary())
+
+    for n in (100, 1_000):
+        cases[f'chart_data[{n}]'] = lambda n=n: loop.run_until_complete(main.get_chart_data(long_symbols[0], limit=n))
+
+    cases.update(replay_cases(loop, long_symbols))
+    return cases
+
+
+def replay_cases(loop, long_symbols: List[str], latency: float = 0.02) -> Dict[str, Callable]:
+    """
+    Full-stack cases against a DataProvider on a synthetic ReplayExchange
+
+    Unlike the stubbed cases these go through the scheduler, request
+    coalescing and candle cache, with a simulated round trip per call.
+    """
+    import main
+    import trading_strategy as strategy_module
+    from trading_strategy import Position, PositionType, TradingStrategy
+
+    provider = replay_provider(long_symbols, latency)
+    strategy = TradingStrategy()
+    now = datetime.now()
+    for i, symbol in enumerate(long_symbols[:8]):
+        strategy.portfolio.positions[symbol] = Position(
+            symbol=symbol, position_type=PositionType.LONG if i % 2 else PositionType.SHORT,
+            entry_price=100.0, quantity=1.0, leverage=1.0, entry_time=now)
+    strategy.rebuild_aggregates()
+
+    def run(coroutine_function, cold: bool = True):
+        # Point the strategy and API modules at the replay provider for this call
+        originals = strategy_module.data_provider, main.data_provider, main.trading_strategy
+        strategy_module.data_provider = main.data_provider = provider
+        main.trading_strategy = strategy
+        try:
+            if cold:
+                provider.candle_store.clear()
+                provider.tickers_timestamp = 0.0
+                strategy.signal_cache.clear()
+            loop.run_until_complete(coroutine_function())
+        finally:
+            strategy_module.data_provider, main.data_provider, main.trading_strategy = originals
+
+    async def trading_cycle():
+        for symbol in list(strategy.portfolio.positions):
+            await strategy.check_exit_conditions(symbol)
+        await strategy.scan_for_signals()
+        await strategy.update_portfolio_value()
+
+    universe = len(long_symbols) + 50
+    latency_ms = f'{latency * 1000:.0f}ms'
+    return {
+        f'replay_scan_cold_{latency_ms}[{universe}]': lambda: run(strategy.scan_for_signals),
+        f'replay_scan_warm[{universe}]': lambda: run(strategy.scan_for_signals, cold=False),
+        f'replay_trading_cycle_{latency_ms}[{universe}]': lambda: run(trading_cycle),
+        f'replay_api_portfolio_{latency_ms}[8]': lambda: run(main.get_portfolio),
+    }
+
+
+def run_suite(repeat: int = 5, only: str = None) -> Dict:
+    """
+    Run every benchmark case in a scratch directory
+
+    Args:
+        repeat: Runs per case
+        only: Substring filter on case names
+
+    Returns:
+        Results document with metadata and per-case timings
+    """
+    cwd = os.getcwd()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as scratch:
+        # positions.json / equity_history.json writes land here, not in the live files
+        os.chdir(scratch)
+        try:
+            results = {}
+            # The strategy logs every scan; keep that out of the report
+            with open(os.devnull, 'w') as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    cases = suite_cases()
+                for name, func in cases.items():
+                    if only and only not in name:
+                        continue
+                    with contextlib.redirect_stdout(devnull):
+                        func()  # Warm up caches and imports
+                        results[name] = measure(func, repeat)
+                    print(f"  {name:<36} {results[name]['best'] * 1000:>10.3f}ms")
+        finally:
+            os.chdir(cwd)
+
+    return {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'results': results
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Compare best timings against a baseline
+
+    Args:
+        current: Results document from run_suite
+        baseline: Saved results document
+        threshold: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        Names of cases slower than the baseline by more than the threshold
+    """
+    regressions = []
+    print(f"\n  {'case':<36} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            print(f"  {name:<36} {'-':>10} {result['best'] * 1000:>8.3f}ms {'new':>8}")
+            continue
+
+        before = baseline['results'][name]['best']
+        change = result['best'] / before - 1 if before > 0 else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  ⚠️ SLOWER'
+        print(f"  {name:<36} {before * 1000:>8.3f}ms {result['best'] * 1000:>8.3f}ms {change * 100:>+7.1f}%{flag}")
+
+    return regressions
+
+
+def main_cli(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('report', help='speedup reports (default)')
+
+    run_parser = subparsers.add_parser('run', help='run the timing suite')
+    run_parser.add_argument('-o', '--output', default='benchmark_results.json', help='results file')
+
+    compare_parser = subparsers.add_parser('compare', help='run the timing suite and compare with a baseline')
+    compare_parser.add_argument('baseline', help='results file from a previous run')
+    compare_parser.add_argument('-o', '--output', help='also save the new results here')
+    compare_parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='allowed relative slowdown (default: %(default)s)')
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument('-r', '--repeat', type=int, default=5, help='runs per case')
+        sub.add_argument('-k', '--only', help='only run cases whose name contains this')
+
+    args = parser.parse_args(argv)
+
+    if args.command in (None, 'report'):
+        report()
+        return 0
+
+    print("\n⏱️  Running benchmark suite")
+    current = run_suite(repeat=args.repeat, only=args.only)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+    if args.command == 'compare':
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            return 1
+        print("\n✅ No slowdowns beyond threshold")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,319 @@
+"""
+On-disk store of closed candles, one memory-mapped file per symbol/timeframe
+
+Usage:
+    python candle_db.py backfill [--days 365] [--timeframe 1h] [--symbols BTC/USDT ETH/USDT]
+    python candle_db.py gaps [--timeframe 1h]
+
+Each file is a flat array of float64 records (timestamp ms, open, high,
+low, close, volume) in timestamp order. New candles are appended; files
+are only rewritten (atomically) when a backfill fills history before or
+inside the stored range.
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import config
+
+FIELDS = 6  # timestamp, open, high, low, close, volume
+RECORD_BYTES = FIELDS * 8
+
+
+class CandleDB:
+    def __init__(self, directory: str = None):
+        self.directory = directory or config.get_config().CANDLE_DB_DIR
+
+    def path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.directory, timeframe, symbol.replace('/', '_') + '.bin')
+
+    def symbols(self, timeframe: str) -> List[str]:
+        """Symbols with stored candles for a timeframe"""
+        folder = os.path.join(self.directory, timeframe)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name[:-4].replace('_', '/') for name in os.listdir(folder) if name.endswith('.bin'))
+
+    def records(self, symbol: str, timeframe: str) -> np.ndarray:
+        """
+        Memory-mapped (n x 6) view of the stored candles (empty if none)
+
+        A trailing partial record left by an interrupted write is ignored.
+        """
+        path = self.path(symbol, timeframe)
+        if not os.path.exists(path):
+            return np.empty((0, FIELDS))
+
+        count = os.path.getsize(path) // RECORD_BYTES
+        if count == 0:
+            return np.empty((0, FIELDS))
+        return np.memmap(path, dtype=np.float64, mode='r', shape=(count, FIELDS))
+
+    def read(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Read the most recent stored candles
+
+        Args:
+            symbol: Trading pair
+            timeframe: Timeframe
+            limit: Number of candles (all if None)
+
+        Returns:
+            DataFrame shaped like DataProvider.get_ohlcv output (empty if nothing stored)
+        """
+        records = self.records(symbol, timeframe)
+        if limit is not None:
+            records = records[-limit:] if limit > 0 else records[:0]
+        return self._to_frame(records)
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Timestamp (ms) of the newest stored candle"""
+        records = self.records(symbol, timeframe)
+        return int(records[-1, 0]) if len(records) else None
+
+    def append(self, symbol: str, timeframe: str, candles: pd.DataFrame, now_ms: Optional[int] = None) -> int:
+        """
+        Append closed candles newer than the last stored one
+
+        Args:
+            symbol: Trading pair
+            timeframe: Timeframe
+            candles: OHLCV DataFrame indexed by timestamp
+            now_ms: Current time in ms (candles still forming at this time are skipped)
+
+        Returns:
+            Number of candles written
+        """
+        records = self._to_records(candles)
+        if not len(records):
+            return 0
+
+        timeframe_ms = self._timeframe_ms(timeframe)
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        last = self.last_timestamp(symbol, timeframe)
+
+        closed = records[:, 0] + timeframe_ms <= now_ms
+        newer = records[:, 0] > last if last is not None else np.ones(len(records), dtype=bool)
+        records = records[closed & newer]
+        if not len(records):
+            return 0
+
+        path = self.path(symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._truncate_partial(path)
+        with open(path, 'ab') as f:
+            f.write(np.ascontiguousarray(records, dtype=np.float64).tobytes())
+        return len(records)
+
+    def merge(self, symbol: str, timeframe: str, candles: pd.DataFrame, now_ms: Optional[int] = None) -> int:
+        """
+        Merge closed candles at any position, rewriting the file atomically
+
+        Args:
+            symbol: Trading pair
+            timeframe: Timeframe
+            candles: OHLCV DataFrame indexed by timestamp
+            now_ms: Current time in ms (candles still forming at this time are skipped)
+
+        Returns:
+            Number of candles added
+        """
+        new_records = self._to_records(candles)
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        new_records = new_records[new_records[:, 0] + self._timeframe_ms(timeframe) <= now_ms]
+
+        existing = np.array(self.records(symbol, timeframe))
+        combined = np.concatenate([existing, new_records]) if len(existing) else new_records
+        if not len(combined):
+            return 0
+
+        # Keep the first copy of each timestamp (stored candles win), in time order
+        _, first = np.unique(combined[:, 0], return_index=True)
+        combined = combined[np.sort(first)]
+        combined = combined[np.argsort(combined[:, 0], kind='stable')]
+        added = len(combined) - len(existing)
+        if added == 0:
+            return 0
+
+        path = self.path(symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(np.ascontiguousarray(combined, dtype=np.float64).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return added
+
+    @classmethod
+    def is_contiguous(cls, candles: pd.DataFrame, timeframe: str) -> bool:
+        """Whether candles (as returned by read) are consecutive, with no missing candle between them"""
+        steps = np.diff(candles.index.asi8 // 1_000_000)  # ns -> ms
+        return bool(np.all(steps == cls._timeframe_ms(timeframe)))
+
+    def find_gaps(self, symbol: str, timeframe: str) -> List[Tuple[int, int]]:
+        """
+        Missing ranges inside the stored history
+
+        Returns:
+            List of (first missing timestamp, last missing timestamp) in ms
+        """
+        timestamps = self.records(symbol, timeframe)[:, 0]
+        timeframe_ms = self._timeframe_ms(timeframe)
+        steps = np.diff(timestamps)
+        return [(int(timestamps[i] + timeframe_ms), int(timestamps[i + 1] - timeframe_ms))
+                for i in np.flatnonzero(steps > timeframe_ms)]
+
+    @staticmethod
+    def _timeframe_ms(timeframe: str) -> int:
+        return int(pd.Timedelta(timeframe).total_seconds() * 1000)
+
+    @staticmethod
+    def _truncate_partial(path: str):
+        """Drop a partial trailing record left by an interrupted append"""
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            if size % RECORD_BYTES:
+                with open(path, 'r+b') as f:
+                    f.truncate(size - size % RECORD_BYTES)
+
+    @staticmethod
+    def _to_records(candles: pd.DataFrame) -> np.ndarray:
+        if candles.empty:
+            return np.empty((0, FIELDS))
+        timestamps = candles.index.asi8 // 1_000_000  # ns -> ms
+        values = candles[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64)
+        return np.column_stack([timestamps.astype(np.float64), values])
+
+    @staticmethod
+    def _to_frame(records: np.ndarray) -> pd.DataFrame:
+        index = pd.DatetimeIndex(pd.to_datetime(np.asarray(records[:, 0], dtype=np.int64), unit='ms'), name='timestamp')
+        return pd.DataFrame(np.asarray(records[:, 1:]), index=index,
+                            columns=['open', 'high', 'low', 'close', 'volume'])
+
+
+async def backfill(db: CandleDB, symbols: List[str], timeframe: str, since_ms: int,
+                   concurrency: int = 4, page_size: int = 1000) -> Dict[str, int]:
+    """
+    Download history from since_ms to now into the database
+
+    Pages are fetched concurrently (bounded by `concurrency` and the data
+    provider's rate limit), both across symbols and within a symbol; only
+    ranges not already stored are requested.
+
+    Args:
+        db: Candle database
+        symbols: Trading pairs
+        timeframe: Timeframe
+        since_ms: Start of the history to build, in ms
+        concurrency: Maximum requests in flight
+        page_size: Candles per request
+
+    Returns:
+        Dictionary of symbol -> candles added
+    """
+    from data_provider import data_provider
+
+    timeframe_ms = db._timeframe_ms(timeframe)
+    now_ms = data_provider.exchange.milliseconds()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_page(symbol: str, start: int) -> pd.DataFrame:
+        async with semaphore:
+            try:
+                return await data_provider.fetch_ohlcv(symbol, timeframe, start, page_size)
+            except Exception as e:
+                print(f"Error fetching {symbol} from {pd.to_datetime(start, unit='ms')}: {e}")
+                return pd.DataFrame()
+
+    async def fill(symbol: str) -> int:
+        records = db.records(symbol, timeframe)
+        ranges = db.find_gaps(symbol, timeframe)
+        if len(records):
+            first, last = int(records[0, 0]), int(records[-1, 0])
+            if since_ms < first:
+                ranges.insert(0, (since_ms, first - timeframe_ms))
+            ranges.append((last + timeframe_ms, now_ms))
+        else:
+            ranges.append((since_ms, now_ms))
+
+        starts = [start for range_start, range_end in ranges
+                  for start in range(range_start, range_end + 1, page_size * timeframe_ms)]
+        pages = await asyncio.gather(*(fetch_page(symbol, start) for start in starts))
+        pages = [page for page in pages if not page.empty]
+        if not pages:
+            return 0
+        return db.merge(symbol, timeframe, pd.concat(pages), now_ms=now_ms)
+
+    results = await asyncio.gather(*(fill(symbol) for symbol in symbols))
+    return dict(zip(symbols, results))
+
+
+async def scan_universe() -> List[str]:
+    """Symbols the live strategy scans"""
+    from data_provider import data_provider
+
+    symbols = [coin + '/USDT' for coin in config.get_config().LONG_COINS]
+    return symbols + await data_provider.get_shortable_symbols(limit=50)
+
+
+async def backfill_universe(db: CandleDB, symbols: Optional[List[str]], timeframe: str, since_ms: int,
+                            concurrency: int = 4) -> Dict[str, int]:
+    """
+    Backfill `symbols` (default: the live scan universe), then close the data provider
+
+    Everything runs on one event loop, the one the provider's clients and
+    scheduler were created on.
+    """
+    from data_provider import data_provider
+
+    try:
+        symbols = symbols or await scan_universe()
+        print(f"📥 Backfilling {len(symbols)} symbol(s) of {timeframe} candles...")
+        return await backfill(db, symbols, timeframe, since_ms, concurrency=concurrency)
+    finally:
+        await data_provider.close()
+
+
+def main_cli(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    backfill_parser = subparsers.add_parser('backfill', help='download history into the database')
+    backfill_parser.add_argument('--days', type=int, default=365, help='history to build (default: %(default)s)')
+    backfill_parser.add_argument('--symbols', nargs='*', help='symbols (default: the live scan universe)')
+    backfill_parser.add_argument('--concurrency', type=int, default=4, help='requests in flight (default: %(default)s)')
+
+    subparsers.add_parser('gaps', help='list missing ranges in stored history')
+
+    for sub in subparsers.choices.values():
+        sub.add_argument('--timeframe', default=config.get_config().TIMEFRAME)
+
+    args = parser.parse_args(argv)
+    db = CandleDB()
+
+    if args.command == 'backfill':
+        since_ms = int((time.time() - args.days * 86400) * 1000)
+        start = time.time()
+        added = asyncio.run(backfill_universe(db, args.symbols, args.timeframe, since_ms,
+                                              concurrency=args.concurrency))
+        for symbol, count in added.items():
+            print(f"  {symbol}: +{count} candles ({len(db.records(symbol, args.timeframe))} stored)")
+        print(f"✅ Backfill complete in {time.time() - start:.1f}s")
+    else:
+        for symbol in db.symbols(args.timeframe):
+            gaps = db.find_gaps(symbol, args.timeframe)
+            if gaps:
+                print(f"  {symbol}: {len(gaps)} gap(s)")
+                for first, last in gaps:
+                    print(f"    {pd.to_datetime(first, unit='ms')} -> {pd.to_datetime(last, unit='ms')}")
+        print("✅ Gap check complete")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+@dataclass
+class CandleSeries:
+    candles: pd.DataFrame
+    refreshed_at: float
+    seed_size: int
+
+
+class CandleStore:
+    """
+    One canonical candle series per (symbol, timeframe), bounded by LRU eviction
+
+    Stored frames are backed by read-only arrays, so callers can be handed
+    slices of them without copying; any attempt to write raises instead of
+    corrupting the cache.
+    """
+
+    def __init__(self, max_series: int = 200):
+        self.max_series = max_series
+        self._series: OrderedDict[Tuple[str, str], CandleSeries] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, symbol: str, timeframe: str) -> Optional[CandleSeries]:
+        """Look up a series and mark it as recently used"""
+        key = (symbol, timeframe)
+        series = self._series.get(key)
+        if series is not None:
+            self._series.move_to_end(key)
+        return series
+
+    def put(self, symbol: str, timeframe: str, candles: pd.DataFrame, seed_size: int) -> CandleSeries:
+        """
+        Store a series, evicting the least recently used ones beyond max_series
+
+        Args:
+            symbol: Trading pair
+            timeframe: Timeframe
+            candles: OHLCV DataFrame indexed by timestamp
+            seed_size: Number of candles the series was last seeded with
+
+        Returns:
+            The stored series (with a read-only copy of the candles)
+        """
+        key = (symbol, timeframe)
+        series = CandleSeries(candles=self._freeze(candles), refreshed_at=time.time(), seed_size=seed_size)
+        self._series[key] = series
+        self._series.move_to_end(key)
+
+        while len(self._series) > self.max_series:
+            self._series.popitem(last=False)
+            self.evictions += 1
+
+        return series
+
+    def touch(self, symbol: str, timeframe: str):
+        """Mark a series as refreshed without new data"""
+        series = self._series.get((symbol, timeframe))
+        if series is not None:
+            series.refreshed_at = time.time()
+
+    def clear(self):
+        self._series.clear()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and size"""
+        lookups = self.hits + self.misses
+        return {
+            'series': len(self._series),
+            'max_series': self.max_series,
+            'candles': sum(len(series.candles) for series in self._series.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0.0,
+            'evictions': self.evictions
+        }
+
+    @staticmethod
+    def _freeze(candles: pd.DataFrame) -> pd.DataFrame:
+        """Copy the candles into a single read-only float block"""
+        values = np.array(candles[OHLCV_COLUMNS].to_numpy(dtype=float), order='F')
+        values.flags.writeable = False
+        return pd.DataFrame(values, index=candles.index, columns=OHLCV_COLUMNS, copy=False)
@@ -39,6 +39,54 @@ class TradingConfig(BaseModel):
     TIMEFRAME: str = "1h"
     MIN_VOLUME_THRESHOLD: float = 1000000  # Minimum 24h volume in USD
 
+    # Scan settings
+    SCAN_CONCURRENCY: int = 8  # Symbols fetched in parallel during a scan
+    SCAN_TIMEOUT_SECONDS: float = 120.0  # Budget per scan; slower symbols are skipped
+
+    # Trading loop schedule
+    SCAN_INTERVAL_SECONDS: float = 300.0  # Entry scans run this often
+    EXIT_CHECK_DELAY_SECONDS: float = 10.0  # Exit checks run this long after each hourly candle close
+    REVALUE_INTERVAL_SECONDS: float = 60.0  # Portfolio revaluation between scans
+
+    # Data settings
+    TICKER_CACHE_SECONDS: float = 10.0  # Max age of the all-tickers snapshot used for prices and volumes
+    TICKER_RETRY_SECONDS: float = 5.0  # After a failed tickers fetch, serve the previous snapshot this long before retrying
+    PRICE_SNAPSHOT_SECONDS: float = 5.0  # Max age of the open-position marks shared by portfolio valuations
+    OHLCV_CACHE_SECONDS: float = 60.0  # How often a cached candle series is refreshed from the exchange
+    OHLCV_MAX_CANDLES: int = 1000  # Candles kept per symbol/timeframe (also the exchange's max per request)
+    CANDLE_STORE_MAX_SERIES: int = 200  # Symbol/timeframe series kept in memory (least recently used evicted)
+    UNIVERSE_REFRESH_SECONDS: float = 300.0  # How often the background task reloads markets and re-ranks volumes
+    UNIVERSE_RETRY_SECONDS: float = 30.0  # After a failed first universe load, callers wait this long before trying again
+    CANDLE_DB_ENABLED: bool = True  # Persist closed candles to disk and warm-start from them
+    CANDLE_DB_DIR: str = "candle_db"  # Directory of the on-disk candle database
+
+    # Trade journal
+    TRADE_JOURNAL_FSYNC: str = "always"  # "always" (fsync every save) or "never" (leave flushing to the OS)
+    TRADE_JOURNAL_COMPACT_EVERY: int = 1000  # Journal records before they are folded into positions.json
+
+    # Debugging
+    PORTFOLIO_CONSISTENCY_CHECKS: bool = False  # Recompute portfolio aggregates from scratch after every change and compare
+
+    # Exchange client
+    EXCHANGE_BACKEND: str = "live"  # "live", "record" (live, saving responses) or "replay" (recorded/synthetic, offline)
+    EXCHANGE_RECORD_DIR: str = "exchange_recordings"  # Where record mode saves and replay mode reads responses
+    EXCHANGE_RECORD_FLUSH_SECONDS: float = 10.0  # Record mode writes buffered responses at least this often
+    REPLAY_LATENCY_SECONDS: float = 0.0  # Simulated round trip per replayed call
+    REPLAY_ERROR_RATE: float = 0.0  # Fraction of replayed calls that fail with a timeout
+    EXCHANGE_CLIENT: str = "thread"  # "thread" (sync ccxt in a worker pool) or "async" (ccxt.async_support on the event loop; live only)
+    EXCHANGE_POOL_SIZE: int = 10  # Worker threads / keep-alive HTTP connections to the exchange
+    EXCHANGE_WEIGHT_PER_MINUTE: int = 5000  # Request-weight budget (Binance allows 6000/min per IP)
+
+    # Failure handling
+    SYMBOL_BACKOFF_BASE_SECONDS: float = 60.0  # First retry delay for a failing symbol (doubles per failure)
+    SYMBOL_BACKOFF_MAX_SECONDS: float = 21600.0  # Longest a failing symbol is skipped (6 hours)
+    TRADING_LOOP_BACKOFF_BASE_SECONDS: float = 1.0  # Pause after an error in the trading loop (doubles per consecutive error)
+    TRADING_LOOP_BACKOFF_MAX_SECONDS: float = 60.0  # Longest pause after repeated trading loop errors
+    BREAKER_WINDOW_SECONDS: float = 60.0  # Window over which the exchange error rate is measured
+    BREAKER_MIN_REQUESTS: int = 20  # Requests in the window before the breaker can open
+    BREAKER_ERROR_RATE: float = 0.5  # Error rate that opens the breaker
+    BREAKER_COOLDOWN_SECONDS: float = 120.0  # How long non-critical requests are paused
+
     # API settings
     BINANCE_API_KEY: Optional[str] = os.getenv("BINANCE_API_KEY")
     BINANCE_SECRET_KEY: Optional[str] = os.getenv("BINANCE_SECRET_KEY")
@@ -1,130 +1,514 @@
 import ccxt
+import ccxt.async_support as ccxt_async
+import aiohttp
+import certifi
+import ssl
+import requests
 import pandas as pd
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import time
 from config import config
+from candle_store import CandleStore
+from candle_db import CandleDB
+from request_scheduler import Priority, REQUEST_WEIGHTS, RequestScheduler
+from single_flight import SingleFlight
+from exchange_adapters import RecordingExchange, ReplayExchange
+from failure_tracker import CircuitBreaker, CircuitOpenError, SymbolBackoff, SymbolSuppressedError
+
+# Exchange methods whose first argument is the symbol they fail for
+SYMBOL_METHODS = ('fetch_ohlcv', 'fetch_ticker')
 
 class DataProvider:
     def __init__(self):
-        self.exchange = ccxt.binance({
+        config_data = config.get_config()
+
+        # Exchange backend: live Binance, live with responses recorded to disk,
+        # or recorded/synthetic responses replayed offline
+        backend = config_data.EXCHANGE_BACKEND
+        if backend not in ('live', 'record', 'replay'):
+            raise ValueError(f"EXCHANGE_BACKEND must be 'live', 'record' or 'replay', got {backend!r}")
+        if backend == 'replay':
+            self.exchange = ReplayExchange(directory=config_data.EXCHANGE_RECORD_DIR,
+                                           latency=config_data.REPLAY_LATENCY_SECONDS,
+                                           error_rate=config_data.REPLAY_ERROR_RATE)
+        else:
+            live_exchange = ccxt.binance(self._exchange_config())
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=config_data.EXCHANGE_POOL_SIZE)
+            live_exchange.session.mount('https://', adapter)
+            live_exchange.session.mount('http://', adapter)
+            self.exchange = (RecordingExchange(live_exchange, config_data.EXCHANGE_RECORD_DIR,
+                                               flush_interval=config_data.EXCHANGE_RECORD_FLUSH_SECONDS)
+                             if backend == 'record' else live_exchange)
+
+        # Exchange client: sync ccxt in a dedicated worker pool, or ccxt.async_support
+        # on the event loop with a shared keep-alive session (created on first use)
+        self.client = config_data.EXCHANGE_CLIENT
+        if self.client not in ('thread', 'async'):
+            raise ValueError(f"EXCHANGE_CLIENT must be 'thread' or 'async', got {self.client!r}")
+        if self.client == 'async' and backend != 'live':
+            raise ValueError("EXCHANGE_CLIENT 'async' requires EXCHANGE_BACKEND 'live'")
+        self.async_exchange: Optional[ccxt_async.Exchange] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._executor = ThreadPoolExecutor(max_workers=config_data.EXCHANGE_POOL_SIZE,
+                                            thread_name_prefix='exchange')
+
+        # Candle series per (symbol, timeframe), shared by every request length
+        self.candle_store = CandleStore(max_series=config.get_config().CANDLE_STORE_MAX_SERIES)
+
+        # Closed candles on disk: warm starts and offline backtests
+        self.candle_db = CandleDB() if config.get_config().CANDLE_DB_ENABLED else None
+
+        # Admits requests by priority class, spaced by the exchange rate limit and
+        # within the request-weight budget (ccxt's own throttle is per call and
+        # does not coordinate executor threads)
+        self.scheduler = RequestScheduler(weight_per_minute=config_data.EXCHANGE_WEIGHT_PER_MINUTE,
+                                          min_interval=self.exchange.rateLimit / 1000)
+
+        # Identical concurrent calls share one request
+        self.single_flight = SingleFlight()
+
+        # Failing symbols back off; a spike in errors pauses non-critical requests
+        self.symbol_backoff = SymbolBackoff(base_delay=config_data.SYMBOL_BACKOFF_BASE_SECONDS,
+                                            max_delay=config_data.SYMBOL_BACKOFF_MAX_SECONDS)
+        self.circuit_breaker = CircuitBreaker(window=config_data.BREAKER_WINDOW_SECONDS,
+                                              min_requests=config_data.BREAKER_MIN_REQUESTS,
+                                              error_rate=config_data.BREAKER_ERROR_RATE,
+                                              cooldown=config_data.BREAKER_COOLDOWN_SECONDS)
+
+        # Snapshot of every ticker from one fetch_tickers call
+        self.tickers: Dict[str, Dict] = {}
+        self.tickers_timestamp = 0.0
+        self._tickers_failed_at = 0.0  # Last failed refresh, so callers don't retry it back to back
+        self._tickers_lock: Optional[asyncio.Lock] = None
+
+        # Tradable USDT universe and its volume ranking, rebuilt by a background task
+        self.universe: List[str] = []
+        self.volume_ranking: List[Tuple[str, float]] = []
+        self.universe_timestamp = 0.0
+        self._universe_failed_at = 0.0
+        self._universe_lock: Optional[asyncio.Lock] = None
+        self._universe_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _exchange_config() -> Dict:
+        return {
             'apiKey': config.get_config().BINANCE_API_KEY,
             'secret': config.get_config().BINANCE_SECRET_KEY,
             'enableRateLimit': True,
             'options': {
                 'defaultType': 'spot',
+                'fetchMarkets': ['spot'],  # Only spot markets are traded; skip the futures market lists
             }
-        })
+        }
+
+    def _get_async_exchange(self) -> ccxt_async.Exchange:
+        """Async client bound to the running loop, sharing one pooled keep-alive session"""
+        if self.async_exchange is None:
+            connector = aiohttp.TCPConnector(limit=config.get_config().EXCHANGE_POOL_SIZE,
+                                             ssl=ssl.create_default_context(cafile=certifi.where()),
+                                             enable_cleanup_closed=True)
+            self._session = aiohttp.ClientSession(connector=connector)
+            # Passing the session makes ccxt leave its lifetime to close(); endpoint and
+            # rate limit overrides made on the sync client apply to both
+            self.async_exchange = ccxt_async.binance({**self._exchange_config(), 'session': self._session,
+                                                      'rateLimit': self.exchange.rateLimit})
+            self.async_exchange.urls = self.exchange.urls
+        return self.async_exchange
+
+    async def close(self):
+        """Stop background work and release exchange connections (call on shutdown)"""
+        await self.stop_universe_refresh()
+        if self.async_exchange is not None:
+            await self.async_exchange.close()
+            self.async_exchange = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._executor.shutdown(wait=False)
+        if isinstance(self.exchange, RecordingExchange):
+            self.exchange.close()
+
+    async def _call(self, method: str, *args, priority: Priority = Priority.SCAN):
+        """
+        Call an exchange method on the configured client once the scheduler admits it
+
+        Concurrent calls with the same method and arguments share one
+        request, so the result may be shared between callers and must not
+        be modified. Scans and UI reads skip symbols that are backing off
+        after failures, and everything but exits and entries is refused
+        while the circuit breaker is open.
+
+        Args:
+            method: ccxt method name (e.g. 'fetch_ticker')
+            *args: Positional arguments for the method
+            priority: Request class; more urgent classes go out first
+
+        Returns:
+            The method's result
+
+        Raises:
+            SymbolSuppressedError: The symbol is backing off after failures
+            CircuitOpenError: The circuit breaker is open
+        """
+        if priority >= Priority.SCAN:
+            if method in SYMBOL_METHODS and self.symbol_backoff.is_suppressed(args[0]):
+                self.symbol_backoff.skipped += 1
+                raise SymbolSuppressedError(args[0])
+            if self.circuit_breaker.is_open:
+                raise CircuitOpenError(method)
+
+        return await self.single_flight.do((method, *args), lambda: self._request(method, args, priority), priority)
+
+    async def _request(self, method: str, args: Tuple, priority: Priority):
+        await self.scheduler.acquire(priority, REQUEST_WEIGHTS.get(method, 1))
+
+        try:
+            if self.client == 'async':
+                result = await getattr(self._get_async_exchange(), method)(*args)
+            else:
+                result = await asyncio.get_event_loop().run_in_executor(
+                    self._executor, getattr(self.exchange, method), *args)
+        except ccxt.NetworkError:
+            # Timeouts, outages and rate limiting say nothing about the symbol
+            self.circuit_breaker.record(failed=True)
+            raise
+        except Exception as e:
+            self.circuit_breaker.record(failed=True)
+            if method in SYMBOL_METHODS:
+                self.symbol_backoff.record_failure(args[0], f"{type(e).__name__}: {e}")
+            raise
 
-        # Cache for price data
-        self.price_cache = {}
-        self.cache_timestamp = {}
+        self.circuit_breaker.record(failed=False)
+        if method in SYMBOL_METHODS:
+            self.symbol_backoff.record_success(args[0])
+        return result
 
     async def get_ohlcv(self, symbol: str, timeframe: str = '1h',
-                        limit: int = 100) -> pd.DataFrame:
+                        limit: int = 100, priority: Priority = Priority.SCAN) -> pd.DataFrame:
         """
         Get OHLCV data for a symbol
 
+        Candles are kept in one series per symbol/timeframe. It is seeded
+        once (from the on-disk candle database when it holds enough
+        history), then refreshed with only the candles since the last
+        stored one (which may still have been forming) once it is older than
+        OHLCV_CACHE_SECONDS or a candle has closed since, and every limit is
+        answered as a slice of it. Newly closed candles are appended to the
+        database. The returned frame is a read-only view of the cache; copy
+        it before modifying values.
+
         Args:
             symbol: Trading pair (e.g., 'BTC/USDT')
             timeframe: Timeframe (e.g., '1h', '4h', '1d')
             limit: Number of candles to fetch
+            priority: Request class for any exchange calls
 
         Returns:
             DataFrame with OHLCV data
         """
         try:
-            # Check cache first
-            cache_key = f"{symbol}_{timeframe}_{limit}"
-            if cache_key in self.price_cache:
-                cache_time = self.cache_timestamp.get(cache_key, 0)
-                if time.time() - cache_time < 60:  # Cache for 1 minute
-                    return self.price_cache[cache_key].copy()
+            config_data = config.get_config()
+            limit = min(limit, config_data.OHLCV_MAX_CANDLES)
+            cached = self.candle_store.get(symbol, timeframe)
+
+            if cached is None or (limit > len(cached.candles) and limit > cached.seed_size):
+                # Not cached, or more history is wanted than was seeded
+                self.candle_store.misses += 1
+                stored = self.candle_db.read(symbol, timeframe, limit) if self.candle_db else pd.DataFrame()
+                # Seed from disk only when the stored window has no missing candles
+                if len(stored) >= limit and self.candle_db.is_contiguous(stored, timeframe):
+                    candles = await self._refresh_ohlcv(symbol, timeframe, stored, priority)
+                else:
+                    candles = await self.fetch_ohlcv(symbol, timeframe, None, limit, priority)
+                if candles.empty:
+                    self.symbol_backoff.record_failure(symbol, "No candles returned")
+                    return candles
+                self._persist(symbol, timeframe, candles)
+                cached = self.candle_store.put(symbol, timeframe, candles, seed_size=limit)
+            elif (time.time() - cached.refreshed_at >= config_data.OHLCV_CACHE_SECONDS
+                  or cached.refreshed_at < self._last_candle_close(timeframe)):
+                # Stale, or the last cached candle has closed since it was fetched
+                self.candle_store.misses += 1
+                candles = await self._refresh_ohlcv(symbol, timeframe, cached.candles, priority)
+                if candles is cached.candles:
+                    self.candle_store.touch(symbol, timeframe)
+                else:
+                    self._persist(symbol, timeframe, candles)
+                    cached = self.candle_store.put(symbol, timeframe, candles, seed_size=cached.seed_size)
+            else:
+                self.candle_store.hits += 1
 
-            # Fetch data from exchange
-            ohlcv = await asyncio.get_event_loop().run_in_executor(
-                None, self.exchange.fetch_ohlcv, symbol, timeframe, None, limit
-            )
+            return cached.candles.iloc[-limit:]
 
-            # Convert to DataFrame
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+        except (SymbolSuppressedError, CircuitOpenError):
+            return pd.DataFrame()
+        except Exception as e:
+            print(f"Error fetching OHLCV for {symbol}: {e}")
+            return pd.DataFrame()
 
-            # Convert to numeric
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+    def _last_candle_close(self, timeframe: str) -> float:
+        """Epoch seconds at which the most recent candle of this timeframe closed"""
+        seconds = self.exchange.parse_timeframe(timeframe)
+        return time.time() // seconds * seconds
 
-            # Cache the data
-            self.price_cache[cache_key] = df.copy()
-            self.cache_timestamp[cache_key] = time.time()
+    def _persist(self, symbol: str, timeframe: str, candles: pd.DataFrame):
+        """Append newly closed candles to the candle database"""
+        if self.candle_db is None:
+            return
+        try:
+            self.candle_db.append(symbol, timeframe, candles, now_ms=self.exchange.milliseconds())
+        except Exception as e:
+            print(f"Error saving candles for {symbol}: {e}")
 
-            return df
+    async def _refresh_ohlcv(self, symbol: str, timeframe: str, series: pd.DataFrame,
+                             priority: Priority = Priority.SCAN) -> pd.DataFrame:
+        """
+        Bring a cached series up to date with the candles since its last timestamp
 
-        except Exception as e:
-            print(f"Error fetching OHLCV for {symbol}: {e}")
-            return pd.DataFrame()
+        The last stored candle is fetched again and overwritten, since it may
+        have closed after it was stored. If the gap is too large for one
+        request, the series is re-seeded instead.
+        """
+        max_candles = config.get_config().OHLCV_MAX_CANDLES
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        since = int(series.index[-1].value // 1_000_000)  # ns -> ms
+        missing = (self.exchange.milliseconds() - since) // timeframe_ms + 1
 
-    async def get_24h_volume(self, symbol: str) -> float:
+        if missing >= max_candles:
+            return await self.fetch_ohlcv(symbol, timeframe, None, len(series), priority)
+
+        new_candles = await self.fetch_ohlcv(symbol, timeframe, since, int(missing) + 1, priority)
+        if new_candles.empty:
+            return series
+
+        series = pd.concat([series[series.index < new_candles.index[0]], new_candles])
+        return series.iloc[-max_candles:]
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str, since: Optional[int], limit: int,
+                          priority: Priority = Priority.SCAN) -> pd.DataFrame:
+        """
+        Fetch one page of candles straight from the exchange, bypassing the candle cache
+
+        Args:
+            symbol: Trading pair
+            timeframe: Timeframe
+            since: Open time of the first candle in ms (None for the most recent candles)
+            limit: Maximum candles to return
+            priority: Request class
+
+        Returns:
+            DataFrame with OHLCV data indexed by timestamp
+        """
+        ohlcv = await self._call('fetch_ohlcv', symbol, timeframe, since, limit, priority=priority)
+
+        # Convert to DataFrame
+        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+
+        # Convert to numeric
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+        return df
+
+    async def get_tickers(self, max_age: Optional[float] = None,
+                          priority: Priority = Priority.SCAN) -> Dict[str, Dict]:
+        """
+        Get tickers for every symbol from a single exchange call
+
+        The snapshot is reused until it is older than max_age; concurrent
+        callers share one refresh. On failure the previous snapshot is kept
+        and served without retrying for TICKER_RETRY_SECONDS.
+
+        Args:
+            max_age: Maximum snapshot age in seconds (default: TICKER_CACHE_SECONDS)
+            priority: Request class for a refresh
+
+        Returns:
+            Dictionary of symbol -> ccxt ticker
+        """
+        if max_age is None:
+            max_age = config.get_config().TICKER_CACHE_SECONDS
+
+        if self._tickers_fresh(max_age):
+            return self.tickers
+
+        if self._tickers_lock is None:
+            self._tickers_lock = asyncio.Lock()
+
+        async with self._tickers_lock:
+            # Another caller may have refreshed (or failed to) while we waited
+            if self._tickers_fresh(max_age):
+                return self.tickers
+
+            try:
+                self.tickers = await self._call('fetch_tickers', priority=priority)
+                self.tickers_timestamp = time.time()
+            except CircuitOpenError:
+                self._tickers_failed_at = time.time()  # Keep serving the previous snapshot
+            except Exception as e:
+                self._tickers_failed_at = time.time()
+                print(f"Error fetching tickers: {e}")
+
+        return self.tickers
+
+    def _tickers_fresh(self, max_age: float) -> bool:
+        """Whether the snapshot can be served as is (recent enough, or a refresh just failed)"""
+        now = time.time()
+        return (now - self.tickers_timestamp < max_age or
+                now - self._tickers_failed_at < config.get_config().TICKER_RETRY_SECONDS)
+
+    async def get_24h_volume(self, symbol: str, priority: Priority = Priority.SCAN) -> float:
         """
         Get 24h volume for a symbol in USD
 
         Args:
             symbol: Trading pair
+            priority: Request class for any exchange calls
 
         Returns:
             24h volume in USD
         """
         try:
-            ticker = await asyncio.get_event_loop().run_in_executor(
-                None, self.exchange.fetch_ticker, symbol
-            )
+            ticker = (await self.get_tickers(priority=priority)).get(symbol)
+            if ticker is None:
+                ticker = await self._call('fetch_ticker', symbol, priority=priority)
 
-            if 'quoteVolume' in ticker:
+            if ticker.get('quoteVolume') is not None:
                 return float(ticker['quoteVolume'])
             else:
                 return 0.0
 
+        except (SymbolSuppressedError, CircuitOpenError):
+            return 0.0
         except Exception as e:
             print(f"Error fetching volume for {symbol}: {e}")
             return 0.0
 
-    async def get_available_symbols(self) -> List[str]:
+    async def refresh_universe(self):
         """
-        Get list of available trading symbols with decent volume
+        Reload markets, filter the USDT universe and rank it by 24h volume
 
-        Returns:
-            List of symbols with USDT pairs
+        Both are swapped in at once; on failure the previous universe is kept.
         """
+        if self._universe_lock is None:
+            self._universe_lock = asyncio.Lock()
+
+        async with self._universe_lock:
+            await self._load_universe()
+
+    async def _load_universe(self):
+        """Rebuild the universe and ranking (caller holds the universe lock)"""
         try:
-            markets = await asyncio.get_event_loop().run_in_executor(
-                None, self.exchange.load_markets
-            )
+            markets = await self._call('load_markets', True, priority=Priority.SCAN)
+            universe = self._filter_universe(markets)
+
+            # Fetched directly so a failure keeps the previous ranking instead of ranking stale volumes
+            tickers = await self._call('fetch_tickers', priority=Priority.SCAN)
+            self.tickers, self.tickers_timestamp = tickers, time.time()
+            ranking = [(symbol, float((tickers.get(symbol) or {}).get('quoteVolume') or 0.0))
+                       for symbol in universe]
+            ranking.sort(key=lambda x: x[1], reverse=True)
+
+            self.universe, self.volume_ranking = universe, ranking
+            self.universe_timestamp = time.time()
+        except CircuitOpenError:
+            self._universe_failed_at = time.time()  # Retried on the next interval
+        except Exception as e:
+            self._universe_failed_at = time.time()
+            print(f"Error refreshing market universe: {e}")
+
+    async def _universe_refresh_loop(self):
+        while True:
+            await self.refresh_universe()
+            await asyncio.sleep(config.get_config().UNIVERSE_REFRESH_SECONDS)
+
+    def start_universe_refresh(self):
+        """Start the background universe refresh task on the running loop"""
+        if self._universe_task is None or self._universe_task.done():
+            self._universe_task = asyncio.create_task(self._universe_refresh_loop())
+
+    async def stop_universe_refresh(self):
+        """Cancel the background universe refresh task"""
+        if self._universe_task is not None:
+            self._universe_task.cancel()
+            try:
+                await self._universe_task
+            except asyncio.CancelledError:
+                pass
+            self._universe_task = None
+
+    def get_universe_age(self) -> Optional[float]:
+        """Seconds since the universe was last rebuilt (None if never loaded)"""
+        if not self.universe_timestamp:
+            return None
+        return time.time() - self.universe_timestamp
+
+    async def _ensure_universe(self):
+        """
+        Load the universe once if nothing has been loaded yet (later refreshes run in the background)
 
-            symbols = []
-            for symbol, market in markets.items():
-                if (market['active'] and
-                    market['type'] == 'spot' and
-                    symbol.endswith('/USDT') and
-                    not symbol.startswith(('BUSD/', 'USDC/', 'TUSD/', 'USDP/'))):
+        Concurrent callers share the first load. If it fails, callers go on
+        with the empty universe for UNIVERSE_RETRY_SECONDS before another
+        attempt, rather than each waiting on a failing load.
+        """
+        if self._universe_loaded_or_failed():
+            return
+
+        if self._universe_lock is None:
+            self._universe_lock = asyncio.Lock()
+
+        async with self._universe_lock:
+            if not self._universe_loaded_or_failed():
+                await self._load_universe()
+
+    def _universe_loaded_or_failed(self) -> bool:
+        """Whether the universe has loaded, or a load failed too recently to retry"""
+        return (bool(self.universe_timestamp) or
+                time.time() - self._universe_failed_at < config.get_config().UNIVERSE_RETRY_SECONDS)
+
+    @staticmethod
+    def _filter_universe(markets: Dict) -> List[str]:
+        """Active spot USDT pairs, excluding stablecoin and USD-pegged bases"""
+        symbols = []
+        for symbol, market in markets.items():
+            if (market['active'] and
+                market['type'] == 'spot' and
+                symbol.endswith('/USDT') and
+                not symbol.startswith(('BUSD/', 'USDC/', 'TUSD/', 'USDP/'))):
+
+                # Filter out leveraged tokens and stable coins
+                base = symbol.split('/')[0]
+                if not any(stable in base for stable in ['USD', 'BUSD', 'USDC', 'TUSD', 'USDP', 'DAI']):
+                    symbols.append(symbol)
+
+        return symbols
 
-                    # Filter out leveraged tokens and stable coins
-                    base = symbol.split('/')[0]
-                    if not any(stable in base for stable in ['USD', 'BUSD', 'USDC', 'TUSD', 'USDP', 'DAI']):
-                        symbols.append(symbol)
+    async def get_available_symbols(self) -> List[str]:
+        """
+        Get list of available trading symbols with decent volume
 
-            return symbols
+        Served from the cached universe; only the very first call waits for
+        a markets load.
 
-        except Exception as e:
-            print(f"Error fetching symbols: {e}")
-            return []
+        Returns:
+            List of symbols with USDT pairs
+        """
+        await self._ensure_universe()
+        return list(self.universe)
 
     async def get_shortable_symbols(self, min_volume: float = 1000000, limit: int = 100) -> List[str]:
         """
         Get symbols that can be shorted (not in long-only list) with decent volume,
         sorted by volume (highest first)
 
+        Served from the cached volume ranking; only the very first call waits
+        for it to be built.
+
         Args:
             min_volume: Minimum 24h volume in USD
             limit: Maximum number of symbols to return
@@ -133,62 +517,70 @@ class DataProvider:
             List of shortable symbols sorted by volume
         """
         config_data = config.get_config()
-        long_coins = [coin + '/USDT' for coin in config_data.LONG_COINS]
-
-        all_symbols = await self.get_available_symbols()
-        symbol_volumes = []
-
-        # Get volumes for all symbols (this might be slow, but necessary for sorting)
-        for symbol in all_symbols[:200]:  # Limit to first 200 to avoid too many API calls
-            if symbol not in long_coins:
-                try:
-                    volume = await self.get_24h_volume(symbol)
-                    if volume >= min_volume:
-                        symbol_volumes.append((symbol, volume))
-                except:
-                    continue  # Skip symbols that fail
+        long_coins = set(coin + '/USDT' for coin in config_data.LONG_COINS)
 
-        # Sort by volume (highest first) and return top symbols
-        symbol_volumes.sort(key=lambda x: x[1], reverse=True)
-        shortable_symbols = [symbol for symbol, volume in symbol_volumes[:limit]]
+        await self._ensure_universe()
+        shortable_symbols = [symbol for symbol, volume in self.volume_ranking
+                             if symbol not in long_coins and volume >= min_volume]
 
-        return shortable_symbols
+        return shortable_symbols[:limit]
 
-    async def get_current_price(self, symbol: str) -> float:
+    async def get_current_price(self, symbol: str, priority: Priority = Priority.SCAN) -> float:
         """
         Get current price for a symbol
 
+        Exits and entries use the tickers snapshot only while it is fresh;
+        otherwise they fetch their own ticker instead of waiting on a
+        snapshot refresh that may be queued at a lower priority.
+
         Args:
             symbol: Trading pair
+            priority: Request class for any exchange calls
 
         Returns:
             Current price
         """
         try:
-            ticker = await asyncio.get_event_loop().run_in_executor(
-                None, self.exchange.fetch_ticker, symbol
-            )
+            if priority <= Priority.ENTRY:
+                fresh = time.time() - self.tickers_timestamp < config.get_config().TICKER_CACHE_SECONDS
+                ticker = self.tickers.get(symbol) if fresh else None
+            else:
+                ticker = (await self.get_tickers(priority=priority)).get(symbol)
+            if ticker is None or ticker.get('last') is None:
+                ticker = await self._call('fetch_ticker', symbol, priority=priority)
             return float(ticker['last'])
+        except (SymbolSuppressedError, CircuitOpenError):
+            return 0.0
         except Exception as e:
             print(f"Error fetching current price for {symbol}: {e}")
             return 0.0
 
-    async def get_multiple_prices(self, symbols: List[str]) -> Dict[str, float]:
+    async def get_multiple_prices(self, symbols: List[str], priority: Priority = Priority.SCAN) -> Dict[str, float]:
         """
         Get current prices for multiple symbols
 
         Args:
             symbols: List of trading pairs
+            priority: Request class for any exchange calls
 
         Returns:
             Dictionary of symbol -> price
         """
+        tickers = await self.get_tickers(priority=priority)
+
         prices = {}
+        missing = []
         for symbol in symbols:
-            price = await self.get_current_price(symbol)
-            if price > 0:
-                prices[symbol] = price
-        return prices
+            ticker = tickers.get(symbol)
+            if ticker is not None and ticker.get('last') is not None:
+                prices[symbol] = float(ticker['last'])
+            else:
+                missing.append(symbol)
+
+        # Symbols absent from the snapshot are fetched individually, all at once
+        fetched = await asyncio.gather(*(self.get_current_price(symbol, priority) for symbol in missing))
+        prices.update(zip(missing, fetched))
+        return {symbol: prices[symbol] for symbol in symbols if prices[symbol] > 0}
 
 # Global data provider instance
 data_provider = DataProvider()
@@ -0,0 +1,114 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass
+class ScheduledEvent:
+    name: str
+    interval: float  # Seconds between runs
+    offset: float = 0.0  # Seconds after each interval boundary (aligned events)
+    aligned: bool = False  # Run on wall-clock multiples of interval, e.g. candle closes
+    next_run: float = 0.0  # Epoch seconds
+    runs: int = 0
+    last_lateness: float = 0.0
+    max_lateness: float = 0.0
+
+
+class EventSchedule:
+    """
+    Recurring events on the wall clock, for a loop that sleeps until the next one
+
+    Aligned events fire at offset seconds past every multiple of their
+    interval (epoch based, so hourly events follow UTC candle closes).
+    Other events fire interval seconds after their previous scheduled time.
+    Each run records how late it started against its scheduled time.
+    """
+
+    def __init__(self):
+        self.events: Dict[str, ScheduledEvent] = {}
+
+    def add(self, name: str, interval: float, offset: float = 0.0, aligned: bool = False,
+            run_now: bool = True) -> ScheduledEvent:
+        """
+        Register an event
+
+        Args:
+            name: Event name
+            interval: Seconds between runs
+            offset: Delay after each boundary, for aligned events
+            aligned: Fire on wall-clock multiples of interval
+            run_now: Also fire immediately, before the first scheduled time
+        """
+        event = ScheduledEvent(name=name, interval=interval, offset=offset, aligned=aligned)
+        now = time.time()
+        event.next_run = now if run_now else self._following(event, now)
+        self.events[name] = event
+        return event
+
+    def seconds_until_next(self) -> float:
+        """Seconds until the earliest event is due (0 if one is already due)"""
+        if not self.events:
+            return float('inf')
+        return max(0.0, min(event.next_run for event in self.events.values()) - time.time())
+
+    def seconds_until(self, name: str) -> float:
+        """Seconds until an event is next due"""
+        return max(0.0, self.events[name].next_run - time.time())
+
+    def postpone(self, name: str):
+        """Restart an interval event's countdown from now, e.g. when another event did its work"""
+        event = self.events[name]
+        event.next_run = self._following(event, time.time())
+
+    def due(self) -> List[ScheduledEvent]:
+        """Events due now, in the order they were added"""
+        now = time.time()
+        return [event for event in self.events.values() if event.next_run <= now]
+
+    def mark_run(self, name: str, started: Optional[float] = None) -> float:
+        """
+        Record that an event started and schedule its next run
+
+        Args:
+            name: Event name
+            started: Epoch seconds the run started (now if None)
+
+        Returns:
+            Seconds the run started after its scheduled time
+        """
+        event = self.events[name]
+        started = time.time() if started is None else started
+        lateness = max(0.0, started - event.next_run)
+        event.runs += 1
+        event.last_lateness = lateness
+        event.max_lateness = max(event.max_lateness, lateness)
+
+        if event.aligned:
+            event.next_run = self._following(event, started)
+        else:
+            # Keep the cadence, but don't queue up missed runs after a stall
+            event.next_run += event.interval
+            if event.next_run <= started:
+                event.next_run = started + event.interval
+        return lateness
+
+    @staticmethod
+    def _following(event: ScheduledEvent, after: float) -> float:
+        if not event.aligned:
+            return after + event.interval
+        boundary = (after - event.offset) // event.interval * event.interval + event.offset
+        return boundary + event.interval
+
+    def get_stats(self) -> Dict:
+        """Next run, run count and start lateness per event"""
+        now = time.time()
+        return {
+            name: {
+                'next_in_seconds': round(event.next_run - now, 1),
+                'runs': event.runs,
+                'last_lateness_ms': round(event.last_lateness * 1000, 1),
+                'max_lateness_ms': round(event.max_lateness * 1000, 1)
+            }
+            for name, event in self.events.items()
+        }
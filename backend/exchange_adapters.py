@@ -0,0 +1,278 @@
+"""
+Offline exchange backends with the subset of the sync ccxt API DataProvider uses
+
+RecordingExchange wraps a live client and saves every fetch_ohlcv,
+fetch_ticker, fetch_tickers and load_markets response under a directory.
+ReplayExchange serves those recordings, or deterministic synthetic data
+for anything not recorded, with optional latency and error injection.
+Select one with EXCHANGE_BACKEND = "record" or "replay" in config.py.
+"""
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import ccxt
+import numpy as np
+
+
+class RecordingExchange:
+    """
+    Pass-through to a live ccxt client that records responses to disk
+
+    Responses are buffered and written at most every flush_interval seconds
+    (and by close()), so a crash loses only the last interval and calls on
+    executor threads don't serialize on file writes.
+    """
+
+    def __init__(self, exchange, directory: str, flush_interval: float = 10.0):
+        """
+        Args:
+            exchange: Live ccxt client
+            directory: Where recordings are written
+            flush_interval: Seconds between writes of buffered responses (0 writes on every call)
+        """
+        self._exchange = exchange
+        self._directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()  # Calls run on executor threads
+        self._write_lock = threading.Lock()  # One flush at a time, so files are written in order
+        self._pending: Dict[str, object] = {}  # Path -> latest response not yet written
+        self._candles: Dict[str, Dict[int, List]] = {}  # Path -> recorded candles by open time
+        self._dirty_candles = set()
+        self._flushed_at = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self._exchange, name)
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', since: Optional[int] = None, limit: Optional[int] = None):
+        candles = self._exchange.fetch_ohlcv(symbol, timeframe, since, limit)
+        path = recording_path(self._directory, 'fetch_ohlcv', symbol, timeframe)
+        with self._lock:
+            if path not in self._candles:
+                # Merge with earlier recordings so replay can serve any window
+                self._candles[path] = {row[0]: row for row in _load(path, [])}
+            self._candles[path].update((row[0], row) for row in candles)
+            self._dirty_candles.add(path)
+            self._record_clock()
+        self._maybe_flush()
+        return candles
+
+    def fetch_ticker(self, symbol: str):
+        ticker = self._exchange.fetch_ticker(symbol)
+        with self._lock:
+            self._pending[recording_path(self._directory, 'fetch_ticker', symbol)] = ticker
+            self._record_clock()
+        self._maybe_flush()
+        return ticker
+
+    def fetch_tickers(self, symbols: Optional[List[str]] = None):
+        tickers = self._exchange.fetch_tickers(symbols)
+        with self._lock:
+            self._pending[recording_path(self._directory, 'fetch_tickers')] = tickers
+            self._record_clock()
+        self._maybe_flush()
+        return tickers
+
+    def load_markets(self, reload: bool = False):
+        markets = self._exchange.load_markets(reload)
+        with self._lock:
+            self._pending[recording_path(self._directory, 'load_markets')] = markets
+        self._maybe_flush()
+        return markets
+
+    def _record_clock(self):
+        self._pending[recording_path(self._directory, 'clock')] = {'recorded_at': self._exchange.milliseconds()}
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._flushed_at >= self.flush_interval and not self._write_lock.locked():
+            self.flush()
+
+    def flush(self):
+        """Write buffered recordings to disk"""
+        with self._write_lock:
+            with self._lock:
+                for path in self._dirty_candles:
+                    candles = self._candles[path]
+                    self._pending[path] = [candles[timestamp] for timestamp in sorted(candles)]
+                self._dirty_candles = set()
+                pending, self._pending = self._pending, {}
+                self._flushed_at = time.monotonic()
+            # Written outside _lock, so recording calls carry on meanwhile
+            for path, data in pending.items():
+                _save(path, data)
+
+    def close(self):
+        """Write buffered recordings to disk (call on shutdown)"""
+        self.flush()
+
+
+class ReplayExchange:
+    """
+    Recorded or synthetic exchange responses, no network
+
+    The clock starts at the time of the last recording (or now, without
+    recordings) and advances in real time. Synthetic candles are a
+    deterministic function of symbol and timestamp, so overlapping
+    requests agree and runs are reproducible.
+    """
+
+    rateLimit = 0
+
+    def __init__(self, directory: Optional[str] = None, latency: float = 0.0, error_rate: float = 0.0,
+                 symbols: Optional[List[str]] = None, dead_symbols: Optional[List[str]] = None, seed: int = 0):
+        """
+        Args:
+            directory: Recordings from RecordingExchange (synthetic data only if None)
+            latency: Seconds added to every call
+            error_rate: Probability that a call raises a network error
+            symbols: Markets served when load_markets was not recorded
+            dead_symbols: Symbols whose requests fail as unknown markets
+            seed: Seed for error injection
+        """
+        self.directory = directory
+        self.latency = latency
+        self.error_rate = error_rate
+        self.dead_symbols = set(dead_symbols or [])
+        self.calls = 0
+        self.errors = 0
+        self.urls = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recordings: Dict[str, object] = {}  # Loaded once per file
+
+        clock = self._recorded('clock')
+        self._clock_offset = clock['recorded_at'] - time.time() * 1000 if clock else 0.0
+        self._markets = self._recorded('load_markets')
+        if self._markets is None:
+            self._markets = {symbol: {'symbol': symbol, 'base': symbol.split('/')[0], 'quote': symbol.split('/')[1],
+                                      'active': True, 'type': 'spot', 'spot': True}
+                             for symbol in (symbols or [f'SYN{i}/USDT' for i in range(100)])}
+
+    def milliseconds(self) -> int:
+        return int(time.time() * 1000 + self._clock_offset)
+
+    @staticmethod
+    def parse_timeframe(timeframe: str) -> int:
+        return ccxt.Exchange.parse_timeframe(timeframe)
+
+    def load_markets(self, reload: bool = False) -> Dict:
+        self._call()
+        return self._markets
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', since: Optional[int] = None,
+                    limit: Optional[int] = None) -> List[List]:
+        self._call(symbol)
+        limit = limit or 500
+        recorded = self._recorded('fetch_ohlcv', symbol, timeframe)
+        if recorded is not None:
+            if since is not None:
+                return [row for row in recorded if row[0] >= since][:limit]
+            return recorded[-limit:]
+
+        timeframe_ms = self.parse_timeframe(timeframe) * 1000
+        now = self.milliseconds()
+        if since is None:
+            start = (now // timeframe_ms - limit + 1) * timeframe_ms
+        else:
+            start = -(-since // timeframe_ms) * timeframe_ms  # Round up to a candle open
+        timestamps = np.arange(start, min(start + limit * timeframe_ms, now + 1), timeframe_ms, dtype=np.int64)
+        return self._synthetic_candles(symbol, timestamps, timeframe_ms, now)
+
+    def fetch_ticker(self, symbol: str) -> Dict:
+        self._call(symbol)
+        recorded = self._recorded('fetch_ticker', symbol)
+        return recorded if recorded is not None else self._synthetic_ticker(symbol)
+
+    def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict]:
+        self._call()
+        recorded = self._recorded('fetch_tickers')
+        if recorded is not None:
+            return recorded
+        return {symbol: self._synthetic_ticker(symbol) for symbol in self._markets
+                if symbol not in self.dead_symbols}
+
+    def _recorded(self, method: str, *parts: str):
+        """Recorded response, or None if there is none"""
+        if not self.directory:
+            return None
+        path = recording_path(self.directory, method, *parts)
+        if path not in self._recordings:
+            self._recordings[path] = _load(path, None)
+        return self._recordings[path]
+
+    def _call(self, symbol: Optional[str] = None):
+        """Simulate the round trip and inject failures"""
+        with self._lock:
+            self.calls += 1
+            failed = self.error_rate and self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise ccxt.RequestTimeout('replay: injected timeout')
+        if symbol is not None and (symbol in self.dead_symbols or symbol not in self._markets):
+            raise ccxt.BadSymbol(f'replay does not have market symbol {symbol}')
+
+    def _synthetic_candles(self, symbol: str, timestamps: np.ndarray, timeframe_ms: int, now: int) -> List[List]:
+        if not len(timestamps):
+            return []
+        closes = self._synthetic_price(symbol, np.minimum(timestamps + timeframe_ms, now))
+        opens = self._synthetic_price(symbol, timestamps)
+        spread = 0.002 + 0.006 * _noise(symbol, timestamps, 1)
+        highs = np.maximum(opens, closes) * (1 + spread)
+        lows = np.minimum(opens, closes) * (1 - spread)
+        volumes = 1000 * (1 + _noise(symbol, timestamps, 2))
+        values = np.column_stack([opens, highs, lows, closes, volumes]).tolist()
+        return [[timestamp, *row] for timestamp, row in zip(timestamps.tolist(), values)]
+
+    def _synthetic_ticker(self, symbol: str) -> Dict:
+        now = self.milliseconds()
+        last = float(self._synthetic_price(symbol, np.array([now]))[0])
+        return {'symbol': symbol, 'timestamp': now, 'last': last, 'close': last,
+                'quoteVolume': float(10 ** (5 + 4 * _noise(symbol, np.array([0]), 3)[0]))}
+
+    @staticmethod
+    def _synthetic_price(symbol: str, timestamps: np.ndarray) -> np.ndarray:
+        """Smooth multi-day trends plus per-minute noise, different per symbol"""
+        seed = zlib.crc32(symbol.encode())
+        hours = timestamps / 3_600_000
+        phase = seed % 1000
+        base = 1 + seed % 500
+        trend = 0.15 * np.sin(hours / 97 + phase) + 0.05 * np.sin(hours / 23 + phase * 2)
+        noise = 0.004 * (_noise(symbol, timestamps // 60_000, 0) - 0.5)
+        return base * np.exp(trend + noise)
+
+
+def _noise(symbol: str, values: np.ndarray, stream: int) -> np.ndarray:
+    """Deterministic uniform [0, 1) values per (symbol, value, stream)"""
+    mixed = (np.asarray(values, dtype=np.int64).astype(np.uint64) * np.uint64(2654435761)
+             + np.uint64(zlib.crc32(f'{symbol}:{stream}'.encode())))
+    mixed ^= mixed >> np.uint64(16)
+    mixed *= np.uint64(0x45d9f3b)
+    mixed ^= mixed >> np.uint64(16)
+    return (mixed % np.uint64(1 << 24)).astype(np.float64) / (1 << 24)
+
+
+def recording_path(directory: str, method: str, *parts: str) -> str:
+    name = '-'.join(part.replace('/', '_') for part in parts) or method
+    return os.path.join(directory, method, name + '.json') if parts else os.path.join(directory, name + '.json')
+
+
+def _load(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _save(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
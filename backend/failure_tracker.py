@@ -0,0 +1,115 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+class SymbolSuppressedError(Exception):
+    """Request skipped because the symbol recently failed and is backing off"""
+
+
+class CircuitOpenError(Exception):
+    """Request skipped because the exchange circuit breaker is open"""
+
+
+@dataclass
+class SymbolFailure:
+    failures: int
+    last_error: str
+    failed_at: float
+    retry_at: float
+
+
+class SymbolBackoff:
+    """
+    Negative cache of symbols whose requests fail (delisted, halted, unknown)
+
+    Each consecutive failure doubles the time before the symbol is tried
+    again, up to max_delay; one success clears it.
+    """
+
+    def __init__(self, base_delay: float = 60.0, max_delay: float = 21600.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._failures: Dict[str, SymbolFailure] = {}
+        self.skipped = 0
+
+    def is_suppressed(self, symbol: str) -> bool:
+        failure = self._failures.get(symbol)
+        return failure is not None and time.time() < failure.retry_at
+
+    def record_failure(self, symbol: str, error: str):
+        previous = self._failures.get(symbol)
+        failures = previous.failures + 1 if previous else 1
+        now = time.time()
+        delay = min(self.base_delay * 2 ** (failures - 1), self.max_delay)
+        self._failures[symbol] = SymbolFailure(failures=failures, last_error=error, failed_at=now, retry_at=now + delay)
+
+    def record_success(self, symbol: str):
+        self._failures.pop(symbol, None)
+
+    def suppressed(self) -> List[Dict]:
+        """Symbols currently backing off, longest remaining first"""
+        now = time.time()
+        rows = [{
+            'symbol': symbol,
+            'failures': failure.failures,
+            'last_error': failure.last_error,
+            'failed_at': failure.failed_at,
+            'retry_in_seconds': round(failure.retry_at - now, 1)
+        } for symbol, failure in self._failures.items() if now < failure.retry_at]
+        rows.sort(key=lambda row: row['retry_in_seconds'], reverse=True)
+        return rows
+
+
+class CircuitBreaker:
+    """
+    Exchange-wide breaker over a rolling window of request outcomes
+
+    Opens when at least min_requests finished in the window and the error
+    rate reaches error_rate; stays open for cooldown seconds, then closes
+    with a fresh window.
+    """
+
+    def __init__(self, window: float = 60.0, min_requests: int = 20, error_rate: float = 0.5,
+                 cooldown: float = 120.0):
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self._outcomes = deque()  # (time, failed)
+        self._errors = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    @property
+    def is_open(self) -> bool:
+        return time.time() - self.opened_at < self.cooldown
+
+    def record(self, failed: bool):
+        now = time.time()
+        self._outcomes.append((now, failed))
+        self._errors += failed
+        self._expire(now)
+
+        if (not self.is_open and len(self._outcomes) >= self.min_requests
+                and self._errors / len(self._outcomes) >= self.error_rate):
+            self.opened_at = now
+            self.trips += 1
+            self._outcomes.clear()
+            self._errors = 0
+            print(f"⚠️  Exchange error rate high - pausing non-critical requests for {self.cooldown:.0f}s")
+
+    def _expire(self, now: float):
+        while self._outcomes and self._outcomes[0][0] <= now - self.window:
+            self._errors -= self._outcomes.popleft()[1]
+
+    def get_stats(self) -> Dict:
+        self._expire(time.time())
+        return {
+            'open': self.is_open,
+            'reopens_in_seconds': round(self.opened_at + self.cooldown - time.time(), 1) if self.is_open else 0.0,
+            'window_requests': len(self._outcomes),
+            'window_errors': self._errors,
+            'trips': self.trips
+        }
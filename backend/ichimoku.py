@@ -1,6 +1,14 @@
 import pandas as pd
 import numpy as np
-from typing import Tuple, Optional
+import math
+from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Mapping, Tuple, Optional
+
+# Columns produced in lean mode: what signal ranking, exit checks and the chart read
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+LEAN_INDICATOR_COLUMNS = ['tenkan_sen', 'kijun_sen', 'senkou_span_a', 'senkou_span_b', 'cloud_top', 'cloud_bottom']
+LEAN_SIGNAL_COLUMNS = ['long_signal', 'short_signal']
 
 class IchimokuCloud:
     def __init__(self, tenkan_period: int = 9, kijun_period: int = 26,
@@ -10,16 +18,22 @@ class IchimokuCloud:
         self.senkou_period = senkou_period
         self.chikou_period = chikou_period
 
-    def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
+    def calculate(self, df: pd.DataFrame, lean: bool = False, dtype=np.float64) -> pd.DataFrame:
         """
         Calculate Ichimoku Cloud indicators
 
         Args:
             df: DataFrame with OHLC data (open, high, low, close, volume)
+            lean: Skip intermediate columns and the Chikou Span, writing the
+                OHLCV and LEAN_INDICATOR_COLUMNS into one preallocated block
+            dtype: Float dtype for lean mode (e.g. np.float32 to halve memory)
 
         Returns:
             DataFrame with Ichimoku indicators added
         """
+        if lean:
+            return self._calculate_lean(df, dtype)
+
         df = df.copy()
 
         # Tenkan-sen (Conversion Line): (highest high + lowest low) / 2 for the past 9 periods
@@ -49,16 +63,26 @@ class IchimokuCloud:
 
         return df
 
-    def get_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+    def get_signals(self, df: pd.DataFrame, lean: bool = False) -> pd.DataFrame:
         """
         Generate trading signals based on Ichimoku conditions
 
         Args:
             df: DataFrame with Ichimoku indicators calculated
+            lean: Add only long_signal and short_signal, in place on df
+                (meant for frames returned by calculate(lean=True))
 
         Returns:
             DataFrame with signal columns added
         """
+        if lean:
+            close = df['close'].to_numpy()
+            tenkan_sen = df['tenkan_sen'].to_numpy()
+            kijun_sen = df['kijun_sen'].to_numpy()
+            df['long_signal'] = (close > df['cloud_top'].to_numpy()) & (tenkan_sen > kijun_sen) & (close > tenkan_sen)
+            df['short_signal'] = (close < df['cloud_bottom'].to_numpy()) & (tenkan_sen < kijun_sen) & (close < tenkan_sen)
+            return df
+
         df = df.copy()
 
         # Long signals
@@ -89,71 +113,239 @@ class IchimokuCloud:
         """
         Check if Chikou Span is clean (price above local minima between current price and Chikou Span)
         """
-        clean_signals = []
+        # Lowest low over the current candle and the chikou_period candles before it
+        local_minima = df['low'].rolling(window=self.chikou_period + 1, min_periods=1).min()
+        clean = (df['close'] > local_minima) & self._chikou_window_mask(df)
+        return pd.Series(clean.to_numpy(dtype=bool), index=df.index)
+
+    def _is_chikou_clean_short(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Check if Chikou Span is clean for short (price below local maxima between current price and Chikou Span)
+        """
+        # Highest high over the current candle and the chikou_period candles before it
+        local_maxima = df['high'].rolling(window=self.chikou_period + 1, min_periods=1).max()
+        clean = (df['close'] < local_maxima) & self._chikou_window_mask(df)
+        return pd.Series(clean.to_numpy(dtype=bool), index=df.index)
 
-        for idx in df.index:
-            current_price = df.loc[idx, 'close']
-            chikou_price = df.loc[idx, 'chikou_span']
+    def _chikou_window_mask(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Rows where the Chikou check can be evaluated: the Chikou Span exists and
+        at least chikou_period candles follow the current one
+        """
+        positions = np.arange(len(df))
+        has_future = positions + self.chikou_period < len(df)
+        return df['chikou_span'].notna() & has_future
 
-            if pd.isna(chikou_price):
-                clean_signals.append(False)
-                continue
+    @property
+    def lookback(self) -> int:
+        """Candles needed before a row for every indicator on that row to be defined"""
+        return max(self.tenkan_period, self.kijun_period, self.senkou_period) - 1 + self.kijun_period
 
-            # Find data between current candle and Chikou Span position
-            current_idx = df.index.get_loc(idx)
-            chikou_shift = self.chikou_period
+    def evaluate_tail(self, df: pd.DataFrame, rows: int = 2, dtype=np.float64) -> pd.DataFrame:
+        """
+        Lean indicators and signals for only the last `rows` candles
 
-            if current_idx + chikou_shift >= len(df):
-                clean_signals.append(False)
-                continue
+        Computes on the last rows + lookback candles, so the result equals the
+        tail of calculate(lean=True) + get_signals(lean=True) over all of df
+        while the cost stays fixed however much history df holds.
 
-            # Get prices between current and Chikou Span position
-            lookback_data = df.iloc[max(0, current_idx - chikou_shift):current_idx + 1]
+        Args:
+            df: DataFrame with OHLC data
+            rows: Number of trailing candles to return
+            dtype: Float dtype (see calculate)
 
-            if len(lookback_data) == 0:
-                clean_signals.append(False)
-                continue
+        Returns:
+            DataFrame of the last `rows` candles with lean columns
+        """
+        tail = self.calculate(df.iloc[-(rows + self.lookback):], lean=True, dtype=dtype)
+        return self.get_signals(tail, lean=True).iloc[-rows:]
 
-            # Check if current price is above all local minima
-            local_minima = lookback_data['low'].min()
-            clean_signals.append(current_price > local_minima)
+    def tail_signal_state(self, df: pd.DataFrame, rows: int = 8) -> Dict:
+        """
+        Current long/short signals and how many candles each has been active
 
-        return pd.Series(clean_signals, index=df.index)
+        Evaluates `rows` trailing candles and doubles the window only while
+        a signal run reaches its start.
 
-    def _is_chikou_clean_short(self, df: pd.DataFrame) -> pd.Series:
+        Args:
+            df: DataFrame with OHLC data
+            rows: Initial number of trailing candles to evaluate
+
+        Returns:
+            Dict with long_signal, short_signal (bool) and long_run, short_run (int)
         """
-        Check if Chikou Span is clean for short (price below local maxima between current price and Chikou Span)
+        while True:
+            tail = self.evaluate_tail(df, rows=rows)
+            long_signals = tail['long_signal'].to_numpy()
+            short_signals = tail['short_signal'].to_numpy()
+            long_run = self.trailing_run(long_signals)
+            short_run = self.trailing_run(short_signals)
+
+            if rows >= len(df) or max(long_run, short_run) < len(tail):
+                return {
+                    'long_signal': bool(long_signals[-1]) if len(tail) else False,
+                    'short_signal': bool(short_signals[-1]) if len(tail) else False,
+                    'long_run': long_run,
+                    'short_run': short_run
+                }
+            rows *= 2
+
+    @staticmethod
+    def trailing_run(values: np.ndarray) -> int:
+        """Number of consecutive True values at the end of a boolean array"""
+        inactive = np.flatnonzero(~np.asarray(values, dtype=bool)[::-1])
+        return int(inactive[0]) if len(inactive) else len(values)
+
+    @staticmethod
+    def align_panel(frames: List[pd.DataFrame]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        clean_signals = []
+        Stack OHLC frames into (symbols x candles) high/low/close arrays for calculate_panel
 
-        for idx in df.index:
-            current_price = df.loc[idx, 'close']
-            chikou_price = df.loc[idx, 'chikou_span']
+        Frames are right-aligned on their latest candle; shorter histories are
+        padded with NaN on the left.
 
-            if pd.isna(chikou_price):
-                clean_signals.append(False)
-                continue
+        Args:
+            frames: List of DataFrames with high, low and close columns
 
-            # Find data between current candle and Chikou Span position
-            current_idx = df.index.get_loc(idx)
-            chikou_shift = self.chikou_period
+        Returns:
+            Tuple of (highs, lows, closes)
+        """
+        width = max((len(df) for df in frames), default=0)
+        panels = np.full((3, len(frames), width), np.nan)
 
-            if current_idx + chikou_shift >= len(df):
-                clean_signals.append(False)
-                continue
+        for row, df in enumerate(frames):
+            if len(df):
+                panels[:, row, width - len(df):] = df[['high', 'low', 'close']].to_numpy(dtype=float).T
 
-            # Get prices between current and Chikou Span position
-            lookback_data = df.iloc[max(0, current_idx - chikou_shift):current_idx + 1]
+        return panels[0], panels[1], panels[2]
 
-            if len(lookback_data) == 0:
-                clean_signals.append(False)
-                continue
+    def calculate_panel(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                        lean: bool = False, dtype=np.float64) -> Dict[str, np.ndarray]:
+        """
+        Calculate Ichimoku indicators and signals for many symbols at once
 
-            # Check if current price is below all local maxima
-            local_maxima = lookback_data['high'].max()
-            clean_signals.append(current_price < local_maxima)
+        Equivalent to calculate + get_signals on each row, for rows
+        right-aligned on their latest candle and NaN-padded on the left
+        (see align_panel).
 
-        return pd.Series(clean_signals, index=df.index)
+        Args:
+            highs: (symbols x candles) array of highs
+            lows: (symbols x candles) array of lows
+            closes: (symbols x candles) array of closes
+            lean: Return only LEAN_INDICATOR_COLUMNS and LEAN_SIGNAL_COLUMNS
+            dtype: Float dtype to compute in
+
+        Returns:
+            Dict of column name -> (symbols x candles) array
+        """
+        highs = np.asarray(highs, dtype=dtype)
+        lows = np.asarray(lows, dtype=dtype)
+        closes = np.asarray(closes, dtype=dtype)
+
+        result = self._indicators_panel(highs, lows)
+        tenkan_sen = result['tenkan_sen']
+        kijun_sen = result['kijun_sen']
+
+        if lean:
+            result['long_signal'] = (closes > result['cloud_top']) & (tenkan_sen > kijun_sen) & (closes > tenkan_sen)
+            result['short_signal'] = (closes < result['cloud_bottom']) & (tenkan_sen < kijun_sen) & (closes < tenkan_sen)
+            return result
+
+        chikou_span = self._shift_panel(closes, self.chikou_period)
+
+        # Chikou window: span exists and chikou_period candles follow; NaN lows/highs are skipped
+        columns = np.arange(closes.shape[1])
+        chikou_mask = ~np.isnan(chikou_span) & (columns + self.chikou_period < closes.shape[1])
+        local_minima = self._rolling_panel(np.where(np.isnan(lows), np.inf, lows), self.chikou_period + 1, np.min)
+        local_maxima = self._rolling_panel(np.where(np.isnan(highs), -np.inf, highs), self.chikou_period + 1, np.max)
+
+        result.update({
+            'chikou_span': chikou_span,
+            'close_above_cloud': closes > result['cloud_top'],
+            'tenkan_above_kijun': tenkan_sen > kijun_sen,
+            'price_above_tenkan': closes > tenkan_sen,
+            'chikou_clean': (closes > local_minima) & chikou_mask,
+            'close_below_cloud': closes < result['cloud_bottom'],
+            'tenkan_below_kijun': tenkan_sen < kijun_sen,
+            'price_below_tenkan': closes < tenkan_sen,
+            'chikou_clean_short': (closes < local_maxima) & chikou_mask
+        })
+        result['long_signal'] = result['close_above_cloud'] & result['tenkan_above_kijun'] & result['price_above_tenkan']
+        result['short_signal'] = result['close_below_cloud'] & result['tenkan_below_kijun'] & result['price_below_tenkan']
+
+        return result
+
+    def _calculate_lean(self, df: pd.DataFrame, dtype) -> pd.DataFrame:
+        """
+        calculate(lean=True): fill one column-major block with the OHLCV and
+        lean indicator columns and wrap it without copying
+        """
+        base_columns = [col for col in OHLCV_COLUMNS if col in df.columns]
+        columns = base_columns + LEAN_INDICATOR_COLUMNS
+        block = np.empty((len(df), len(columns)), dtype=dtype, order='F')
+
+        for i, col in enumerate(base_columns):
+            block[:, i] = df[col].to_numpy()
+
+        # Column views reshaped as 1-row panels share memory with the block
+        views = {col: block[:, i].reshape(1, -1) for i, col in enumerate(columns)}
+        self._indicators_panel(views['high'], views['low'],
+                               out={col: views[col] for col in LEAN_INDICATOR_COLUMNS})
+
+        return pd.DataFrame(block, index=df.index, columns=columns, copy=False)
+
+    def _indicators_panel(self, highs: np.ndarray, lows: np.ndarray,
+                          out: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """Lean indicator columns for a panel, written into `out` arrays when given"""
+        out = out or {}
+
+        tenkan_sen = self._midpoint_panel(highs, lows, self.tenkan_period, out.get('tenkan_sen'))
+        kijun_sen = self._midpoint_panel(highs, lows, self.kijun_period, out.get('kijun_sen'))
+        senkou_span_a = self._shift_panel((tenkan_sen + kijun_sen) / 2, self.kijun_period, out.get('senkou_span_a'))
+        senkou_span_b = self._shift_panel(self._midpoint_panel(highs, lows, self.senkou_period),
+                                          self.kijun_period, out.get('senkou_span_b'))
+
+        # fmax/fmin skip NaN like DataFrame.max/min(axis=1)
+        return {
+            'tenkan_sen': tenkan_sen,
+            'kijun_sen': kijun_sen,
+            'senkou_span_a': senkou_span_a,
+            'senkou_span_b': senkou_span_b,
+            'cloud_top': np.fmax(senkou_span_a, senkou_span_b, out=out.get('cloud_top')),
+            'cloud_bottom': np.fmin(senkou_span_a, senkou_span_b, out=out.get('cloud_bottom'))
+        }
+
+    @classmethod
+    def _midpoint_panel(cls, highs: np.ndarray, lows: np.ndarray, window: int,
+                        out: Optional[np.ndarray] = None) -> np.ndarray:
+        """(highest high + lowest low) / 2 over a rolling window"""
+        out = cls._rolling_panel(highs, window, np.max, out)
+        out += cls._rolling_panel(lows, window, np.min)
+        out /= 2
+        return out
+
+    @staticmethod
+    def _rolling_panel(values: np.ndarray, window: int, reduce,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Full-window rolling reduction along the candle axis (NaN until the window is full)"""
+        if out is None:
+            out = np.empty(values.shape, dtype=values.dtype)
+        if values.shape[1] >= window:
+            out[:, :window - 1] = np.nan
+            reduce(sliding_window_view(values, window, axis=1), axis=-1, out=out[:, window - 1:])
+        else:
+            out[:] = np.nan
+        return out
+
+    @staticmethod
+    def _shift_panel(values: np.ndarray, periods: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Shift forward along the candle axis, filling with NaN"""
+        if out is None:
+            out = np.empty(values.shape, dtype=values.dtype)
+        out[:, :periods] = np.nan
+        if periods < values.shape[1]:
+            out[:, periods:] = values[:, :values.shape[1] - periods]
+        return out
 
     def check_stop_loss(self, df: pd.DataFrame, position_type: str) -> pd.Series:
         """
@@ -200,3 +392,160 @@ class IchimokuCloud:
             above_conversion = df['close'] > df['tenkan_sen']
             conversion_cross_above = (df['tenkan_sen'] > df['kijun_sen']) & (df['tenkan_sen'].shift(1) <= df['kijun_sen'].shift(1))
             return above_conversion | conversion_cross_above
+
+
+class _RollingExtreme:
+    """
+    Rolling max (or min) over a fixed window using a monotonic deque
+
+    Matches pandas rolling(window).max()/min(): the result is NaN until the
+    window is full and while any NaN is inside the window.
+    """
+
+    def __init__(self, window: int, use_max: bool = True):
+        self.window = window
+        self.use_max = use_max
+        self.reset()
+
+    def reset(self):
+        self._candidates = deque()  # (bar, value), values monotonic from the front
+        self._bar = -1
+        self._last_nan_bar = -1
+
+    def push(self, value: float) -> float:
+        self._bar += 1
+        bar = self._bar
+
+        if math.isnan(value):
+            self._last_nan_bar = bar
+        else:
+            # Drop candidates the new value dominates for the rest of their lifetime
+            while self._candidates and (
+                self._candidates[-1][1] <= value if self.use_max else self._candidates[-1][1] >= value
+            ):
+                self._candidates.pop()
+            self._candidates.append((bar, value))
+
+        while self._candidates and self._candidates[0][0] <= bar - self.window:
+            self._candidates.popleft()
+
+        if bar + 1 < self.window or bar - self._last_nan_bar < self.window:
+            return math.nan
+        return self._candidates[0][1]
+
+
+class _Lag:
+    """Ring buffer returning the value pushed `periods` bars ago (NaN until available)"""
+
+    def __init__(self, periods: int):
+        self.periods = periods
+        self._buffer = deque(maxlen=periods + 1)
+
+    def reset(self):
+        self._buffer.clear()
+
+    def push(self, value: float) -> float:
+        self._buffer.append(value)
+        if len(self._buffer) <= self.periods:
+            return math.nan
+        return self._buffer[0]
+
+
+class IchimokuStream:
+    """
+    Incremental Ichimoku calculator for one symbol
+
+    Feed closed candles in order with update(); each call costs O(1) and
+    returns the latest values, matching the last row of
+    IchimokuCloud.calculate + get_signals over the same candles.
+
+    Chikou clean flags are not emitted: they look chikou_period candles
+    ahead, so they are always False for the latest candle.
+    """
+
+    def __init__(self, tenkan_period: int = 9, kijun_period: int = 26,
+                 senkou_period: int = 52, chikou_period: int = 26):
+        self.tenkan_period = tenkan_period
+        self.kijun_period = kijun_period
+        self.senkou_period = senkou_period
+        self.chikou_period = chikou_period
+
+        self._tenkan_high = _RollingExtreme(tenkan_period, use_max=True)
+        self._tenkan_low = _RollingExtreme(tenkan_period, use_max=False)
+        self._kijun_high = _RollingExtreme(kijun_period, use_max=True)
+        self._kijun_low = _RollingExtreme(kijun_period, use_max=False)
+        self._senkou_high = _RollingExtreme(senkou_period, use_max=True)
+        self._senkou_low = _RollingExtreme(senkou_period, use_max=False)
+
+        # Spans are plotted kijun_period ahead, chikou is close shifted back
+        self._span_a_lag = _Lag(kijun_period)
+        self._span_b_lag = _Lag(kijun_period)
+        self._chikou_lag = _Lag(chikou_period)
+
+        self.candles_seen = 0
+        self.latest: Optional[Dict] = None
+
+    @classmethod
+    def from_ichimoku(cls, ichimoku: IchimokuCloud) -> 'IchimokuStream':
+        """Create a stream with the same periods as an IchimokuCloud"""
+        return cls(ichimoku.tenkan_period, ichimoku.kijun_period,
+                   ichimoku.senkou_period, ichimoku.chikou_period)
+
+    def reset(self):
+        """Forget all candles"""
+        for state in (self._tenkan_high, self._tenkan_low, self._kijun_high, self._kijun_low,
+                      self._senkou_high, self._senkou_low,
+                      self._span_a_lag, self._span_b_lag, self._chikou_lag):
+            state.reset()
+        self.candles_seen = 0
+        self.latest = None
+
+    def update(self, candle: Mapping) -> Dict:
+        """
+        Add one closed candle
+
+        Args:
+            candle: Mapping with 'high', 'low' and 'close' (e.g. a DataFrame row)
+
+        Returns:
+            Dict with the latest tenkan_sen, kijun_sen, senkou_span_a,
+            senkou_span_b, chikou_span, cloud_top, cloud_bottom,
+            long_signal and short_signal
+        """
+        high = float(candle['high'])
+        low = float(candle['low'])
+        close = float(candle['close'])
+
+        tenkan_sen = (self._tenkan_high.push(high) + self._tenkan_low.push(low)) / 2
+        kijun_sen = (self._kijun_high.push(high) + self._kijun_low.push(low)) / 2
+        senkou_mid = (self._senkou_high.push(high) + self._senkou_low.push(low)) / 2
+
+        senkou_span_a = self._span_a_lag.push((tenkan_sen + kijun_sen) / 2)
+        senkou_span_b = self._span_b_lag.push(senkou_mid)
+        chikou_span = self._chikou_lag.push(close)
+
+        # Same NaN handling as DataFrame.max/min(axis=1)
+        if math.isnan(senkou_span_a) or math.isnan(senkou_span_b):
+            cloud_top = cloud_bottom = senkou_span_b if math.isnan(senkou_span_a) else senkou_span_a
+        else:
+            cloud_top = max(senkou_span_a, senkou_span_b)
+            cloud_bottom = min(senkou_span_a, senkou_span_b)
+
+        # NaN comparisons are False, as in get_signals
+        long_signal = close > cloud_top and tenkan_sen > kijun_sen and close > tenkan_sen
+        short_signal = close < cloud_bottom and tenkan_sen < kijun_sen and close < tenkan_sen
+
+        self.candles_seen += 1
+        self.latest = {
+            'close': close,
+            'tenkan_sen': tenkan_sen,
+            'kijun_sen': kijun_sen,
+            'senkou_span_a': senkou_span_a,
+            'senkou_span_b': senkou_span_b,
+            'chikou_span': chikou_span,
+            'cloud_top': cloud_top,
+            'cloud_bottom': cloud_bottom,
+            'long_signal': long_signal,
+            'short_signal': short_signal
+        }
+        return self.latest
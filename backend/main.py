@@ -4,8 +4,9 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional
 import asyncio
+import time
 import uvicorn
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 import io
 import csv
@@ -14,12 +15,15 @@ from config import config
 from trading_strategy import trading_strategy
 from data_provider import data_provider
 from equity_tracker import equity_tracker
+from event_schedule import EventSchedule
+from request_scheduler import Priority
 
 app = FastAPI(title="Ichimoku Cloud Trading Bot", version="1.0.0")
 
 # Global flag to control the trading loop
 trading_loop_running = False
 trading_loop_task = None
+trading_schedule: Optional[EventSchedule] = None
 
 # Add CORS middleware
 app.add_middleware(
@@ -100,15 +104,7 @@ async def execute_trade(signal: TradeSignal, background_tasks: BackgroundTasks):
 @app.post("/api/check-exits")
 async def check_exits():
     """Check and close positions that meet exit conditions"""
-    closed_positions = []
-
-    for symbol in list(trading_strategy.portfolio.positions.keys()):
-        should_exit = await trading_strategy.check_exit_conditions(symbol)
-        if should_exit:
-            success = await trading_strategy.close_position(symbol)
-            if success:
-                closed_positions.append(symbol)
-
+    closed_positions = await trading_strategy.check_exits()
     return {"closed_positions": closed_positions, "count": len(closed_positions)}
 
 @app.get("/api/symbols")
@@ -120,7 +116,17 @@ async def get_symbols():
 
     return {
         "long_symbols": long_symbols,
-        "short_symbols": short_symbols[:50]  # Limit to top 50 for performance
+        "short_symbols": short_symbols[:50],  # Limit to top 50 for performance
+        "universe_age_seconds": data_provider.get_universe_age()
+    }
+
+@app.get("/api/suppressed-symbols")
+async def get_suppressed_symbols():
+    """Symbols skipped after repeated failures, and the exchange circuit breaker state"""
+    return {
+        "symbols": data_provider.symbol_backoff.suppressed(),
+        "skipped_requests": data_provider.symbol_backoff.skipped,
+        "circuit_breaker": data_provider.circuit_breaker.get_stats()
     }
 
 @app.get("/api/prices")
@@ -135,14 +141,14 @@ async def get_prices():
     except:
         pass
 
-    prices = await data_provider.get_multiple_prices(all_symbols)
+    prices = await data_provider.get_multiple_prices(all_symbols, Priority.UI)
 
     return {"prices": prices}
 
 @app.get("/api/chart-data/{symbol}")
 async def get_chart_data(symbol: str, timeframe: str = "1h", limit: int = 100):
     """Get chart data for a symbol"""
-    df = await data_provider.get_ohlcv(symbol, timeframe=timeframe, limit=limit)
+    df = await data_provider.get_ohlcv(symbol, timeframe=timeframe, limit=limit, priority=Priority.UI)
 
     if df.empty:
         return {"error": f"No data available for {symbol}"}
@@ -263,75 +269,72 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "paper_trading": config.get_config().PAPER_TRADING,
-        "trading_loop_running": trading_loop_running
+        "trading_loop_running": trading_loop_running,
+        "candle_cache": data_provider.candle_store.get_stats(),
+        "universe_age_seconds": data_provider.get_universe_age(),
+        "exchange_scheduler": data_provider.scheduler.get_stats(),
+        "coalesced_requests": data_provider.single_flight.get_stats(),
+        "circuit_breaker": data_provider.circuit_breaker.get_stats(),
+        "signal_cache": trading_strategy.signal_cache_stats,
+        "price_snapshot_age_seconds": round(trading_strategy.price_snapshot.age(), 1) if trading_strategy.price_snapshot else None,
+        "trading_schedule": trading_schedule.get_stats() if trading_schedule else None
     }
 
 async def trading_loop():
-    """Main trading loop that runs continuously"""
-    global trading_loop_running
+    """Main trading loop: sleeps until the next scheduled event, then runs it"""
+    global trading_loop_running, trading_schedule
     trading_loop_running = True
-    
+    config_data = config.get_config()
+
     print("🤖 Trading loop started")
-    print("📊 Clock-based trading: Entries every 5min, exits on hourly candle close (00:00, 01:00, 02:00...)")
-    
-    # Track last scan time to avoid too frequent scanning
-    last_scan_time = None
-    scan_interval = 300  # Scan every 5 minutes
-    
-    # Track last hourly candle we checked for exits (clock-based)
-    last_exit_check_hour = None
-    
+    print(f"📊 Event-driven trading: Exits {config_data.EXIT_CHECK_DELAY_SECONDS:.0f}s after each hourly candle close, "
+          f"entries every {config_data.SCAN_INTERVAL_SECONDS / 60:.0f}min")
+
+    # Exits run on hourly candle closes (plus a settle delay), scans on a fixed cadence, both once at startup
+    trading_schedule = EventSchedule()
+    trading_schedule.add('exit_check', 3600, offset=config_data.EXIT_CHECK_DELAY_SECONDS, aligned=True)
+    trading_schedule.add('scan', config_data.SCAN_INTERVAL_SECONDS)
+    trading_schedule.add('revalue', config_data.REVALUE_INTERVAL_SECONDS, run_now=False)
+
+    consecutive_errors = 0
     while trading_loop_running:
         try:
+            await asyncio.sleep(trading_schedule.seconds_until_next())
+            due = {event.name for event in trading_schedule.due()}
             current_time = datetime.now()
-            
-            # Should we scan for entries? (every 5 minutes)
-            time_since_last_scan = None
-            if last_scan_time:
-                time_since_last_scan = (current_time - last_scan_time).total_seconds()
-            
-            should_scan = (last_scan_time is None or time_since_last_scan >= scan_interval)
-            
-            # Check if a new hourly candle has completed (clock-based: 00:00, 01:00, 02:00, etc.)
-            # We check a few minutes after the hour to ensure the candle is fully formed and available
-            current_hour = current_time.replace(minute=0, second=0, microsecond=0)
-            is_new_hourly_candle = (
-                last_exit_check_hour is None or 
-                (current_hour > last_exit_check_hour and current_time.minute >= 2)
-            )
-            
-            if should_scan:
-                print(f"\n⏰ [{current_time.strftime('%Y-%m-%d %H:%M:%S')}] Running trading cycle...")
-                
-                # Step 1: Check exit conditions ONLY when a new hourly candle has completed
-                if is_new_hourly_candle and len(trading_strategy.portfolio.positions) > 0:
-                    print(f"📊 New hourly candle completed at {current_hour.strftime('%H:%M')} - Checking exit conditions...")
-                    closed_count = 0
-                    for symbol in list(trading_strategy.portfolio.positions.keys()):
-                        should_exit = await trading_strategy.check_exit_conditions(symbol)
-                        if should_exit:
-                            success = await trading_strategy.close_position(symbol)
-                            if success:
-                                closed_count += 1
-                                print(f"✅ Closed position: {symbol}")
-                    
-                    if closed_count > 0:
-                        print(f"📉 Closed {closed_count} position(s)")
+
+            # Step 1: Check exit conditions when a new hourly candle has completed
+            if 'exit_check' in due:
+                lateness = trading_schedule.mark_run('exit_check')
+                if len(trading_strategy.portfolio.positions) > 0:
+                    current_hour = current_time.replace(minute=0, second=0, microsecond=0)
+                    candle_close = time.time() // 3600 * 3600
+                    print(f"\n⏰ [{current_time.strftime('%Y-%m-%d %H:%M:%S')}] New hourly candle completed at "
+                          f"{current_hour.strftime('%H:%M')} - Checking exit conditions... (fired {lateness:.2f}s late)")
+                    closed = await trading_strategy.check_exits()
+                    for symbol in closed:
+                        print(f"✅ Closed position: {symbol}")
+
+                    if closed:
+                        print(f"📉 Closed {len(closed)} position(s) {time.time() - candle_close:.2f}s after the candle close")
                     else:
                         print("✓ No positions to close")
-                    
-                    # Update the last exit check hour
-                    last_exit_check_hour = current_hour
-                elif len(trading_strategy.portfolio.positions) > 0 and not is_new_hourly_candle:
-                    print(f"⏳ Holding {len(trading_strategy.portfolio.positions)} position(s) - Next exit check at {(current_hour + timedelta(hours=1)).strftime('%H:%M')}")
-                
+
+            if 'scan' in due:
+                lateness = trading_schedule.mark_run('scan')
+                print(f"\n⏰ [{current_time.strftime('%Y-%m-%d %H:%M:%S')}] Running trading cycle... (fired {lateness:.2f}s late)")
+
+                if len(trading_strategy.portfolio.positions) > 0 and 'exit_check' not in due:
+                    next_exit_check = datetime.fromtimestamp(trading_schedule.events['exit_check'].next_run)
+                    print(f"⏳ Holding {len(trading_strategy.portfolio.positions)} position(s) - Next exit check at {next_exit_check.strftime('%H:%M:%S')}")
+
                 # Step 2: Scan for new signals and open positions (priority-based, anytime)
                 print("🔍 Scanning for new trading signals...")
                 signals = await trading_strategy.scan_for_signals()
-                
+
                 if signals:
                     print(f"📡 Found {len(signals)} signal(s)")
-                    
+
                     opened_count = 0
                     for symbol, signal_type in signals.items():
                         if symbol not in trading_strategy.portfolio.positions:
@@ -339,41 +342,44 @@ async def trading_loop():
                             if success:
                                 opened_count += 1
                                 print(f"✅ Opened {signal_type} position: {symbol}")
-                    
+
                     if opened_count > 0:
                         print(f"📈 Opened {opened_count} new position(s)")
                 else:
                     print("✓ No new signals found")
-                
-                # Step 3: Update portfolio metrics
+
+                # Step 3: Update portfolio metrics (this counts as the revaluation)
                 await trading_strategy.update_portfolio_value()
+                trading_schedule.postpone('revalue')
                 print(f"💰 Portfolio value: ${trading_strategy.portfolio.total_value:.2f}")
                 print(f"📊 Open positions: {len(trading_strategy.portfolio.positions)}")
-                
-                last_scan_time = current_time
-                print(f"✓ Trading cycle complete. Next scan in {scan_interval/60:.0f} minutes")
-            else:
+                print(f"✓ Trading cycle complete. Next scan in {trading_schedule.seconds_until('scan') / 60:.1f} minutes")
+            elif 'revalue' in due:
                 # Just update portfolio value
+                lateness = trading_schedule.mark_run('revalue')
                 await trading_strategy.update_portfolio_value()
-                minutes_until_next = int((scan_interval - time_since_last_scan) / 60)
-                if minutes_until_next > 0:
-                    print(f"⏳ [{current_time.strftime('%H:%M:%S')}] Next scan in ~{minutes_until_next} minutes")
-            
-            # Check every minute
-            await asyncio.sleep(60)
-            
+                print(f"⏳ [{current_time.strftime('%H:%M:%S')}] Portfolio revalued (fired {lateness:.2f}s late) - "
+                      f"Next scan in ~{trading_schedule.seconds_until('scan') / 60:.0f} minutes")
+            consecutive_errors = 0
+
         except Exception as e:
-            print(f"❌ Error in trading loop: {e}")
+            # Events are rescheduled before they run, so a failing one is retried at its next time.
+            # Back off anyway, so an event still due (e.g. one that failed before being marked) can't spin the loop.
+            consecutive_errors += 1
+            backoff = min(config_data.TRADING_LOOP_BACKOFF_BASE_SECONDS * 2 ** (consecutive_errors - 1),
+                          config_data.TRADING_LOOP_BACKOFF_MAX_SECONDS)
+            print(f"❌ Error in trading loop: {e} (retrying in {backoff:.0f}s)")
             import traceback
             traceback.print_exc()
-            await asyncio.sleep(60)  # Wait 1 minute before retrying on error
-    
+            await asyncio.sleep(backoff)
+
     print("🛑 Trading loop stopped")
 
 @app.on_event("startup")
 async def startup_event():
     """Start the trading loop when the application starts"""
     global trading_loop_task
+    data_provider.start_universe_refresh()
     trading_loop_task = asyncio.create_task(trading_loop())
     print("✅ Application started - Trading loop initiated")
 
@@ -388,6 +394,7 @@ async def shutdown_event():
             await trading_loop_task
         except asyncio.CancelledError:
             pass
+    await data_provider.close()
     print("✅ Application shutdown - Trading loop stopped")
 
 @app.post("/api/start-trading")
@@ -405,6 +412,8 @@ async def stop_trading():
     global trading_loop_running
     if trading_loop_running:
         trading_loop_running = False
+        if trading_loop_task:
+            trading_loop_task.cancel()  # Don't wait out the sleep until the next event
         return {"message": "Trading loop stopped"}
     return {"message": "Trading loop not running"}
 
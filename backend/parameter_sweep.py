@@ -0,0 +1,236 @@
+"""
+Ichimoku period grid search over historical candles
+
+Usage:
+    python parameter_sweep.py [limit]
+    python parameter_sweep.py --offline [limit]
+
+As in backtest.py, --offline reads the candle database (see candle_db.py
+backfill) instead of fetching from the exchange. Every combination in
+default_grid() is evaluated and the best are printed, ranked by average
+forward return after a signal.
+"""
+import itertools
+import sys
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import config
+
+
+class SparseTable:
+    """
+    Range max/min over an array, answered in O(1) per query after an O(n log n) build
+
+    Level k holds the extreme of every run of 2**k values, so any window is
+    covered by two overlapping runs. NaN propagates like a pandas rolling
+    window: a window containing NaN yields NaN.
+    """
+
+    def __init__(self, values: np.ndarray, reduce):
+        self.reduce = reduce
+        self.levels = [np.asarray(values, dtype=float)]
+        length = 1
+        while length * 2 <= len(values):
+            previous = self.levels[-1]
+            self.levels.append(reduce(previous[:-length], previous[length:]))
+            length *= 2
+
+    def rolling(self, window: int) -> np.ndarray:
+        """
+        Extreme of the trailing `window` values at every position
+
+        Args:
+            window: Window length
+
+        Returns:
+            Array aligned with the input, NaN until the window is full
+        """
+        n = len(self.levels[0])
+        out = np.full(n, np.nan)
+        if window > n:
+            return out
+
+        k = window.bit_length() - 1
+        level = self.levels[k]
+        # Window ending at i starts at i - window + 1; second run ends at i
+        starts = np.arange(0, n - window + 1)
+        out[window - 1:] = self.reduce(level[starts], level[starts + window - (1 << k)])
+        return out
+
+
+class ParameterSweep:
+    """
+    Evaluate many (tenkan, kijun, senkou) combinations over the same OHLCV history
+
+    Highs and lows are indexed once per symbol; each combination's lines
+    and signals are then built from range queries instead of new rolling
+    windows. Lines match IchimokuCloud.calculate with the same periods.
+    """
+
+    def __init__(self, horizon: int = 24):
+        """
+        Args:
+            horizon: Candles ahead used for the forward return after a signal appears
+        """
+        self.horizon = horizon
+
+    def run(self, frames: Dict[str, pd.DataFrame], tenkan_periods: Iterable[int],
+            kijun_periods: Iterable[int], senkou_periods: Iterable[int]) -> pd.DataFrame:
+        """
+        Run the grid over every symbol
+
+        Only combinations with tenkan < kijun < senkou are evaluated.
+
+        Args:
+            frames: Dictionary of symbol -> DataFrame with high, low and close
+            tenkan_periods: Tenkan-sen periods to try
+            kijun_periods: Kijun-sen periods to try
+            senkou_periods: Senkou Span B periods to try
+
+        Returns:
+            DataFrame with one row per parameter set and signal statistics summed over symbols
+        """
+        grid = [combo for combo in itertools.product(tenkan_periods, kijun_periods, senkou_periods)
+                if combo[0] < combo[1] < combo[2]]
+        totals = {combo: self._empty_stats() for combo in grid}
+
+        for df in frames.values():
+            highs = SparseTable(df['high'].to_numpy(dtype=float), np.maximum)
+            lows = SparseTable(df['low'].to_numpy(dtype=float), np.minimum)
+            closes = df['close'].to_numpy(dtype=float)
+            forward_returns = self._forward_returns(closes)
+            midpoints = {}
+
+            for combo in grid:
+                for key, value in self._evaluate(combo, highs, lows, closes, forward_returns, midpoints).items():
+                    totals[combo][key] += value
+
+        rows = []
+        for (tenkan, kijun, senkou), stats in totals.items():
+            rows.append({
+                'tenkan_period': tenkan,
+                'kijun_period': kijun,
+                'senkou_period': senkou,
+                'long_bars': stats['long_bars'],
+                'short_bars': stats['short_bars'],
+                'long_entries': stats['long_entries'],
+                'short_entries': stats['short_entries'],
+                'long_avg_return': stats['long_return'] / stats['long_samples'] if stats['long_samples'] else np.nan,
+                'short_avg_return': stats['short_return'] / stats['short_samples'] if stats['short_samples'] else np.nan,
+                'long_win_rate': stats['long_wins'] / stats['long_samples'] if stats['long_samples'] else np.nan,
+                'short_win_rate': stats['short_wins'] / stats['short_samples'] if stats['short_samples'] else np.nan
+            })
+
+        return pd.DataFrame(rows)
+
+    def lines(self, combo: Tuple[int, int, int], highs: SparseTable, lows: SparseTable,
+              midpoints: Dict[int, np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Ichimoku lines for one parameter set
+
+        Args:
+            combo: (tenkan, kijun, senkou) periods
+            highs: SparseTable of highs
+            lows: SparseTable of lows
+            midpoints: Cache of window -> (highest high + lowest low) / 2, shared across combinations
+
+        Returns:
+            Dictionary with tenkan_sen, kijun_sen, senkou_span_a, senkou_span_b, cloud_top and cloud_bottom
+        """
+        tenkan, kijun, senkou = combo
+        midpoints = {} if midpoints is None else midpoints
+
+        for window in combo:
+            if window not in midpoints:
+                midpoints[window] = (highs.rolling(window) + lows.rolling(window)) / 2
+
+        tenkan_sen = midpoints[tenkan]
+        kijun_sen = midpoints[kijun]
+        senkou_span_a = self._shift((tenkan_sen + kijun_sen) / 2, kijun)
+        senkou_span_b = self._shift(midpoints[senkou], kijun)
+
+        return {
+            'tenkan_sen': tenkan_sen,
+            'kijun_sen': kijun_sen,
+            'senkou_span_a': senkou_span_a,
+            'senkou_span_b': senkou_span_b,
+            'cloud_top': np.fmax(senkou_span_a, senkou_span_b),
+            'cloud_bottom': np.fmin(senkou_span_a, senkou_span_b)
+        }
+
+    def _evaluate(self, combo: Tuple[int, int, int], highs: SparseTable, lows: SparseTable,
+                  closes: np.ndarray, forward_returns: np.ndarray, midpoints: Dict[int, np.ndarray]) -> Dict:
+        """Signal statistics for one symbol and parameter set"""
+        lines = self.lines(combo, highs, lows, midpoints)
+        tenkan_sen = lines['tenkan_sen']
+        kijun_sen = lines['kijun_sen']
+
+        # Same conditions as IchimokuCloud.get_signals
+        long_signal = (closes > lines['cloud_top']) & (tenkan_sen > kijun_sen) & (closes > tenkan_sen)
+        short_signal = (closes < lines['cloud_bottom']) & (tenkan_sen < kijun_sen) & (closes < tenkan_sen)
+
+        stats = self._empty_stats()
+        for side, signal, direction in (('long', long_signal, 1.0), ('short', short_signal, -1.0)):
+            # Entries are False -> True transitions, as in TradingStrategy.check_signal
+            entries = signal & ~np.concatenate(([False], signal[:-1]))
+            returns = forward_returns[entries] * direction
+            returns = returns[~np.isnan(returns)]
+
+            stats[f'{side}_bars'] = int(signal.sum())
+            stats[f'{side}_entries'] = int(entries.sum())
+            stats[f'{side}_samples'] = len(returns)
+            stats[f'{side}_return'] = float(returns.sum())
+            stats[f'{side}_wins'] = int((returns > 0).sum())
+
+        return stats
+
+    def _forward_returns(self, closes: np.ndarray) -> np.ndarray:
+        """Close-to-close return over the next `horizon` candles (NaN near the end)"""
+        returns = np.full(len(closes), np.nan)
+        if len(closes) > self.horizon:
+            returns[:-self.horizon] = closes[self.horizon:] / closes[:-self.horizon] - 1
+        return returns
+
+    @staticmethod
+    def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+        out = np.full(len(values), np.nan)
+        if periods < len(values):
+            out[periods:] = values[:len(values) - periods]
+        return out
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        stats = {}
+        for side in ('long', 'short'):
+            stats.update({f'{side}_bars': 0, f'{side}_entries': 0, f'{side}_samples': 0,
+                          f'{side}_return': 0.0, f'{side}_wins': 0})
+        return stats
+
+
+def default_grid() -> Tuple[List[int], List[int], List[int]]:
+    """Period ranges around the configured TENKAN/KIJUN/SENKOU periods"""
+    config_data = config.get_config()
+    return (list(range(max(2, config_data.TENKAN_PERIOD - 4), config_data.TENKAN_PERIOD + 5)),
+            list(range(max(3, config_data.KIJUN_PERIOD - 10), config_data.KIJUN_PERIOD + 11, 2)),
+            list(range(max(4, config_data.SENKOU_PERIOD - 20), config_data.SENKOU_PERIOD + 21, 4)))
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    from backtest import load_frames, load_stored_frames
+
+    args = [arg for arg in sys.argv[1:] if arg != '--offline']
+    if '--offline' in sys.argv[1:]:
+        frames = load_stored_frames(int(args[0]) if args else None)
+    else:
+        frames = asyncio.run(load_frames(int(args[0]) if args else 1000))
+    results = ParameterSweep().run(frames, *default_grid())
+
+    results['avg_return'] = results[['long_avg_return', 'short_avg_return']].mean(axis=1)
+    print(f"\n📊 Parameter sweep over {len(frames)} symbols, {len(results)} combinations")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(results.sort_values('avg_return', ascending=False).head(20).to_string(index=False))
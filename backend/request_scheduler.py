@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+
+class Priority(IntEnum):
+    """Request classes, most urgent first"""
+    EXIT = 0    # Exit checks and closing positions
+    ENTRY = 1   # Opening positions
+    SCAN = 2    # Signal scans and background data refreshes
+    UI = 3      # Dashboard and API reads
+
+
+# Binance spot request weights (GET /api/v3/...)
+REQUEST_WEIGHTS = {
+    'fetch_ohlcv': 2,      # klines
+    'fetch_ticker': 2,     # ticker/24hr for one symbol
+    'fetch_tickers': 80,   # ticker/24hr for every symbol
+    'load_markets': 20,    # exchangeInfo
+}
+
+
+class RequestScheduler:
+    """
+    Admits exchange requests one at a time, most urgent class first
+
+    A request starts once it is at the head of the queue, the minimum
+    spacing since the previous start has passed and its weight fits in the
+    rolling one-minute budget. Within a class requests start in arrival
+    order; a more urgent arrival overtakes anything still waiting.
+    """
+
+    def __init__(self, weight_per_minute: int = 6000, min_interval: float = 0.0):
+        """
+        Args:
+            weight_per_minute: Request weight allowed in any 60 second window
+            min_interval: Minimum seconds between request starts
+        """
+        self.weight_per_minute = weight_per_minute
+        self.min_interval = min_interval
+
+        self._queue: List = []  # Heap of (priority, sequence, weight, future, enqueued_at)
+        self._sequence = itertools.count()
+        self._used = deque()  # (start time, weight) of requests in the last minute
+        self._used_weight = 0
+        self._last_start = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self.stats = {priority: {'requests': 0, 'weight': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+                      for priority in Priority}
+
+    async def acquire(self, priority: Priority = Priority.SCAN, weight: int = 1):
+        """
+        Wait until a request of this class and weight may start
+
+        Args:
+            priority: Request class
+            weight: Exchange request weight
+        """
+        self._ensure_dispatcher()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), weight, future, time.monotonic()))
+        self._wakeup.set()
+        await future
+
+    def _ensure_dispatcher(self):
+        """Start the dispatcher on the running loop if it is not running"""
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is not None and self._dispatcher.get_loop() is not loop:
+            self._queue = []  # Left over from a loop that has gone away
+            self._dispatcher = None
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        # Runs while requests are queued; acquire() starts it again when needed
+        while self._queue:
+            priority, _, weight, future, enqueued_at = self._queue[0]
+            if future.done():  # Caller was cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+
+            delay = self._delay(weight)
+            if delay > 0:
+                # Sleep, but re-check the head if a more urgent request arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._queue)
+            now = time.monotonic()
+            self._last_start = now
+            self._used.append((now, weight))
+            self._used_weight += weight
+
+            stats = self.stats[priority]
+            wait = now - enqueued_at
+            stats['requests'] += 1
+            stats['weight'] += weight
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+            future.set_result(None)
+
+    def _delay(self, weight: int) -> float:
+        """Seconds until a request of this weight may start"""
+        now = time.monotonic()
+        while self._used and self._used[0][0] <= now - 60:
+            self._used_weight -= self._used.popleft()[1]
+
+        delay = self._last_start + self.min_interval - now
+
+        # Wait for enough of the oldest requests to leave the window
+        excess = self._used_weight + min(weight, self.weight_per_minute) - self.weight_per_minute
+        for started, used in self._used:
+            if excess <= 0:
+                break
+            excess -= used
+            delay = max(delay, started + 60 - now)
+
+        return delay
+
+    def get_stats(self) -> Dict:
+        """Queue depth, wait times and weight use per priority class"""
+        depth = {priority: 0 for priority in Priority}
+        for priority, _, _, future, _ in self._queue:
+            if not future.done():
+                depth[priority] += 1
+
+        self._delay(0)  # Expire requests older than a minute
+        return {
+            'weight_used_1m': self._used_weight,
+            'weight_per_minute': self.weight_per_minute,
+            'queued': sum(depth.values()),
+            'classes': {
+                priority.name.lower(): {
+                    'queued': depth[priority],
+                    'requests': stats['requests'],
+                    'weight': stats['weight'],
+                    'avg_wait_ms': round(stats['total_wait'] / stats['requests'] * 1000, 2) if stats['requests'] else 0.0,
+                    'max_wait_ms': round(stats['max_wait'] * 1000, 2)
+                }
+                for priority, stats in self.stats.items()
+            }
+        }
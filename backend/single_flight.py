@@ -0,0 +1,65 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    priority: int
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one in-flight execution
+
+    A caller joins a flight only if it was started at the same or a more
+    urgent priority, so urgent callers never wait on a request queued
+    behind bulk traffic. The shared call keeps running if the caller that
+    started it is cancelled; every joiner gets the same result or exception.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.saved = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable], priority: int = 0):
+        """
+        Run func(), or wait for an identical call already in flight
+
+        Args:
+            key: Identity of the call (e.g. method name and arguments)
+            func: Coroutine function making the call
+            priority: Urgency of this caller (lower is more urgent)
+
+        Returns:
+            The call's result
+        """
+        flight = self._flights.get(key)
+        if (flight is not None and flight.priority <= priority and not flight.task.done()
+                and flight.task.get_loop() is asyncio.get_running_loop()):
+            self.saved += 1
+            return await asyncio.shield(flight.task)
+
+        self.calls += 1
+        flight = _Flight(asyncio.ensure_future(func()), priority)
+        self._flights[key] = flight
+        flight.task.add_done_callback(lambda task: self._finish(key, flight))
+        return await asyncio.shield(flight.task)
+
+    def _finish(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            flight.task.exception()  # Retrieved here in case every caller was cancelled
+
+    def get_stats(self) -> Dict:
+        """Exchange calls made and calls saved by joining an identical one"""
+        requested = self.calls + self.saved
+        return {
+            'in_flight': len(self._flights),
+            'calls': self.calls,
+            'saved': self.saved,
+            'saved_rate': round(self.saved / requested * 100, 2) if requested else 0.0
+        }
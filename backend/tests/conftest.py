@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from config import config
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory, so positions and equity files stay out of the tree"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def replay(monkeypatch):
+    """Point trading_strategy at a DataProvider on a synthetic ReplayExchange (SYN0-SYN99 plus LONG_COINS)"""
+    import trading_strategy as strategy_module
+    from tests.helpers import replay_provider
+
+    provider = replay_provider([coin + '/USDT' for coin in config.get_config().LONG_COINS])
+    monkeypatch.setattr(strategy_module, 'data_provider', provider)
+    yield provider
+    asyncio.run(provider.close())
@@ -0,0 +1,191 @@
+"""
+Shared test helpers: seeded synthetic data, a local fake exchange and the
+original implementations kept as parity references
+
+benchmark.py imports these as well, so timings and tests use the same inputs.
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from ichimoku import IchimokuCloud
+
+
+def make_ohlcv(n: int, seed: int = 42, start: str = '2024-01-01') -> pd.DataFrame:
+    """
+    Build a seeded random-walk hourly OHLCV frame
+
+    Args:
+        n: Number of candles
+        seed: Random seed
+        start: Timestamp of the first candle
+
+    Returns:
+        DataFrame shaped like DataProvider.get_ohlcv output
+    """
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.uniform(1_000, 10_000, n)
+
+    index = pd.date_range(start, periods=n, freq='h', name='timestamp')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low,
+                         'close': close, 'volume': volume}, index=index)
+
+
+def legacy_is_chikou_clean(ichimoku: IchimokuCloud, df: pd.DataFrame, short: bool = False) -> pd.Series:
+    """Original row-by-row Chikou check, kept as the parity reference"""
+    clean_signals = []
+
+    for idx in df.index:
+        current_price = df.loc[idx, 'close']
+        chikou_price = df.loc[idx, 'chikou_span']
+
+        if pd.isna(chikou_price):
+            clean_signals.append(False)
+            continue
+
+        current_idx = df.index.get_loc(idx)
+        chikou_shift = ichimoku.chikou_period
+
+        if current_idx + chikou_shift >= len(df):
+            clean_signals.append(False)
+            continue
+
+        lookback_data = df.iloc[max(0, current_idx - chikou_shift):current_idx + 1]
+
+        if len(lookback_data) == 0:
+            clean_signals.append(False)
+            continue
+
+        if short:
+            clean_signals.append(current_price < lookback_data['high'].max())
+        else:
+            clean_signals.append(current_price > lookback_data['low'].min())
+
+    return pd.Series(clean_signals, index=df.index)
+
+
+def legacy_save_positions(path: str, positions: List):
+    """Original save_positions: rewrite every position and trade, pretty-printed, on each save"""
+    from trading_strategy import TradingStrategy
+
+    with open(path, 'w') as f:
+        json.dump({'positions': [TradingStrategy._position_to_dict(pos) for pos in positions]}, f, indent=2)
+
+
+def replay_provider(long_symbols: List[str], latency: float = 0.0):
+    """DataProvider on a synthetic ReplayExchange serving long_symbols and SYN0-SYN99"""
+    from config import config
+    from data_provider import DataProvider
+    from exchange_adapters import ReplayExchange
+
+    config_data = config.get_config()
+    saved = config_data.CANDLE_DB_ENABLED
+    try:
+        config_data.CANDLE_DB_ENABLED = False
+        provider = DataProvider()
+    finally:
+        config_data.CANDLE_DB_ENABLED = saved
+    provider.exchange = ReplayExchange(latency=latency, symbols=long_symbols + [f'SYN{i}/USDT' for i in range(100)])
+    provider.scheduler.min_interval = 0
+    return provider
+
+
+class FakeExchangeServer:
+    """
+    Local HTTP server answering the Binance spot endpoints the data provider uses
+
+    Runs on its own thread and event loop, so both exchange clients can be
+    pointed at it with a configurable response latency.
+    """
+
+    def __init__(self, symbols: List[str], latency: float = 0.0):
+        self.symbols = symbols
+        self.latency = latency  # Added to every klines response, in seconds
+        self.requests = 0
+        self.loop = None
+        self.runner = None
+        self.base_url = None
+        self._candles = {}  # (symbol, limit) -> OHLCV values, so responses cost the server nothing
+
+    def start(self) -> str:
+        """Start serving on a free local port and return the base URL"""
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get('/api/v3/exchangeInfo', self.exchange_info)
+        app.router.add_get('/api/v3/klines', self.klines)
+
+        self.loop = asyncio.new_event_loop()
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        self.loop.run_until_complete(site.start())
+        port = self.runner.addresses[0][1]
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{port}'
+        return self.base_url
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def provider(self, client: str = 'thread'):
+        """
+        DataProvider using the given exchange client against this server
+
+        The on-disk candle database and request spacing are disabled, so
+        timings measure the client and transport.
+        """
+        from config import config
+        from data_provider import DataProvider
+
+        config_data = config.get_config()
+        saved = (config_data.EXCHANGE_CLIENT, config_data.CANDLE_DB_ENABLED)
+        try:
+            config_data.EXCHANGE_CLIENT, config_data.CANDLE_DB_ENABLED = client, False
+            provider = DataProvider()
+        finally:
+            config_data.EXCHANGE_CLIENT, config_data.CANDLE_DB_ENABLED = saved
+
+        provider.exchange.urls['api'] = {
+            name: self.base_url + url[url.index('/', len('https://')):] if isinstance(url, str) else url
+            for name, url in provider.exchange.urls['api'].items()}
+        provider.exchange.rateLimit = 0
+        provider.scheduler.min_interval = 0
+        return provider
+
+    async def exchange_info(self, request):
+        from aiohttp import web
+
+        return web.json_response({'timezone': 'UTC', 'serverTime': int(time.time() * 1000), 'rateLimits': [], 'symbols': [{
+            'symbol': symbol.replace('/', ''), 'status': 'TRADING', 'baseAsset': symbol.split('/')[0], 'quoteAsset': 'USDT',
+            'baseAssetPrecision': 8, 'quotePrecision': 8, 'quoteAssetPrecision': 8, 'orderTypes': ['LIMIT', 'MARKET'],
+            'isSpotTradingAllowed': True, 'isMarginTradingAllowed': False, 'filters': [],
+            'permissions': ['SPOT'], 'permissionSets': [['SPOT']]} for symbol in self.symbols]})
+
+    async def klines(self, request):
+        from aiohttp import web
+
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        limit = int(request.query.get('limit', 500))
+        key = (request.query['symbol'], limit)
+        if key not in self._candles:
+            seed = self.symbols.index(request.query['symbol'].replace('USDT', '/USDT'))
+            self._candles[key] = make_ohlcv(limit, seed=seed).to_numpy()
+        hour_ms = 3_600_000
+        end = int(time.time() * 1000) // hour_ms * hour_ms
+        rows = [[end - (limit - 1 - i) * hour_ms, *(str(value) for value in values), end - (limit - 2 - i) * hour_ms - 1,
+                 '0', 0, '0', '0', '0'] for i, values in enumerate(self._candles[key])]
+        return web.json_response(rows)
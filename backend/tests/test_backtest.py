@@ -0,0 +1,36 @@
+import contextlib
+import io
+
+import pytest
+
+from backtest import Backtester
+from tests.helpers import make_ohlcv
+from trading_strategy import PortfolioAggregates
+
+
+@pytest.fixture(scope='module')
+def result():
+    frames = {f'SYM{i}/USDT': make_ohlcv(1_500, seed=i) for i in range(12)}
+    backtester = Backtester(initial_value=10_000.0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return backtester, backtester.run(frames)
+
+
+def test_backtester_has_the_strategy_state(result):
+    backtester, _ = result
+    assert backtester.positions_file is None
+    assert backtester.last_action_timestamp == {} and backtester.signal_cache == {}
+
+
+def test_cash_reconciles_with_trades_and_open_margin(result):
+    backtester, outcome = result
+    assert outcome.trades
+
+    aggregates = PortfolioAggregates.from_positions(list(outcome.open_positions.values()), outcome.trades, 10_000.0)
+    assert backtester.aggregates.peak_equity >= aggregates.peak_equity > 10_000.0
+    assert backtester.aggregates.peak_equity == backtester.portfolio.peak_value
+    aggregates.peak_equity = backtester.aggregates.peak_equity
+    assert aggregates.matches(backtester.aggregates)
+    assert backtester.portfolio.available_cash == pytest.approx(
+        10_000.0 - aggregates.locked_margin + aggregates.realized_pnl)
+    assert outcome.summary['realized_pnl'] == round(aggregates.realized_pnl, 2)
@@ -0,0 +1,53 @@
+import asyncio
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+import main
+from backtest import Backtester
+from tests.helpers import replay_provider
+
+SYMBOLS = [f'SYN{i}/USDT' for i in range(4)]
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    """Candles as DataProvider.get_ohlcv hands them out: slices of the read-only cached series"""
+    provider = replay_provider([])
+    monkeypatch.setattr(main, 'data_provider', provider)
+
+    async def fetch():
+        return {symbol: await provider.get_ohlcv(symbol, limit=300) for symbol in SYMBOLS}
+
+    frames = asyncio.run(fetch())
+    yield provider, frames
+    asyncio.run(provider.close())
+
+
+def test_writes_through_cached_frames_raise(frames):
+    provider, frames = frames
+    df = frames[SYMBOLS[0]]
+    cached = provider.candle_store.get(SYMBOLS[0], '1h').candles.copy()
+
+    writes = [lambda: df.iloc.__setitem__((0, 0), 1.0),
+              lambda: df.loc.__setitem__((df.index[0], 'close'), 1.0),
+              lambda: df['close'].to_numpy().__setitem__(0, 1.0),
+              lambda: df.to_numpy().__setitem__((0, 0), 1.0)]
+    for write in writes:
+        with pytest.raises(ValueError, match='read-only'):
+            write()
+
+    pd.testing.assert_frame_equal(provider.candle_store.get(SYMBOLS[0], '1h').candles, cached)
+
+
+def test_callers_only_read_cached_frames(frames):
+    provider, frames = frames
+
+    chart = asyncio.run(main.get_chart_data(SYMBOLS[0], limit=100))
+    assert len(chart['data']) == 100
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = Backtester(initial_value=10_000.0).run(frames)
+    assert len(result.equity_curve) == 300
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from candle_db import CandleDB
+from request_scheduler import Priority
+from tests.helpers import FakeExchangeServer, replay_provider
+
+SYMBOLS = [f'SYM{i}/USDT' for i in range(8)]
+MARKETS = {symbol: {'active': True, 'type': 'spot'} for symbol in SYMBOLS}
+
+
+@pytest.fixture
+def server():
+    server = FakeExchangeServer(SYMBOLS, latency=0.01)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_exchange_clients_return_the_same_candles(server):
+    async def fetch_all(provider):
+        frames = await asyncio.gather(*(provider.get_ohlcv(symbol, limit=100) for symbol in SYMBOLS))
+        await provider.close()
+        return frames
+
+    thread_frames = asyncio.run(fetch_all(server.provider('thread')))
+    async_frames = asyncio.run(fetch_all(server.provider('async')))
+
+    for thread_df, async_df in zip(thread_frames, async_frames):
+        assert not thread_df.empty and thread_df.equals(async_df)
+
+
+def test_concurrent_identical_requests_share_one_exchange_call(server):
+    async def dashboards(provider):
+        await provider.get_ohlcv(SYMBOLS[0])  # Load markets
+        provider.candle_store.clear()
+        before = server.requests
+        await asyncio.gather(*(provider.get_ohlcv(symbol, priority=Priority.UI)
+                               for _ in range(5) for symbol in SYMBOLS))
+        await provider.close()
+        return server.requests - before
+
+    assert asyncio.run(dashboards(server.provider())) == len(SYMBOLS)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """DataProvider whose exchange calls go to a scripted _call"""
+    provider = replay_provider([])
+    provider.calls = []
+    provider.failing = set()
+
+    async def call(method, *args, priority=Priority.SCAN):
+        provider.calls.append(method)
+        await asyncio.sleep(0.01)
+        if method in provider.failing:
+            raise RuntimeError(f"{method} unavailable")
+        if method == 'load_markets':
+            return MARKETS
+        return {symbol: {'last': 1.0 + i, 'quoteVolume': 10.0 * i} for i, symbol in enumerate(SYMBOLS)}
+
+    monkeypatch.setattr(provider, '_call', call)
+    yield provider
+    asyncio.run(provider.close())
+
+
+def test_failed_tickers_refresh_serves_the_previous_snapshot(provider):
+    provider.tickers = {'A/USDT': {'last': 1.0}}
+    provider.failing.add('fetch_tickers')
+
+    async def run():
+        results = await asyncio.gather(*(provider.get_tickers() for _ in range(10)))
+        results.append(await provider.get_tickers())
+        return results
+
+    assert all(tickers == {'A/USDT': {'last': 1.0}} for tickers in asyncio.run(run()))
+    assert provider.calls == ['fetch_tickers']
+
+    provider._tickers_failed_at -= 60  # Past TICKER_RETRY_SECONDS
+    provider.failing.clear()
+    assert SYMBOLS[0] in asyncio.run(provider.get_tickers())
+
+
+def test_failed_first_universe_load_is_not_retried_by_every_caller(provider):
+    provider.failing.add('load_markets')
+
+    async def run():
+        await asyncio.gather(*(provider._ensure_universe() for _ in range(10)))
+        await provider._ensure_universe()
+
+    asyncio.run(run())
+
+    assert provider.calls == ['load_markets'] and provider.universe == []
+
+
+def test_universe_refresh_keeps_the_previous_ranking_when_tickers_fail(provider):
+    asyncio.run(provider.refresh_universe())
+    ranking = list(provider.volume_ranking)
+    assert [symbol for symbol, _ in ranking] == SYMBOLS[::-1]
+
+    provider.failing.add('fetch_tickers')
+    asyncio.run(provider.refresh_universe())
+
+    assert provider.volume_ranking == ranking and provider.universe == SYMBOLS
+
+
+def test_stored_candles_with_a_gap_are_not_used_as_the_seed(tmp_path):
+    provider = replay_provider(['BTC/USDT'])
+    provider.candle_db = CandleDB(str(tmp_path))
+
+    async def run():
+        candles = await provider.fetch_ohlcv('BTC/USDT', '1h', None, 100)
+        provider.candle_db.append('BTC/USDT', '1h', candles.drop(candles.index[80:85]))
+        seeded = await provider.get_ohlcv('BTC/USDT', limit=50)
+        await provider.close()
+        return seeded
+
+    seeded = asyncio.run(run())
+    assert len(seeded) == 50 and CandleDB.is_contiguous(seeded, '1h')
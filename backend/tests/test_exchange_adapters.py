@@ -0,0 +1,40 @@
+import os
+
+from exchange_adapters import RecordingExchange, ReplayExchange
+
+HOUR_MS = 3_600_000
+
+
+def test_recordings_are_written_on_close_and_replayed(tmp_path):
+    directory = str(tmp_path)
+    live = ReplayExchange(symbols=['BTC/USDT'])
+    start = live.milliseconds() // HOUR_MS * HOUR_MS - 100 * HOUR_MS
+    recorder = RecordingExchange(live, directory, flush_interval=3600)
+    first = recorder.fetch_ohlcv('BTC/USDT', '1h', start, 50)
+    second = recorder.fetch_ohlcv('BTC/USDT', '1h', start + 40 * HOUR_MS, 50)
+    recorder.fetch_tickers()
+    recorder.load_markets()
+    assert os.listdir(directory) == []  # Buffered until the interval elapses or close
+
+    recorder.close()
+    replayed = ReplayExchange(directory=directory).fetch_ohlcv('BTC/USDT', '1h', start, 90)
+    assert replayed == first + second[10:]
+
+    # Closing with nothing recorded leaves the files alone; a later session merges into them
+    RecordingExchange(ReplayExchange(symbols=['BTC/USDT']), directory).close()
+    later = RecordingExchange(ReplayExchange(symbols=['BTC/USDT']), directory)
+    later.fetch_ohlcv('BTC/USDT', '1h', start + 90 * HOUR_MS, 5)
+    later.close()
+    assert len(ReplayExchange(directory=directory).fetch_ohlcv('BTC/USDT', '1h', start, 95)) == 95
+
+
+def test_recordings_are_written_once_the_flush_interval_elapses(tmp_path):
+    directory = str(tmp_path)
+    live = ReplayExchange(symbols=['BTC/USDT'])
+    start = live.milliseconds() // HOUR_MS * HOUR_MS - 100 * HOUR_MS
+    recorder = RecordingExchange(live, directory, flush_interval=0)
+    recorder.load_markets()
+    candles = recorder.fetch_ohlcv('BTC/USDT', '1h', start, 50)
+
+    # Never closed, as after a SIGKILL
+    assert ReplayExchange(directory=directory).fetch_ohlcv('BTC/USDT', '1h', start, 50) == candles
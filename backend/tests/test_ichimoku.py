@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ichimoku import IchimokuCloud, IchimokuStream
+from parameter_sweep import ParameterSweep, SparseTable
+from tests.helpers import legacy_is_chikou_clean, make_ohlcv
+
+SIZES = [30, 60, 100, 1_000, 3_000]
+STREAM_COLUMNS = ['tenkan_sen', 'kijun_sen', 'senkou_span_a', 'senkou_span_b', 'chikou_span',
+                  'cloud_top', 'cloud_bottom', 'long_signal', 'short_signal']
+
+
+@pytest.mark.parametrize('short', [False, True])
+@pytest.mark.parametrize('n', SIZES)
+def test_chikou_clean_matches_legacy_loop(n, short):
+    ichimoku = IchimokuCloud()
+    df = ichimoku.calculate(make_ohlcv(n, seed=n))
+
+    method = ichimoku._is_chikou_clean_short if short else ichimoku._is_chikou_clean
+    assert method(df).equals(legacy_is_chikou_clean(ichimoku, df, short=short))
+
+
+@pytest.mark.parametrize('n', [60, 100, 1_000])
+def test_stream_matches_full_recompute(n):
+    ichimoku = IchimokuCloud()
+    df = make_ohlcv(n, seed=n)
+    expected = ichimoku.get_signals(ichimoku.calculate(df))[STREAM_COLUMNS]
+
+    stream = IchimokuStream.from_ichimoku(ichimoku)
+    rows = [stream.update(candle) for candle in df[['high', 'low', 'close']].to_dict('records')]
+
+    pd.testing.assert_frame_equal(pd.DataFrame(rows, index=df.index)[STREAM_COLUMNS], expected, check_exact=True)
+
+
+@pytest.mark.parametrize('rows', [1, 2, 8])
+@pytest.mark.parametrize('n', [60, 100, 1_000])
+def test_evaluate_tail_matches_full_history(n, rows):
+    ichimoku = IchimokuCloud()
+    df = make_ohlcv(n, seed=n)
+    expected = ichimoku.get_signals(ichimoku.calculate(df, lean=True), lean=True).iloc[-rows:]
+
+    pd.testing.assert_frame_equal(ichimoku.evaluate_tail(df, rows=rows), expected, check_exact=True)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('n', [60, 100, 1_000])
+def test_tail_signal_state_matches_full_history(n, seed):
+    ichimoku = IchimokuCloud()
+    df = make_ohlcv(n, seed=seed)
+    signals = ichimoku.get_signals(ichimoku.calculate(df))
+
+    assert ichimoku.tail_signal_state(df) == {
+        'long_signal': bool(signals['long_signal'].iloc[-1]),
+        'short_signal': bool(signals['short_signal'].iloc[-1]),
+        'long_run': ichimoku.trailing_run(signals['long_signal'].to_numpy()),
+        'short_run': ichimoku.trailing_run(signals['short_signal'].to_numpy())
+    }
+
+
+def test_panel_matches_per_symbol_signals():
+    ichimoku = IchimokuCloud()
+    candles = 100
+    # Every 7th symbol has a short history to exercise the NaN padding
+    frames = [make_ohlcv(candles if i % 7 else candles // 2, seed=i) for i in range(20)]
+
+    panel = ichimoku.calculate_panel(*ichimoku.align_panel(frames))
+    for row, df in enumerate(frames):
+        expected = ichimoku.get_signals(ichimoku.calculate(df))
+        for column, values in panel.items():
+            assert np.array_equal(values[row, candles - len(df):], expected[column].to_numpy(dtype=values.dtype),
+                                  equal_nan=values.dtype != bool), f"{column}, symbol {row}"
+
+
+@pytest.mark.parametrize('combo', [(9, 26, 52), (7, 20, 44), (12, 34, 68)])
+def test_sweep_lines_match_ichimoku(combo):
+    df = make_ohlcv(2_000)
+    highs = SparseTable(df['high'].to_numpy(), np.maximum)
+    lows = SparseTable(df['low'].to_numpy(), np.minimum)
+    expected = IchimokuCloud(*combo).calculate(df)
+
+    for column, values in ParameterSweep().lines(combo, highs, lows).items():
+        assert np.array_equal(values, expected[column].to_numpy(), equal_nan=True), column
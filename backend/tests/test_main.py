@@ -0,0 +1,41 @@
+import asyncio
+import contextlib
+import io
+
+import main
+from config import config
+from event_schedule import EventSchedule
+
+
+class FailingSchedule(EventSchedule):
+    """Always has an event due, and fails before any of them is marked as run"""
+
+    def __init__(self):
+        super().__init__()
+        self.attempts = 0
+
+    def seconds_until_next(self) -> float:
+        return 0.0
+
+    def due(self):
+        self.attempts += 1
+        raise RuntimeError("schedule unavailable")
+
+
+def test_trading_loop_backs_off_after_errors(monkeypatch):
+    config_data = config.get_config()
+    monkeypatch.setattr(config_data, 'TRADING_LOOP_BACKOFF_BASE_SECONDS', 0.01)
+    monkeypatch.setattr(config_data, 'TRADING_LOOP_BACKOFF_MAX_SECONDS', 0.04)
+    monkeypatch.setattr(main, 'EventSchedule', FailingSchedule)
+
+    async def run():
+        loop = asyncio.create_task(main.trading_loop())
+        await asyncio.sleep(0.3)
+        main.trading_loop_running = False
+        await loop
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        asyncio.run(run())
+
+    # 0.01 + 0.02 + 0.04 + 0.04 + ... instead of spinning
+    assert 3 <= main.trading_schedule.attempts <= 10
@@ -0,0 +1,34 @@
+import asyncio
+
+from request_scheduler import Priority, RequestScheduler
+
+
+def test_exit_overtakes_queued_scan_requests():
+    async def run():
+        scheduler = RequestScheduler(min_interval=0.005)
+        order = []
+
+        async def request(name, priority):
+            await scheduler.acquire(priority, 2)
+            order.append(name)
+
+        scans = [asyncio.create_task(request(f'scan{i}', Priority.SCAN)) for i in range(30)]
+        await asyncio.sleep(0.015)  # The scan is under way when the exit arrives
+        await request('exit', Priority.EXIT)
+        await asyncio.gather(*scans)
+        return order
+
+    assert asyncio.run(run()).index('exit') <= 4
+
+
+def test_dispatcher_exits_when_the_queue_drains():
+    scheduler = RequestScheduler()
+
+    async def run():
+        await asyncio.gather(*(scheduler.acquire(Priority.UI) for _ in range(3)))
+        await asyncio.sleep(0)
+        return scheduler._dispatcher.done()
+
+    assert asyncio.run(run())
+    assert asyncio.run(run())  # Restarts on a new loop
+    assert scheduler.stats[Priority.UI]['requests'] == 6
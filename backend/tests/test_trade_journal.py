@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import shutil
+import threading
+
+import pytest
+
+from config import config
+from tests.helpers import legacy_save_positions
+from trade_journal import TradeJournal
+from trading_strategy import TradingStrategy
+
+
+def state(strategy: TradingStrategy):
+    return ({symbol: TradingStrategy._position_to_dict(pos) for symbol, pos in strategy.portfolio.positions.items()},
+            [TradingStrategy._position_to_dict(pos) for pos in strategy.trades_history],
+            strategy.portfolio.available_cash,
+            strategy.aggregates)
+
+
+def record(symbol: str, status: str = 'open') -> dict:
+    return {'symbol': symbol, 'position_type': 'long', 'entry_price': 100.0, 'quantity': 1.0, 'leverage': 1.0,
+            'entry_time': '2024-01-01T00:00:00', 'status': status, 'pnl': 0.0, 'pnl_percentage': 0.0}
+
+
+@pytest.fixture
+def journal_config(monkeypatch):
+    config_data = config.get_config()
+    monkeypatch.setattr(config_data, 'TRADE_JOURNAL_FSYNC', 'never')
+    return config_data
+
+
+@pytest.mark.parametrize('compact_every', [1000, 3])
+def test_round_trip_matches_legacy_positions_file(workdir, replay, journal_config, monkeypatch, compact_every):
+    monkeypatch.setattr(journal_config, 'TRADE_JOURNAL_COMPACT_EVERY', compact_every)
+    strategy = TradingStrategy(positions_file=str(workdir / 'positions.json'))
+
+    async def trade():
+        for i in range(6):
+            assert await strategy.open_position(f'SYN{i}/USDT', 'long' if i % 2 else 'short')
+        for i in (1, 2, 4):
+            assert await strategy.close_position(f'SYN{i}/USDT')
+        assert await strategy.open_position('SYN7/USDT', 'long')
+
+    asyncio.run(trade())
+    assert os.path.exists(workdir / 'positions.json') == (compact_every == 3)  # Compacted into a snapshot
+
+    legacy_path = str(workdir / 'legacy.json')
+    legacy_save_positions(legacy_path, list(strategy.portfolio.positions.values()) + strategy.trades_history)
+    reloaded = state(TradingStrategy(positions_file=str(workdir / 'positions.json')))
+    legacy = state(TradingStrategy(positions_file=legacy_path))
+
+    assert reloaded == legacy
+    assert reloaded[:2] == state(strategy)[:2]
+    assert (len(reloaded[0]), len(reloaded[1])) == (4, 3)
+
+
+def test_torn_final_line_is_dropped(workdir):
+    journal = TradeJournal(str(workdir / 'positions.json'), fsync='never')
+    journal.append([('open', record('A/USDT')), ('open', record('B/USDT'))])
+    intact_size = os.path.getsize(journal.journal_path)
+    with open(journal.journal_path, 'a') as f:
+        f.write(json.dumps({'sequence': 3, 'event': 'close', 'position': record('A/USDT', 'closed')})[:40])
+
+    recovered = TradeJournal(journal.snapshot_path, fsync='never')
+    open_positions, closed = recovered.load()
+    assert sorted(open_positions) == ['A/USDT', 'B/USDT'] and closed == []
+    assert os.path.getsize(journal.journal_path) == intact_size
+
+    # Appends continue the sequence on a clean line
+    recovered.append([('open', record('C/USDT'))])
+    assert sorted(TradeJournal(journal.snapshot_path).load()[0]) == ['A/USDT', 'B/USDT', 'C/USDT']
+
+
+def test_crash_between_snapshot_replace_and_truncation(workdir):
+    journal = TradeJournal(str(workdir / 'positions.json'), fsync='never')
+    journal.append([('open', record('A/USDT')), ('open', record('B/USDT')), ('close', record('A/USDT', 'closed'))])
+    expected = TradeJournal(journal.snapshot_path).load()
+
+    # The snapshot is replaced but the old journal survives, as if truncation never ran
+    shutil.copy(journal.journal_path, str(workdir / 'journal.bak'))
+    journal.compact([record('B/USDT'), record('A/USDT', 'closed')])
+    shutil.copy(str(workdir / 'journal.bak'), journal.journal_path)
+
+    assert TradeJournal(journal.snapshot_path).load() == expected
+
+
+def test_compaction_keeps_records_newer_than_its_snapshot(workdir):
+    journal = TradeJournal(str(workdir / 'positions.json'), fsync='never')
+    journal.append([('open', record('A/USDT'))])
+    covered = journal.sequence
+    journal.append([('open', record('B/USDT'))])
+
+    journal.compact([record('A/USDT')], covered)
+
+    assert journal.journal_records == 1
+    assert sorted(TradeJournal(journal.snapshot_path).load()[0]) == ['A/USDT', 'B/USDT']
+
+
+def test_loads_positions_file_without_journal(workdir):
+    path = str(workdir / 'positions.json')
+    with open(path, 'w') as f:
+        json.dump({'positions': [record('A/USDT'), record('B/USDT', 'closed')]}, f, indent=2)
+
+    journal = TradeJournal(path)
+    open_positions, closed = journal.load()
+    assert list(open_positions) == ['A/USDT'] and [trade['symbol'] for trade in closed] == ['B/USDT']
+
+    # New records follow on from the old file
+    journal.append([('close', record('A/USDT', 'closed'))])
+    open_positions, closed = TradeJournal(path).load()
+    assert open_positions == {} and [trade['symbol'] for trade in closed] == ['B/USDT', 'A/USDT']
+
+
+def test_cancelled_save_holds_the_journal_until_its_write_finishes(workdir, journal_config):
+    strategy = TradingStrategy(positions_file=str(workdir / 'positions.json'))
+    journal = strategy._get_journal()
+    release = threading.Event()
+    write = journal.write
+
+    def slow_write(events, positions=None):
+        release.wait(5)
+        write(events, positions)
+
+    journal.write = slow_write
+    strategy._journal_events.append(('open', record('A/USDT')))
+
+    async def run():
+        save = asyncio.create_task(strategy.save_positions())
+        await asyncio.sleep(0.05)
+        save.cancel()
+        await asyncio.sleep(0.05)
+        assert strategy._journal_lock.locked()  # The thread is still writing
+        release.set()
+        await asyncio.gather(save, return_exceptions=True)
+        assert save.cancelled() and not strategy._journal_lock.locked()
+
+    asyncio.run(run())
+    assert list(TradeJournal(strategy.positions_file).load()[0]) == ['A/USDT']
@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import trading_strategy as strategy_module
+from config import config
+from ichimoku import IchimokuCloud
+from tests.helpers import make_ohlcv
+from trading_strategy import PortfolioAggregates, Position, PositionType, TradingStrategy
+
+SYMBOLS = [f'SYN{i}/USDT' for i in range(16)]
+
+
+def strategy_with_positions(positions_file, count: int = len(SYMBOLS)) -> TradingStrategy:
+    strategy = TradingStrategy(positions_file=str(positions_file))
+    for i, symbol in enumerate(SYMBOLS[:count]):
+        strategy.portfolio.positions[symbol] = Position(
+            symbol=symbol, position_type=PositionType.LONG if i % 2 else PositionType.SHORT,
+            entry_price=100.0, quantity=1.0, leverage=1.0, entry_time=datetime.now())
+    strategy.rebuild_aggregates()
+    return strategy
+
+
+def test_concurrent_exit_checks_close_what_sequential_checks_close(workdir, replay):
+    async def sequential(strategy):
+        closed = []
+        for symbol in list(strategy.portfolio.positions):
+            if await strategy.check_exit_conditions(symbol) and await strategy.close_position(symbol):
+                closed.append(symbol)
+        return closed
+
+    one_by_one = strategy_with_positions(workdir / 'sequential.json')
+    expected = asyncio.run(sequential(one_by_one))
+    batched = strategy_with_positions(workdir / 'batched.json')
+    closed = asyncio.run(batched.check_exits())
+
+    assert closed and closed == expected
+    assert abs(batched.portfolio.available_cash - one_by_one.portfolio.available_cash) <= 1e-2 * abs(
+        one_by_one.portfolio.available_cash)  # Exit prices may tick between the two runs
+
+
+def test_cancelled_exit_batch_saves_completed_closes(workdir, replay):
+    strategy = strategy_with_positions(workdir / 'positions.json', count=4)
+
+    async def check(symbol):
+        if symbol != SYMBOLS[0]:
+            await asyncio.sleep(10)  # Still checking when the batch is cancelled
+        return True
+
+    strategy.check_exit_conditions = check
+
+    async def run():
+        batch = asyncio.create_task(strategy.check_exits())
+        while SYMBOLS[0] in strategy.portfolio.positions:
+            await asyncio.sleep(0.01)
+        batch.cancel()
+        await asyncio.gather(batch, return_exceptions=True)
+
+    asyncio.run(run())
+
+    reloaded = TradingStrategy(positions_file=strategy.positions_file)
+    assert [trade.symbol for trade in reloaded.trades_history] == [SYMBOLS[0]]
+
+
+def test_cached_rescan_returns_the_same_signals(workdir, replay):
+    strategy = TradingStrategy(positions_file=None)
+
+    async def run():
+        await strategy.scan_for_signals()  # Warm the candle cache and universe
+        strategy.signal_cache.clear()
+        uncached = await strategy.scan_for_signals()
+        cached = await strategy.scan_for_signals()
+        return uncached, cached, dict(strategy.signal_cache_stats)
+
+    uncached, cached, stats = asyncio.run(run())
+    assert cached == uncached
+    assert stats['misses'] == 0 and stats['hits'] > 0
+
+
+class FrameProvider:
+    """Serves the tail of one OHLCV frame for every symbol"""
+
+    def __init__(self, df):
+        self.df = df
+
+    async def get_ohlcv(self, symbol, timeframe='1h', limit=100, priority=None):
+        return self.df.iloc[-limit:]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_exit_check_matches_the_backtest_exit_flags(workdir, monkeypatch, seed):
+    df = make_ohlcv(300, seed=seed)  # Ends in the past, so no candle is still forming
+    ichimoku = IchimokuCloud()
+    signals = ichimoku.get_signals(ichimoku.calculate(df, lean=True), lean=True)
+    monkeypatch.setattr(strategy_module, 'data_provider', FrameProvider(df))
+    strategy = TradingStrategy(positions_file=None)
+
+    for position_type in PositionType:
+        strategy.portfolio.positions['SYM/USDT'] = Position(
+            symbol='SYM/USDT', position_type=position_type, entry_price=100.0, quantity=1.0, leverage=1.0,
+            entry_time=datetime.now())
+        expected = (ichimoku.check_stop_loss(signals, position_type.value).iloc[-1] or
+                    ichimoku.check_target(signals, position_type.value).iloc[-1])
+        assert asyncio.run(strategy.check_exit_conditions('SYM/USDT')) == expected
+
+
+def test_peak_equity_is_rebuilt_from_the_points_where_the_book_was_flat():
+    strategy = TradingStrategy(positions_file=None, initial_value=10_000.0)
+    start = datetime(2024, 1, 1)
+
+    def at(hours):
+        return start + timedelta(hours=hours)
+
+    def book_open(symbol, hours):
+        strategy._book_open(Position(symbol=symbol, position_type=PositionType.LONG, entry_price=100.0,
+                                     quantity=10.0, leverage=1.0, entry_time=at(hours)))
+
+    book_open('A/USDT', 0)
+    strategy._book_close(strategy.portfolio.positions['A/USDT'], 110.0, at(1))  # Flat at 10,100
+    book_open('B/USDT', 2)
+    book_open('C/USDT', 3)
+    strategy._book_close(strategy.portfolio.positions['B/USDT'], 200.0, at(4))  # +1,000 but C is still open
+    strategy._book_close(strategy.portfolio.positions['C/USDT'], 10.0, at(5))  # Flat at 10,200
+    book_open('D/USDT', 6)
+
+    rebuilt = PortfolioAggregates.from_positions(
+        list(strategy.portfolio.positions.values()), strategy.trades_history, 10_000.0)
+    assert rebuilt.peak_equity == strategy.aggregates.peak_equity == strategy.portfolio.peak_value == 10_200.0
+    assert rebuilt.matches(strategy.aggregates)
+
+
+def test_concurrent_entries_respect_the_position_limits(workdir, replay):
+    strategy = TradingStrategy(positions_file=str(workdir / 'positions.json'))
+    limits = config.get_config()
+
+    async def run():
+        return await asyncio.gather(*(strategy.open_position(symbol, 'long' if i % 2 else 'short')
+                                      for i, symbol in enumerate(SYMBOLS)))
+
+    opened = asyncio.run(run())
+    assert sum(opened) == limits.MAX_LONG_POSITIONS + limits.MAX_SHORT_POSITIONS
+    assert strategy.aggregates.long_positions == limits.MAX_LONG_POSITIONS
+    assert strategy.aggregates.short_positions == limits.MAX_SHORT_POSITIONS
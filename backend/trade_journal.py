@@ -0,0 +1,172 @@
+"""
+Crash-safe persistence of positions and trades: a snapshot plus an append-only journal
+
+The snapshot (positions.json) holds every open position and closed trade
+as of a journal sequence number. Each open or close since then is one
+JSON line in the journal, so saving a trade costs one small append
+instead of rewriting the whole history. Once the journal grows past a
+threshold it is compacted into a new snapshot, written atomically.
+Appends and compaction may run on a worker thread; they take turns on the files.
+
+Recovery loads the snapshot and replays journal records newer than it.
+A torn final line (crash mid-append) is ignored and cut off, and records
+the snapshot already contains are skipped, so a crash at any point
+leaves a consistent history.
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+FSYNC_POLICIES = ('always', 'never')
+
+
+class TradeJournal:
+    def __init__(self, snapshot_path: str, fsync: str = 'always', compact_every: int = 1000):
+        """
+        Args:
+            snapshot_path: Snapshot file; the journal sits next to it with a .journal suffix
+            fsync: "always" (fsync every append) or "never" (leave flushing to the OS)
+            compact_every: Journal records that trigger a compaction into the snapshot
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown journal fsync policy {fsync!r} (expected one of {FSYNC_POLICIES})")
+        self.snapshot_path = snapshot_path
+        self.journal_path = os.path.splitext(snapshot_path)[0] + '.journal'
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self.sequence = 0  # Sequence number of the last record written or loaded
+        self.journal_records = 0  # Records in the journal since the last compaction
+        self._loaded = False
+        self._lock = threading.Lock()  # Appends and compaction both rewrite the journal
+
+    def load(self) -> Tuple[Dict[str, Dict], List[Dict]]:
+        """
+        Recover state from the snapshot and journal
+
+        Returns:
+            (open positions by symbol, closed trades in order), as position dicts
+        """
+        open_positions: Dict[str, Dict] = {}
+        closed: List[Dict] = []
+        self.sequence = 0
+        self.journal_records = 0
+
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            self.sequence = snapshot.get('journal_sequence', 0)
+            for position in snapshot.get('positions', []):
+                if position['status'] == 'open':
+                    open_positions[position['symbol']] = position
+                else:
+                    closed.append(position)
+
+        self._loaded = True
+        for record in self._read_journal():
+            self.journal_records += 1
+            if record['sequence'] <= self.sequence:
+                continue  # Already in the snapshot (crash between compaction and truncation)
+            self.sequence = record['sequence']
+            position = record['position']
+            if record['event'] == 'open':
+                open_positions[position['symbol']] = position
+            else:
+                open_positions.pop(position['symbol'], None)
+                closed.append(position)
+
+        return open_positions, closed
+
+    def _read_journal(self) -> List[Dict]:
+        """Journal records, dropping a torn final line left by a crash mid-append"""
+        if not os.path.exists(self.journal_path):
+            return []
+
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+
+        records = []
+        valid_bytes = 0
+        for line in data.splitlines(keepends=True):
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError("incomplete record")
+                records.append(json.loads(line))
+            except ValueError:
+                print(f"⚠️  Ignoring a partial trade journal record at byte {valid_bytes} of {self.journal_path}")
+                break
+            valid_bytes += len(line)
+
+        if valid_bytes < len(data):
+            # Cut the torn tail so the next append starts on a clean line
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return records
+
+    def append(self, events: List[Tuple[str, Dict]]):
+        """
+        Write open/close events as one append
+
+        Args:
+            events: (event, position dict) pairs, event being "open" or "close"
+        """
+        if not events:
+            return
+        if not self._loaded:
+            self.load()  # Continue the existing sequence and cut any torn tail first
+
+        lines = []
+        for event, position in events:
+            self.sequence += 1
+            lines.append(json.dumps({'sequence': self.sequence, 'event': event, 'position': position}) + '\n')
+
+        with self._lock:
+            with open(self.journal_path, 'a') as f:
+                f.write(''.join(lines))
+                f.flush()
+                if self.fsync == 'always':
+                    os.fsync(f.fileno())
+            self.journal_records += len(events)
+
+    def needs_compaction(self, pending: int = 0) -> bool:
+        """Whether the journal is due for compaction once `pending` more records are appended"""
+        return self.journal_records + pending >= self.compact_every
+
+    def write(self, events: List[Tuple[str, Dict]], positions: Optional[List[Dict]] = None):
+        """
+        Append events, then compact if given the state they lead to
+
+        Args:
+            events: (event, position dict) pairs, as for append()
+            positions: Every open position and closed trade after the events, or None to skip compaction
+        """
+        self.append(events)
+        if positions is not None:
+            self.compact(positions)
+
+    def compact(self, positions: List[Dict], sequence: Optional[int] = None):
+        """
+        Replace the snapshot with the full current state and empty the journal
+
+        Args:
+            positions: Every open position and closed trade, as position dicts
+            sequence: Last record the positions include (default: the last one written).
+                Records appended after it stay in the journal.
+        """
+        with self._lock:
+            sequence = self.sequence if sequence is None else sequence
+            temp_path = self.snapshot_path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump({'journal_sequence': sequence, 'positions': positions}, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+
+            # A crash before this point leaves records the new snapshot already covers; load() skips them
+            newer = [] if sequence == self.sequence else \
+                [record for record in self._read_journal() if record['sequence'] > sequence]
+            with open(self.journal_path, 'w') as f:
+                f.write(''.join(json.dumps(record) + '\n' for record in newer))
+                f.flush()
+                os.fsync(f.fileno())
+            self.journal_records = len(newer)
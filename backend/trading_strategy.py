@@ -1,16 +1,19 @@
 import pandas as pd
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
-import json
+import math
 import os
+import time
 
 from config import config
 from ichimoku import IchimokuCloud
 from data_provider import data_provider
+from request_scheduler import Priority
 from equity_tracker import equity_tracker
+from trade_journal import TradeJournal
 
 class PositionType(Enum):
     LONG = "long"
@@ -44,64 +47,159 @@ class Portfolio:
     peak_value: float
     drawdown: float
 
+@dataclass
+class PortfolioAggregates:
+    """Running totals over open positions and closed trades, updated as each one changes"""
+    long_positions: int = 0
+    short_positions: int = 0
+    locked_margin: float = 0.0  # Capital tied up in open positions
+    long_realized_pnl: float = 0.0
+    short_realized_pnl: float = 0.0
+    wins: int = 0
+    losses: int = 0
+    # Highest portfolio value seen: marked values, and the realized value whenever the book was flat
+    peak_equity: float = 0.0
+
+    @classmethod
+    def from_positions(cls, positions: List[Position], trades: List[Position],
+                       initial_value: float = 0.0) -> 'PortfolioAggregates':
+        """
+        Full recompute from open positions and closed trades
+
+        Marks are not stored, so peak_equity is rebuilt from the points where
+        the book was flat, where the portfolio was worth initial_value plus
+        the P&L realized so far; a running peak can only be higher.
+        """
+        aggregates = cls(peak_equity=initial_value)
+        for position in positions:
+            aggregates.add_open(position)
+        for trade in trades:
+            aggregates.add_closed(trade)
+
+        # Walk opens and closes in time order (closes first on a tie, as trades are booked)
+        events = sorted([(position.entry_time, 1, position) for position in positions + trades] +
+                        [(trade.exit_time or trade.entry_time, 0, trade) for trade in trades], key=lambda event: event[:2])
+        open_count = 0
+        realized_pnl = 0.0
+        for _, is_open, position in events:
+            if is_open:
+                open_count += 1
+                continue
+            open_count -= 1
+            realized_pnl += position.pnl
+            if open_count == 0:
+                aggregates.peak_equity = max(aggregates.peak_equity, initial_value + realized_pnl)
+        return aggregates
+
+    def add_open(self, position: Position, sign: int = 1):
+        if position.position_type == PositionType.LONG:
+            self.long_positions += sign
+        else:
+            self.short_positions += sign
+        self.locked_margin += sign * (position.entry_price * position.quantity) / position.leverage
+
+    def remove_open(self, position: Position):
+        self.add_open(position, sign=-1)
+
+    def add_closed(self, trade: Position):
+        if trade.position_type == PositionType.LONG:
+            self.long_realized_pnl += trade.pnl
+        else:
+            self.short_realized_pnl += trade.pnl
+        if trade.pnl > 0:
+            self.wins += 1
+        elif trade.pnl < 0:
+            self.losses += 1
+
+    @property
+    def realized_pnl(self) -> float:
+        return self.long_realized_pnl + self.short_realized_pnl
+
+    def matches(self, other: 'PortfolioAggregates') -> bool:
+        """Equal counts, and sums equal up to floating-point accumulation error"""
+        return all(
+            math.isclose(getattr(self, name), getattr(other, name), rel_tol=1e-9, abs_tol=1e-6)
+            if isinstance(getattr(self, name), float) else getattr(self, name) == getattr(other, name)
+            for name in self.__dataclass_fields__)
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    """Marks for a set of symbols, fetched together and read by every valuation"""
+    prices: Dict[str, float]  # Symbols without a valid price are missing
+    symbols: frozenset  # Symbols the snapshot was requested for
+    timestamp: float
+
+    def age(self) -> float:
+        return time.time() - self.timestamp
+
+    def covers(self, symbols) -> bool:
+        return self.symbols.issuperset(symbols)
+
 class TradingStrategy:
-    def __init__(self):
+    # Completed candles an exit check evaluates: the last one and the one before it
+    EXIT_ROWS = 2
+
+    def __init__(self, positions_file: Optional[str] = "positions.json", initial_value: Optional[float] = None):
+        """
+        Args:
+            positions_file: Where positions and trades are persisted (None keeps them in memory, as backtests do)
+            initial_value: Starting portfolio value (default: CURRENT_PORTFOLIO_VALUE)
+        """
         self.ichimoku = IchimokuCloud()
+        self.reset_portfolio(initial_value or config.get_config().CURRENT_PORTFOLIO_VALUE)
+        self.positions_file = positions_file
+        self._journal: Optional[TradeJournal] = None
+        self._journal_events: List[Tuple[str, Dict]] = []  # Opens and closes not yet saved
+        self._journal_lock = asyncio.Lock()  # One save at a time, held until its worker thread is done
+        # Track last action timestamp per symbol to prevent duplicate trades on same candle
+        self.last_action_timestamp: Dict[str, datetime] = {}
+        # Signal state per symbol, keyed by the open time of the last closed candle it was evaluated on
+        self.signal_cache: Dict[str, Tuple[pd.Timestamp, Optional[Dict]]] = {}
+        self.signal_cache_stats = {'hits': 0, 'misses': 0}
+        # Serializes changes to cash and positions while exits are closed concurrently
+        self.portfolio_lock = asyncio.Lock()
+        self.price_snapshot: Optional[PriceSnapshot] = None
+        self._price_snapshot_lock: Optional[asyncio.Lock] = None
+        if self.positions_file is not None:
+            print(f"🚀 Trading strategy initialized at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            print("✅ Priority-based trading: Ready to enter on fresh signals immediately")
+            self.load_positions()
+
+    def reset_portfolio(self, initial_value: float):
+        """Start from an empty portfolio and trade history worth initial_value"""
         self.portfolio = Portfolio(
-            total_value=config.get_config().CURRENT_PORTFOLIO_VALUE,
-            available_cash=config.get_config().CURRENT_PORTFOLIO_VALUE,
+            total_value=initial_value,
+            available_cash=initial_value,
             positions={},
             total_pnl=0.0,
             total_pnl_percentage=0.0,
-            peak_value=config.get_config().CURRENT_PORTFOLIO_VALUE,
+            peak_value=initial_value,
             drawdown=0.0
         )
+        self.initial_value = initial_value
         self.trades_history: List[Position] = []
-        self.positions_file = "positions.json"
-        # Track last action timestamp per symbol to prevent duplicate trades on same candle
-        self.last_action_timestamp: Dict[str, datetime] = {}
-        print(f"🚀 Trading strategy initialized at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("✅ Priority-based trading: Ready to enter on fresh signals immediately")
-        self.load_positions()
+        self.aggregates = PortfolioAggregates(peak_equity=initial_value)
 
     def load_positions(self):
-        """Load positions from file"""
-        if os.path.exists(self.positions_file):
+        """Load positions from the snapshot file and replay the trade journal"""
+        journal = self._get_journal()
+        if os.path.exists(journal.snapshot_path) or os.path.exists(journal.journal_path):
             try:
-                with open(self.positions_file, 'r') as f:
-                    data = json.load(f)
-                    for pos_data in data.get('positions', []):
-                        pos = Position(
-                            symbol=pos_data['symbol'],
-                            position_type=PositionType(pos_data['position_type']),
-                            entry_price=pos_data['entry_price'],
-                            quantity=pos_data['quantity'],
-                            leverage=pos_data['leverage'],
-                            entry_time=datetime.fromisoformat(pos_data['entry_time']),
-                            status=PositionStatus(pos_data['status']),
-                            exit_price=pos_data.get('exit_price'),
-                            exit_time=datetime.fromisoformat(pos_data['exit_time']) if pos_data.get('exit_time') else None,
-                            pnl=pos_data.get('pnl', 0.0),
-                            pnl_percentage=pos_data.get('pnl_percentage', 0.0)
-                        )
-                        if pos.status == PositionStatus.OPEN:
-                            self.portfolio.positions[pos.symbol] = pos
-                        else:
-                            self.trades_history.append(pos)
-                
-                # Recalculate available cash based on loaded positions and trades
-                # Start with initial portfolio value
-                self.portfolio.available_cash = config.get_config().CURRENT_PORTFOLIO_VALUE
-                
-                # Subtract margin used by open positions
-                for pos in self.portfolio.positions.values():
-                    margin_used = (pos.entry_price * pos.quantity) / pos.leverage
-                    self.portfolio.available_cash -= margin_used
-                
-                # Add/subtract realized P&L from closed trades
-                realized_pnl = sum(trade.pnl for trade in self.trades_history)
+                open_positions, closed_trades = journal.load()
+                for pos_data in open_positions.values():
+                    pos = self._position_from_dict(pos_data)
+                    self.portfolio.positions[pos.symbol] = pos
+                self.trades_history.extend(self._position_from_dict(pos_data) for pos_data in closed_trades)
+
+                # Rebuild the running aggregates once; trades update them incrementally from here on
+                self.rebuild_aggregates()
+                self.portfolio.peak_value = self.aggregates.peak_equity
+
+                # Recalculate available cash based on loaded positions and trades:
+                # initial portfolio value, less margin used by open positions, plus realized P&L
+                realized_pnl = self.aggregates.realized_pnl
                 self.portfolio.total_pnl = realized_pnl
-                self.portfolio.available_cash += realized_pnl
+                self.portfolio.available_cash = self.initial_value - self.aggregates.locked_margin + realized_pnl
                 
                 print(f"Loaded {len(self.portfolio.positions)} open positions and {len(self.trades_history)} closed trades")
                 print(f"Realized P&L: ${realized_pnl:.2f}")
@@ -110,32 +208,73 @@ class TradingStrategy:
             except Exception as e:
                 print(f"Error loading positions: {e}")
 
-    def save_positions(self):
-        """Save positions to file"""
-        try:
-            positions_data = []
-            for pos in list(self.portfolio.positions.values()) + self.trades_history:
-                pos_dict = {
-                    'symbol': pos.symbol,
-                    'position_type': pos.position_type.value,
-                    'entry_price': pos.entry_price,
-                    'quantity': pos.quantity,
-                    'leverage': pos.leverage,
-                    'entry_time': pos.entry_time.isoformat(),
-                    'status': pos.status.value,
-                    'pnl': pos.pnl,
-                    'pnl_percentage': pos.pnl_percentage
-                }
-                if pos.exit_price:
-                    pos_dict['exit_price'] = pos.exit_price
-                if pos.exit_time:
-                    pos_dict['exit_time'] = pos.exit_time.isoformat()
-                positions_data.append(pos_dict)
-
-            with open(self.positions_file, 'w') as f:
-                json.dump({'positions': positions_data}, f, indent=2)
-        except Exception as e:
-            print(f"Error saving positions: {e}")
+    async def save_positions(self):
+        """Append opens and closes since the last save to the trade journal, compacting it when due"""
+        if self.positions_file is None:
+            return
+        async with self._journal_lock:
+            try:
+                journal = self._get_journal()
+                events, self._journal_events = self._journal_events, []
+                positions = None
+                if journal.needs_compaction(pending=len(events)):
+                    # Snapshot the state with its events; trades made during the write go in the next save
+                    positions = [self._position_to_dict(pos) for pos in
+                                 list(self.portfolio.positions.values()) + self.trades_history]
+                if not events and positions is None:
+                    return
+                # The appends, fsyncs and compaction run on a worker thread
+                write = asyncio.ensure_future(asyncio.to_thread(journal.write, events, positions))
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    await asyncio.wait([write])  # Hold the lock until the thread has finished with the files
+                    raise
+            except Exception as e:
+                print(f"Error saving positions: {e}")
+
+    def _get_journal(self) -> TradeJournal:
+        """Journal for the current positions_file (which callers may repoint)"""
+        if self._journal is None or self._journal.snapshot_path != self.positions_file:
+            config_data = config.get_config()
+            self._journal = TradeJournal(self.positions_file, fsync=config_data.TRADE_JOURNAL_FSYNC,
+                                         compact_every=config_data.TRADE_JOURNAL_COMPACT_EVERY)
+        return self._journal
+
+    @staticmethod
+    def _position_to_dict(pos: Position) -> Dict:
+        pos_dict = {
+            'symbol': pos.symbol,
+            'position_type': pos.position_type.value,
+            'entry_price': pos.entry_price,
+            'quantity': pos.quantity,
+            'leverage': pos.leverage,
+            'entry_time': pos.entry_time.isoformat(),
+            'status': pos.status.value,
+            'pnl': pos.pnl,
+            'pnl_percentage': pos.pnl_percentage
+        }
+        if pos.exit_price:
+            pos_dict['exit_price'] = pos.exit_price
+        if pos.exit_time:
+            pos_dict['exit_time'] = pos.exit_time.isoformat()
+        return pos_dict
+
+    @staticmethod
+    def _position_from_dict(pos_data: Dict) -> Position:
+        return Position(
+            symbol=pos_data['symbol'],
+            position_type=PositionType(pos_data['position_type']),
+            entry_price=pos_data['entry_price'],
+            quantity=pos_data['quantity'],
+            leverage=pos_data['leverage'],
+            entry_time=datetime.fromisoformat(pos_data['entry_time']),
+            status=PositionStatus(pos_data['status']),
+            exit_price=pos_data.get('exit_price'),
+            exit_time=datetime.fromisoformat(pos_data['exit_time']) if pos_data.get('exit_time') else None,
+            pnl=pos_data.get('pnl', 0.0),
+            pnl_percentage=pos_data.get('pnl_percentage', 0.0)
+        )
 
     async def scan_for_signals(self) -> Dict[str, str]:
         """
@@ -149,7 +288,13 @@ class TradingStrategy:
         Returns:
             Dictionary of symbol -> signal_type ('long', 'short', or None)
         """
+        if data_provider.circuit_breaker.is_open:
+            print("⏸️  Exchange circuit breaker open - skipping signal scan")
+            return {}
+
         config_data = config.get_config()
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + config_data.SCAN_TIMEOUT_SECONDS
 
         # Get long-eligible symbols
         long_symbols = [coin + '/USDT' for coin in config_data.LONG_COINS]
@@ -159,13 +304,82 @@ class TradingStrategy:
 
         all_symbols = long_symbols + short_symbols
 
-        # Collect all signals with their "freshness" score
+        # Signals only change when a candle closes: skip symbols already evaluated on the newest closed candle
+        newest_closed = self._newest_closed_candle()
+        if newest_closed is None:
+            self.signal_cache.clear()  # Forming candles are evaluated, so nothing can be reused
+        self.signal_cache = {symbol: self.signal_cache[symbol] for symbol in all_symbols if symbol in self.signal_cache}
+        states = {symbol: cached[1] for symbol, cached in self.signal_cache.items() if cached[0] == newest_closed}
+        hits = len(states)
+        to_fetch = [symbol for symbol in all_symbols if symbol not in states]
+
+        # Fetch closed candles for the rest concurrently (bounded), then evaluate them all in one panel pass
+        semaphore = asyncio.Semaphore(config_data.SCAN_CONCURRENCY)
+
+        async def fetch(symbol: str) -> Optional[pd.DataFrame]:
+            async with semaphore:
+                try:
+                    return await self._get_closed_candles(symbol, limit=100)
+                except Exception as e:
+                    print(f"Error checking signal for {symbol}: {e}")
+                    return None
+
+        tasks = [asyncio.ensure_future(fetch(symbol)) for symbol in to_fetch]
+        pending = set()
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - loop.time()))
+            for task in pending:
+                task.cancel()
+            if pending:
+                print(f"⚠️ Scan time budget of {config_data.SCAN_TIMEOUT_SECONDS:.0f}s exceeded - "
+                      f"skipping {len(pending)} of {len(tasks)} symbol(s) this cycle")
+
+        frames = {}
+        last_closed = {}
+        for symbol, task in zip(to_fetch, tasks):
+            if task in pending:
+                continue
+            df = task.result()
+            if df is None or df.empty:
+                continue
+            last_closed[symbol] = df.index[-1]
+            cached = self.signal_cache.get(symbol)
+            if newest_closed is not None and cached is not None and cached[0] == last_closed[symbol]:
+                # No newer candle published yet
+                states[symbol] = cached[1]
+                hits += 1
+            elif len(df) >= 52:
+                frames[symbol] = df
+            else:
+                states[symbol] = None
+
+        if frames:
+            panel = self.ichimoku.calculate_panel(*self.ichimoku.align_panel(list(frames.values())), lean=True)
+            for row, symbol in enumerate(frames):
+                long_signals = panel['long_signal'][row]
+                short_signals = panel['short_signal'][row]
+                states[symbol] = {
+                    'long_signal': bool(long_signals[-1]),
+                    'short_signal': bool(short_signals[-1]),
+                    'long_run': self.ichimoku.trailing_run(long_signals),
+                    'short_run': self.ichimoku.trailing_run(short_signals)
+                }
+
+        if newest_closed is not None:
+            for symbol, timestamp in last_closed.items():
+                self.signal_cache[symbol] = (timestamp, states[symbol])
+
+        misses = len(states) - hits
+        self.signal_cache_stats = {'hits': hits, 'misses': misses}
+        print(f"🔁 Signal cache: {hits} unchanged, {misses} re-evaluated")
+
+        # Collect all signals with their "freshness" score, in symbol order so ranking and logs stay deterministic
         signal_candidates = []
-        
         for symbol in all_symbols:
-            signal_info = await self.check_signal_with_priority(symbol)
-            if signal_info:
-                signal_candidates.append(signal_info)
+            if states.get(symbol):
+                signal_info = self._rank_signal(symbol, states[symbol])
+                if signal_info:
+                    signal_candidates.append(signal_info)
 
         # Sort by priority: fresh signals first, then by recency
         signal_candidates.sort(key=lambda x: (x['priority'], -x['hours_since_signal']))
@@ -196,80 +410,111 @@ class TradingStrategy:
         - signal_first_appeared: int (candle index where signal first appeared)
         """
         try:
-            # Get OHLCV data
-            df = await data_provider.get_ohlcv(symbol, timeframe='1h', limit=100)
+            df = await self._get_closed_candles(symbol, limit=100)
 
             if df.empty or len(df) < 52:
                 return None
 
-            # Filter out forming candle
-            last_timestamp = df.index[-1]
-            current_time = datetime.now()
-            
-            if last_timestamp.hour == current_time.hour and last_timestamp.date() == current_time.date():
-                df = df.iloc[:-1]
-            
-            if df.empty or len(df) < 52:
-                return None
+            # Evaluate only the trailing candles the signal state depends on
+            return self._rank_signal(symbol, self.ichimoku.tail_signal_state(df))
 
-            # Calculate Ichimoku indicators
-            df = self.ichimoku.calculate(df)
-            df = self.ichimoku.get_signals(df)
+        except Exception as e:
+            print(f"Error checking signal for {symbol}: {e}")
+            return None
 
-            # Check current signal status
-            current_long = df['long_signal'].iloc[-1]
-            current_short = df['short_signal'].iloc[-1]
+    async def _get_closed_candles(self, symbol: str, limit: int = 100) -> pd.DataFrame:
+        """
+        Get OHLCV data with the still-forming hourly candle removed
 
-            # Determine which signal type to check
-            signal_type = None
-            current_signal = False
-            
-            if current_long and symbol.endswith('/USDT'):
-                base_coin = symbol.replace('/USDT', '')
-                if base_coin in config.get_config().LONG_COINS:
-                    signal_type = 'long'
-                    current_signal = True
-            elif current_short:
-                signal_type = 'short'
-                current_signal = True
+        Args:
+            symbol: Trading pair
+            limit: Number of candles to fetch (including the forming one)
 
-            if not current_signal:
-                return None
+        Returns:
+            DataFrame of completed candles (empty if no data)
+        """
+        df = await data_provider.get_ohlcv(symbol, timeframe='1h', limit=limit)
 
-            # Find when signal first appeared (look back through candles)
-            signal_column = 'long_signal' if signal_type == 'long' else 'short_signal'
-            hours_since_signal = 0
-            
-            # Look back to find where signal first appeared
-            for i in range(len(df) - 1, -1, -1):
-                if df[signal_column].iloc[i]:
-                    hours_since_signal += 1
-                else:
-                    break  # Found where signal first appeared
-
-            # Determine priority
-            # 0 = Fresh (just appeared, 1 hour old)
-            # 1 = Recent (2-4 hours old)
-            # 2 = Older (5+ hours old)
-            if hours_since_signal == 1:
-                priority = 0  # Fresh signal
-            elif hours_since_signal <= 4:
-                priority = 1  # Recent signal
-            else:
-                priority = 2  # Older signal
-
-            return {
-                'symbol': symbol,
-                'signal_type': signal_type,
-                'priority': priority,
-                'hours_since_signal': hours_since_signal,
-                'signal_first_appeared': hours_since_signal
-            }
+        if df.empty:
+            return df
 
-        except Exception as e:
-            print(f"Error checking signal for {symbol}: {e}")
+        # Filter out forming candle
+        last_timestamp = df.index[-1]
+        current_time = datetime.now()
+
+        if last_timestamp.hour == current_time.hour and last_timestamp.date() == current_time.date():
+            df = df.iloc[:-1]
+
+        return df
+
+    def _newest_closed_candle(self) -> Optional[pd.Timestamp]:
+        """
+        Open time of the newest hourly candle _get_closed_candles can return
+
+        Returns:
+            Timestamp in the exchange's (UTC) candle index, or None when the local
+            clock is not on UTC hours and the forming candle is not filtered out
+        """
+        forming = pd.Timestamp.utcnow().tz_localize(None).floor('h')
+        current_time = datetime.now()
+
+        if forming.hour == current_time.hour and forming.date() == current_time.date():
+            return forming - pd.Timedelta(hours=1)
+        return None
+
+    def _rank_signal(self, symbol: str, state: Dict) -> Optional[Dict]:
+        """
+        Score the current signal on a symbol by how long it has been active
+
+        Args:
+            symbol: Trading pair
+            state: Signal state as returned by IchimokuCloud.tail_signal_state
+
+        Returns:
+            Signal info dict (see check_signal_with_priority) or None
+        """
+        # Check current signal status
+        current_long = state['long_signal']
+        current_short = state['short_signal']
+
+        # Determine which signal type to check
+        signal_type = None
+        current_signal = False
+
+        if current_long and symbol.endswith('/USDT'):
+            base_coin = symbol.replace('/USDT', '')
+            if base_coin in config.get_config().LONG_COINS:
+                signal_type = 'long'
+                current_signal = True
+        elif current_short:
+            signal_type = 'short'
+            current_signal = True
+
+        if not current_signal:
             return None
 
+        # Signal first appeared this many consecutive candles back from the latest
+        hours_since_signal = state['long_run'] if signal_type == 'long' else state['short_run']
+
+        # Determine priority
+        # 0 = Fresh (just appeared, 1 hour old)
+        # 1 = Recent (2-4 hours old)
+        # 2 = Older (5+ hours old)
+        if hours_since_signal == 1:
+            priority = 0  # Fresh signal
+        elif hours_since_signal <= 4:
+            priority = 1  # Recent signal
+        else:
+            priority = 2  # Older signal
+
+        return {
+            'symbol': symbol,
+            'signal_type': signal_type,
+            'priority': priority,
+            'hours_since_signal': hours_since_signal,
+            'signal_first_appeared': hours_since_signal
+        }
+
     async def check_signal(self, symbol: str) -> Optional[str]:
         """
         Check for trading signal on a specific symbol
@@ -305,9 +550,8 @@ class TradingStrategy:
             if len(df) < 2:
                 return None
 
-            # Calculate Ichimoku indicators
-            df = self.ichimoku.calculate(df)
-            df = self.ichimoku.get_signals(df)
+            # Calculate Ichimoku indicators for the last two candles only
+            df = self.ichimoku.evaluate_tail(df, rows=self.EXIT_ROWS)
 
             # TRANSITION DETECTION: Only enter if signal JUST APPEARED
             # This catches fresh breakouts and avoids late entries
@@ -393,7 +637,7 @@ class TradingStrategy:
 
         # Check if we already acted on this symbol in the current hour
         try:
-            df = await data_provider.get_ohlcv(symbol, timeframe='1h', limit=2)
+            df = await data_provider.get_ohlcv(symbol, timeframe='1h', limit=2, priority=Priority.ENTRY)
             if not df.empty:
                 last_completed_candle = df.index[-2] if len(df) >= 2 else df.index[-1]
                 
@@ -408,20 +652,11 @@ class TradingStrategy:
             pass  # If we can't check, proceed anyway
 
         # Check position limits
-        config_data = config.get_config()
-        current_long_positions = sum(1 for pos in self.portfolio.positions.values()
-                                   if pos.position_type == PositionType.LONG)
-        current_short_positions = sum(1 for pos in self.portfolio.positions.values()
-                                    if pos.position_type == PositionType.SHORT)
-
-        if signal_type == 'long' and current_long_positions >= config_data.MAX_LONG_POSITIONS:
-            return False  # Already at max long positions
-
-        if signal_type == 'short' and current_short_positions >= config_data.MAX_SHORT_POSITIONS:
-            return False  # Already at max short positions
+        if self._position_limit_reached(signal_type):
+            return False
 
         try:
-            entry_price = await data_provider.get_current_price(symbol)
+            entry_price = await data_provider.get_current_price(symbol, Priority.ENTRY)
             if entry_price <= 0:
                 return False
 
@@ -439,16 +674,18 @@ class TradingStrategy:
                 entry_time=datetime.now()
             )
 
-            self.portfolio.positions[symbol] = position
-
-            # Update available cash
-            position_value = (quantity * entry_price) / leverage
-            self.portfolio.available_cash -= position_value
+            async with self.portfolio_lock:
+                # Other entries may have been booked while the price was fetched
+                if symbol in self.portfolio.positions or self._position_limit_reached(signal_type):
+                    return False
+                self._book_open(position)
+                self._journal_events.append(('open', self._position_to_dict(position)))
 
-            # Record the action timestamp
-            self.last_action_timestamp[symbol] = datetime.now()
+                # Record the action timestamp
+                self.last_action_timestamp[symbol] = datetime.now()
+                self._check_aggregates()
 
-            self.save_positions()
+            await self.save_positions()
             print(f"Opened {signal_type} position in {symbol} at ${entry_price:.4f}")
             return True
 
@@ -456,6 +693,13 @@ class TradingStrategy:
             print(f"Error opening position for {symbol}: {e}")
             return False
 
+    def _position_limit_reached(self, signal_type: str) -> bool:
+        """Whether the portfolio already holds the maximum number of signal_type positions"""
+        config_data = config.get_config()
+        if signal_type == 'long':
+            return self.aggregates.long_positions >= config_data.MAX_LONG_POSITIONS
+        return self.aggregates.short_positions >= config_data.MAX_SHORT_POSITIONS
+
     async def check_exit_conditions(self, symbol: str) -> bool:
         """
         Check if position should be exited based on stop loss or target conditions
@@ -472,8 +716,10 @@ class TradingStrategy:
         position = self.portfolio.positions[symbol]
 
         try:
-            # Get recent OHLCV data
-            df = await data_provider.get_ohlcv(symbol, timeframe='1h', limit=50)
+            # Enough history for every indicator on the checked candles to be defined (as in the
+            # backtest, which flags exits over full history), plus the candle still forming
+            limit = self.ichimoku.lookback + self.EXIT_ROWS + 1
+            df = await data_provider.get_ohlcv(symbol, timeframe='1h', limit=limit, priority=Priority.EXIT)
 
             if df.empty:
                 return False
@@ -489,8 +735,8 @@ class TradingStrategy:
             if df.empty:
                 return False
 
-            # Calculate Ichimoku indicators
-            df = self.ichimoku.calculate(df)
+            # Calculate Ichimoku indicators for the last two candles only
+            df = self.ichimoku.evaluate_tail(df, rows=2)
 
             # Check stop loss on the last COMPLETED candle
             stop_loss_triggered = self.ichimoku.check_stop_loss(df, position.position_type.value).iloc[-1]
@@ -504,12 +750,38 @@ class TradingStrategy:
             print(f"Error checking exit conditions for {symbol}: {e}")
             return False
 
-    async def close_position(self, symbol: str) -> bool:
+    async def check_exits(self) -> List[str]:
+        """
+        Check exit conditions for every open position concurrently
+
+        Each position is closed as soon as its own check says so; the
+        positions file is written once, after the whole batch, or when the
+        batch is cancelled part way so no completed close goes unsaved.
+
+        Returns:
+            Symbols of the positions that were closed
+        """
+        symbols = list(self.portfolio.positions)
+        closed = set()
+
+        async def check_and_close(symbol: str):
+            if await self.check_exit_conditions(symbol) and await self.close_position(symbol, save=False):
+                closed.add(symbol)
+
+        try:
+            await asyncio.gather(*(check_and_close(symbol) for symbol in symbols))
+        finally:
+            if self._journal_events:
+                await self.save_positions()
+        return [symbol for symbol in symbols if symbol in closed]
+
+    async def close_position(self, symbol: str, save: bool = True) -> bool:
         """
         Close an existing position
 
         Args:
             symbol: Trading pair
+            save: Write the positions file (batch callers save once at the end)
 
         Returns:
             True if position closed successfully
@@ -517,37 +789,26 @@ class TradingStrategy:
         if symbol not in self.portfolio.positions:
             return False
 
-        position = self.portfolio.positions[symbol]
-
         try:
-            exit_price = await data_provider.get_current_price(symbol)
+            exit_price = await data_provider.get_current_price(symbol, Priority.EXIT)
             if exit_price <= 0:
                 return False
 
-            position.exit_price = exit_price
-            position.exit_time = datetime.now()
-
-            # Calculate P&L
-            if position.position_type == PositionType.LONG:
-                position.pnl = (exit_price - position.entry_price) * position.quantity * position.leverage
-            else:  # SHORT
-                position.pnl = (position.entry_price - exit_price) * position.quantity * position.leverage
-
-            position.pnl_percentage = (position.pnl / (position.entry_price * position.quantity)) * 100
-
-            # Update portfolio
-            position_value = (position.quantity * position.entry_price) / position.leverage
-            self.portfolio.available_cash += position_value + position.pnl
-            self.portfolio.total_pnl += position.pnl
+            async with self.portfolio_lock:
+                # Another close of this symbol may have finished while the price was fetched
+                position = self.portfolio.positions.get(symbol)
+                if position is None:
+                    return False
 
-            position.status = PositionStatus.CLOSED
-            self.trades_history.append(position)
-            del self.portfolio.positions[symbol]
+                self._book_close(position, exit_price, datetime.now())
+                self._journal_events.append(('close', self._position_to_dict(position)))
 
-            # Record the action timestamp to prevent re-entry on same candle
-            self.last_action_timestamp[symbol] = datetime.now()
+                # Record the action timestamp to prevent re-entry on same candle
+                self.last_action_timestamp[symbol] = datetime.now()
+                self._check_aggregates()
 
-            self.save_positions()
+            if save:
+                await self.save_positions()
             print(f"Closed {position.position_type.value} position in {symbol} at ${exit_price:.4f}, P&L: ${position.pnl:.2f}")
             return True
 
@@ -555,77 +816,179 @@ class TradingStrategy:
             print(f"Error closing position for {symbol}: {e}")
             return False
 
-    async def update_portfolio_value(self):
+    def _book_open(self, position: Position):
+        """Add a new position to the portfolio and take its margin out of available cash"""
+        self.portfolio.positions[position.symbol] = position
+        self.aggregates.add_open(position)
+        position_value = (position.quantity * position.entry_price) / position.leverage
+        self.portfolio.available_cash -= position_value
+
+    def _book_close(self, position: Position, exit_price: float, exit_time: datetime):
+        """Realize an open position's P&L at exit_price and move it to the trade history"""
+        position.exit_price = exit_price
+        position.exit_time = exit_time
+
+        # Calculate P&L
+        if position.position_type == PositionType.LONG:
+            position.pnl = (exit_price - position.entry_price) * position.quantity * position.leverage
+        else:  # SHORT
+            position.pnl = (position.entry_price - exit_price) * position.quantity * position.leverage
+
+        position.pnl_percentage = (position.pnl / (position.entry_price * position.quantity)) * 100
+
+        # Return the margin plus P&L to available cash
+        position_value = (position.quantity * position.entry_price) / position.leverage
+        self.portfolio.available_cash += position_value + position.pnl
+        self.portfolio.total_pnl += position.pnl
+
+        position.status = PositionStatus.CLOSED
+        self.trades_history.append(position)
+        del self.portfolio.positions[position.symbol]
+        self.aggregates.remove_open(position)
+        self.aggregates.add_closed(position)
+        if not self.portfolio.positions:
+            # Flat: cash is the whole portfolio value, no marks needed
+            self._update_peak(self.portfolio.available_cash)
+
+    def rebuild_aggregates(self):
+        """Recompute the running aggregates after positions or trades were replaced wholesale"""
+        self.aggregates = PortfolioAggregates.from_positions(
+            list(self.portfolio.positions.values()), self.trades_history, self.initial_value)
+
+    def _check_aggregates(self):
+        """In debug mode, compare the running aggregates with a full recompute (and repair them)"""
+        if not config.get_config().PORTFOLIO_CONSISTENCY_CHECKS:
+            return
+        expected = PortfolioAggregates.from_positions(
+            list(self.portfolio.positions.values()), self.trades_history, self.initial_value)
+        # The running peak also saw marked values, so it may only be above the recomputed one
+        expected.peak_equity = max(expected.peak_equity, self.aggregates.peak_equity)
+        if not self.aggregates.matches(expected):
+            print(f"⚠️  Portfolio aggregates drifted: running {self.aggregates} != recomputed {expected}")
+            self.aggregates = expected
+
+    async def get_price_snapshot(self, priority: Priority = Priority.SCAN,
+                                 max_age: Optional[float] = None) -> PriceSnapshot:
+        """
+        Current marks for all open positions
+
+        The snapshot is reused while it is younger than max_age and covers
+        every open symbol; concurrent callers share one refresh.
+
+        Args:
+            priority: Request class for any exchange calls
+            max_age: Maximum snapshot age in seconds (default: PRICE_SNAPSHOT_SECONDS)
+
+        Returns:
+            PriceSnapshot of the open symbols
+        """
+        if max_age is None:
+            max_age = config.get_config().PRICE_SNAPSHOT_SECONDS
+
+        def usable(snapshot: Optional[PriceSnapshot]) -> bool:
+            return snapshot is not None and snapshot.age() < max_age and snapshot.covers(self.portfolio.positions)
+
+        if usable(self.price_snapshot):
+            return self.price_snapshot
+
+        if self._price_snapshot_lock is None:
+            self._price_snapshot_lock = asyncio.Lock()
+
+        async with self._price_snapshot_lock:
+            # Another caller may have refreshed while we waited
+            if usable(self.price_snapshot):
+                return self.price_snapshot
+
+            symbols = list(self.portfolio.positions)
+            prices = await data_provider.get_multiple_prices(symbols, priority)
+            self.price_snapshot = PriceSnapshot(prices=prices, symbols=frozenset(symbols), timestamp=time.time())
+            return self.price_snapshot
+
+    async def update_portfolio_value(self, priority: Priority = Priority.SCAN,
+                                     snapshot: Optional[PriceSnapshot] = None):
         """Update total portfolio value and calculate metrics with current prices"""
+        if snapshot is None:
+            snapshot = await self.get_price_snapshot(priority)
+        unrealized_pnl = self._revalue(snapshot.prices)
+
+        # Total P&L = realized P&L + unrealized P&L
+        total_pnl = self.portfolio.total_pnl + unrealized_pnl
+        self.portfolio.total_pnl_percentage = (total_pnl / config.get_config().INITIAL_PORTFOLIO_VALUE) * 100
+
+    def _revalue(self, prices: Dict[str, float]) -> float:
+        """
+        Mark open positions to prices and update total value, peak and drawdown
+
+        Args:
+            prices: Current price per symbol; positions without one are carried at entry value
+
+        Returns:
+            Unrealized P&L of the open positions
+        """
         unrealized_pnl = 0.0
-        locked_capital = 0.0
+        # Locked capital = entry price * quantity / leverage (the actual capital we used)
+        locked_capital = self.aggregates.locked_margin
 
-        # Calculate unrealized P&L and locked capital from open positions using current prices
+        # Calculate unrealized P&L from open positions using current prices
         for symbol, position in self.portfolio.positions.items():
-            try:
-                current_price = await data_provider.get_current_price(symbol)
-                
-                # Locked capital = entry price * quantity / leverage (the actual capital we used)
-                locked_capital += (position.entry_price * position.quantity) / position.leverage
-                
-                if position.position_type == PositionType.LONG:
-                    # Long: profit when price goes up
-                    price_diff = current_price - position.entry_price
-                    unrealized_pnl += price_diff * position.quantity
-                else:
-                    # Short: profit when price goes down
-                    price_diff = position.entry_price - current_price
-                    unrealized_pnl += price_diff * position.quantity
-            except:
-                continue  # Skip if can't get price
+            current_price = prices.get(symbol)
+            if current_price is None:
+                continue  # No mark: carried at entry value
+
+            if position.position_type == PositionType.LONG:
+                # Long: profit when price goes up
+                price_diff = current_price - position.entry_price
+                unrealized_pnl += price_diff * position.quantity
+            else:
+                # Short: profit when price goes down
+                price_diff = position.entry_price - current_price
+                unrealized_pnl += price_diff * position.quantity
 
         # Total value = available cash + locked capital + unrealized P&L
         # This ensures that opening a position doesn't change total value (except for P&L)
         self.portfolio.total_value = self.portfolio.available_cash + locked_capital + unrealized_pnl
-        
-        # Total P&L = realized P&L + unrealized P&L
-        total_pnl = self.portfolio.total_pnl + unrealized_pnl
-        self.portfolio.total_pnl_percentage = (total_pnl / config.get_config().INITIAL_PORTFOLIO_VALUE) * 100
 
-        # Update peak value and drawdown
-        if self.portfolio.total_value > self.portfolio.peak_value:
-            self.portfolio.peak_value = self.portfolio.total_value
-            self.portfolio.drawdown = 0.0
-        else:
-            self.portfolio.drawdown = ((self.portfolio.peak_value - self.portfolio.total_value) / self.portfolio.peak_value) * 100
+        self._update_peak(self.portfolio.total_value)
+        return unrealized_pnl
+
+    def _update_peak(self, value: float):
+        """Raise peak equity to value if higher, and update the drawdown from it"""
+        if value > self.aggregates.peak_equity:
+            self.aggregates.peak_equity = value
+        self.portfolio.peak_value = self.aggregates.peak_equity
+        self.portfolio.drawdown = ((self.portfolio.peak_value - value) / self.portfolio.peak_value) * 100
 
     async def get_portfolio_summary(self) -> Dict:
         """Get portfolio summary for API"""
-        await self.update_portfolio_value()
+        snapshot = await self.get_price_snapshot(Priority.UI)
+        await self.update_portfolio_value(Priority.UI, snapshot)
 
         # Calculate realized and unrealized P&L (total and by position type)
         unrealized_pnl = 0.0
         long_unrealized_pnl = 0.0
         short_unrealized_pnl = 0.0
-        long_positions_count = 0
-        short_positions_count = 0
-        
+        long_positions_count = self.aggregates.long_positions
+        short_positions_count = self.aggregates.short_positions
+
         for symbol, position in self.portfolio.positions.items():
             try:
-                current_price = await data_provider.get_current_price(symbol)
+                current_price = snapshot.prices[symbol]
                 if position.position_type == PositionType.LONG:
                     price_diff = current_price - position.entry_price
                     pnl = price_diff * position.quantity
                     unrealized_pnl += pnl
                     long_unrealized_pnl += pnl
-                    long_positions_count += 1
                 else:
                     price_diff = position.entry_price - current_price
                     pnl = price_diff * position.quantity
                     unrealized_pnl += pnl
                     short_unrealized_pnl += pnl
-                    short_positions_count += 1
             except:
                 continue
 
-        # Calculate realized P&L by position type
-        long_realized_pnl = sum(trade.pnl for trade in self.trades_history if trade.position_type == PositionType.LONG)
-        short_realized_pnl = sum(trade.pnl for trade in self.trades_history if trade.position_type == PositionType.SHORT)
+        # Realized P&L by position type (running totals, not a scan of the trade history)
+        long_realized_pnl = self.aggregates.long_realized_pnl
+        short_realized_pnl = self.aggregates.short_realized_pnl
         
         # Calculate total P&L by position type
         long_total_pnl = long_realized_pnl + long_unrealized_pnl
@@ -672,6 +1035,8 @@ class TradingStrategy:
             'drawdown': round(self.portfolio.drawdown, 2),
             'open_positions': len(self.portfolio.positions),
             'total_trades': len(self.trades_history),
+            'winning_trades': self.aggregates.wins,
+            'losing_trades': self.aggregates.losses,
             # Long position metrics
             'long_pnl': round(long_total_pnl, 2),
             'long_realized_pnl': round(long_realized_pnl, 2),
@@ -691,11 +1056,12 @@ class TradingStrategy:
     async def get_positions(self) -> List[Dict]:
         """Get all positions for API with current prices and unrealized P&L"""
         positions = []
-        
+        snapshot = await self.get_price_snapshot(Priority.UI)
+
         # Add open positions with current unrealized P&L
         for pos in self.portfolio.positions.values():
             try:
-                current_price = await data_provider.get_current_price(pos.symbol)
+                current_price = snapshot.prices[pos.symbol]
                 
                 # Calculate unrealized P&L
                 if pos.position_type == PositionType.LONG:
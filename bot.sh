@@ -25,6 +25,8 @@ FRONTEND_LOG="frontend.log"
 BACKEND_PID_FILE="backend.pid"
 FRONTEND_PID_FILE="frontend.pid"
 POSITIONS_FILE="backend/positions.json"
+POSITIONS_JOURNAL="backend/positions.journal"
+POSITIONS_TMP_FILE="backend/positions.json.tmp"
 EQUITY_FILE="backend/equity_history.json"
 
 # Function to print colored messages
@@ -58,8 +60,10 @@ clear_data() {
         print_info "Clearing trading data..."
     fi
     
-    # Remove positions and equity history
+    # Remove positions (snapshot, journal, interrupted compaction) and equity history
     /bin/rm -f "$POSITIONS_FILE" 2>/dev/null || true
+    /bin/rm -f "$POSITIONS_JOURNAL" 2>/dev/null || true
+    /bin/rm -f "$POSITIONS_TMP_FILE" 2>/dev/null || true
     /bin/rm -f "$EQUITY_FILE" 2>/dev/null || true
     
     # Remove logs
@@ -355,7 +359,7 @@ stop_bot() {
     /bin/rm -f "$FRONTEND_LOG" 2>/dev/null || true
     
     print_success "All services stopped and cleaned up"
-    print_info "Trading data preserved (positions.json, equity_history.json)"
+    print_info "Trading data preserved (positions.json, positions.journal, equity_history.json)"
 }
 
 # Function to restart bot (FRESH START - clears all data)